@@ -1,18 +1,51 @@
 """Backend Flask pour le dashboard ascenseur SOFIA."""
 from __future__ import annotations
 
+import json
 import os
+import secrets
 import shutil
+import sqlite3
 from functools import wraps
 from pathlib import Path
 
-from flask import Flask, request, session, redirect, url_for, jsonify
+from flask import Flask, Response, abort, request, session, redirect, url_for, jsonify
 
-from src.db import get_connection
+from src.compression import ENCODAGES, CacheSnapshots, compresser_flux
+from src import messagepack
+from src.config import (
+    ASSETS_MAX_AGE, COMPRESSION_TAILLE_MIN, COMPRESSION_TAILLE_FLUX,
+    VALORISATION_LOYER_M2, VALORISATION_PRIX_M2,
+)
+from src.db import get_connection, upgrade_schema, data_version
+from src.ecriture import FileEcriture
+from src.ascenseur.assets import get_asset, precompresser, service_worker
+from src.ascenseur.devis import CRITERES_DEVIS, get_devis_comparison
+from src.ascenseur.imputation import brancher_ecriture, imputer_tantiemes
+from src.ascenseur.financement import echeancier_lot, grille_financement, lire_conditions
+from src.ascenseur.projection import projeter_charges
+from src.ascenseur.valorisation import calculer_valorisation, lire_prix
 from src.ascenseur.export_dashboard import generate_dashboard_data, generate_html
-from src.ascenseur.votes import mettre_a_jour_vote, initialiser_votes
+from src.ascenseur.votes import (
+    mettre_a_jour_vote, mettre_a_jour_contact, reinitialiser_votes,
+    appliquer_modifications, horodatage_serveur,
+)
+from src.ascenseur.pouvoir import calculer_pouvoir
+from src.ascenseur.strategy import get_full_canvassing_list
+from src.ascenseur.tournee import lire_minutes, tournee
+from src.ascenseur.courriers import demarrer_pool, dossiers_proprietaires, flux_courriers
+from src.ascenseur.export_tableur import EXPORTS, FORMATS, flux_export, ouvrir_export
+from src.ascenseur.recherche import (
+    FILTRES, TRI_DEMARCHAGE_DEFAUT, TRI_VOTES_DEFAUT, TRIS_DEMARCHAGE, TRIS_VOTES,
+    lire_filtres, lire_limite, lire_tri, rechercher_demarchage, rechercher_votes,
+)
+from src.ascenseur.journal import PAS_PROGRESSION, etat_a, get_journal_lot, lire_horodatage, progression
+from src.ascenseur.scenarios import (
+    get_scenario, evaluer_scenarios, evaluer_scenario, comparer_scenarios,
+    creer_scenario, supprimer_scenario, modifier_scenario,
+)
 
-app = Flask(__name__)
+app = Flask(__name__, static_folder=None)
 app.secret_key = os.environ.get("SECRET_KEY", os.urandom(24).hex())
 
 ACCESS_CODE = os.environ.get("ACCESS_CODE", "1234")
@@ -33,7 +66,72 @@ def _db():
     return get_connection(VOLUME_DB)
 
 
+if VOLUME_DB.exists():
+    _conn = _db()
+    try:
+        upgrade_schema(_conn)
+        imputer_tantiemes(_conn)  # estimations relues par calculer_repartition
+        _conn.commit()
+    finally:
+        _conn.close()
+
+# Processus de rendu des courriers : créés ici, avant le premier thread
+demarrer_pool()
+
+# Toutes les écritures de l'application passent par ce thread unique
+ECRITURE = FileEcriture(VOLUME_DB)
+brancher_ecriture(ECRITURE)  # estimations de tantièmes invalidées : réécrites à la lecture
+
+
+# ── Compression ─────────────────────────────────────────────
+SNAPSHOTS = CacheSnapshots()
+
+
+def _encodage_accepte() -> str | None:
+    return request.accept_encodings.best_match(ENCODAGES)
+
+
+def _reponse_snapshot(nom: str, version: int, produire, mimetype: str) -> Response:
+    """Sert un artefact mis en cache par version de données, précompressé une fois."""
+    variantes = SNAPSHOTS.get(nom, version)
+    if variantes is None:
+        variantes = SNAPSHOTS.put(nom, version, produire())
+    identity = variantes["identity"]
+    encodage = _encodage_accepte() if len(identity) >= COMPRESSION_TAILLE_MIN else None
+    if encodage is None:
+        resp = Response(identity, mimetype=mimetype)
+    else:
+        body = variantes.get(encodage)
+        if body is None and len(identity) >= COMPRESSION_TAILLE_FLUX:
+            # Premier envoi d'un gros artefact : compression rapide en flux ;
+            # la variante au niveau maximal est mémorisée ensuite.
+            body = SNAPSHOTS.flux(variantes, encodage)
+        elif body is None:
+            body = SNAPSHOTS.variante(variantes, encodage)
+        resp = Response(body, mimetype=mimetype)
+        resp.headers["Content-Encoding"] = encodage
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+precompresser(ENCODAGES)
+
+
+def _json_bytes(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _format_accepte() -> str:
+    """Négociation sur Accept : JSON par défaut, MessagePack si demandé explicitement."""
+    meilleur = request.accept_mimetypes.best_match(("application/json",) + messagepack.MIMETYPES)
+    return "msgpack" if meilleur in messagepack.MIMETYPES else "json"
+
+
 # ── Auth ────────────────────────────────────────────────────
+def _auteur() -> str | None:
+    return session.get("auteur")
+
+
 def login_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -70,12 +168,14 @@ border:1px solid rgba(108,138,255,0.5);border-radius:8px;
 font-size:15px;font-weight:600;cursor:pointer;margin-top:16px;transition:all .2s}
 button:hover{background:rgba(108,138,255,0.4);border-color:#6c8aff}
 .error{color:#ff6b6b;font-size:13px;margin-top:12px}
+input.nom{margin-top:12px;letter-spacing:normal;font-size:14px}
 </style></head><body>
 <div class="card">
 <h1>Dashboard Ascenseur</h1>
 <p class="sub">Copropriété SOFIA — Bâtiment A</p>
 <form method="post">
 <input type="password" name="code" placeholder="Code d'accès" autofocus required>
+<input type="text" name="nom" class="nom" placeholder="Votre nom (facultatif)" maxlength="60">
 <button type="submit">Accéder</button>
 <!-- error -->
 </form></div></body></html>"""
@@ -87,6 +187,9 @@ def login():
     if request.method == "POST":
         if request.form.get("code") == ACCESS_CODE:
             session["authenticated"] = True
+            # Auteur noté au journal des votes : nom saisi, sinon identifiant de poste
+            nom = (request.form.get("nom") or "").strip()[:60]
+            session["auteur"] = nom or f"poste-{secrets.token_hex(3)}"
             return redirect(url_for("dashboard"))
         error = '<p class="error">Code incorrect</p>'
     return LOGIN_HTML.replace("<!-- error -->", error)
@@ -98,29 +201,222 @@ def logout():
     return redirect(url_for("login"))
 
 
+# ── Ressources statiques ────────────────────────────────────
+@app.route("/static/<path:nom>")
+def static_asset(nom):
+    """CSS/JS à nom haché : immuables, servis précompressés depuis la mémoire."""
+    asset = get_asset(nom)
+    if asset is None:
+        abort(404)
+    encodage = _encodage_accepte()
+    resp = Response(asset.variante(encodage), mimetype=asset.mimetype)
+    if encodage is not None:
+        resp.headers["Content-Encoding"] = encodage
+    resp.headers["Cache-Control"] = f"public, max-age={ASSETS_MAX_AGE}, immutable"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+@app.route("/sw.js")
+def service_worker_js():
+    """Service worker hors ligne, servi à la racine pour contrôler toute l'application."""
+    resp = Response(service_worker(), mimetype="application/javascript")
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
 # ── Dashboard ───────────────────────────────────────────────
 @app.route("/")
 @login_required
 def dashboard():
     conn = _db()
     try:
-        data = generate_dashboard_data(conn)
-        html = generate_html(data)
-        return html
+        return _reponse_snapshot(
+            "dashboard", data_version(conn),
+            lambda: generate_html(generate_dashboard_data(conn)).encode("utf-8"),
+            "text/html",
+        )
+    finally:
+        conn.close()
+
+
+# ── API Devis ───────────────────────────────────────────────
+@app.route("/api/devis", methods=["GET"])
+@login_required
+def get_devis():
+    """Classement TOPSIS des devis et sa sensibilité aux poids : ?prix=&accessibilite=…"""
+    poids = {c: request.args[c] for c in CRITERES_DEVIS if c in request.args}
+    conn = _db()
+    try:
+        if not poids:
+            return _reponse_snapshot(
+                "api_devis", data_version(conn),
+                lambda: _json_bytes(get_devis_comparison(conn)),
+                "application/json",
+            )
+        try:
+            return Response(_json_bytes(get_devis_comparison(conn, poids)), mimetype="application/json")
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+    finally:
+        conn.close()
+
+
+# ── API Financement ─────────────────────────────────────────
+@app.route("/api/financement", methods=["GET"])
+@login_required
+def get_financement():
+    """Mensualité, coût du crédit et VAN de chaque lot × devis × prêt × taux × durée."""
+    conn = _db()
+    try:
+        return _reponse_snapshot(
+            "api_financement", data_version(conn),
+            lambda: _json_bytes(grille_financement(conn)),
+            "application/json",
+        )
+    finally:
+        conn.close()
+
+
+@app.route("/api/financement/<int:lot_id>", methods=["GET"])
+@login_required
+def get_echeancier(lot_id):
+    """Tableau d'amortissement d'un lot : ?devis=<id>&pret=&taux=&duree=."""
+    try:
+        devis_id = int(request.args.get("devis", ""))
+    except ValueError:
+        return jsonify({"error": "devis requis"}), 400
+    try:
+        pret, taux, duree = lire_conditions(
+            request.args.get("pret"), request.args.get("taux"), request.args.get("duree")
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    conn = _db()
+    try:
+        echeancier = echeancier_lot(conn, lot_id, devis_id, pret, taux, duree)
+    finally:
+        conn.close()
+    if echeancier is None:
+        abort(404)
+    return jsonify(echeancier)
+
+
+# ── API Projection des charges ──────────────────────────────
+@app.route("/api/projection", methods=["GET"])
+@login_required
+def get_projection():
+    """Charges trimestrielles projetées par lot et par devis ; ?pret=&taux=&duree= : travaux financés."""
+    financee = any(k in request.args for k in ("pret", "taux", "duree"))
+    conditions = None
+    if financee:
+        try:
+            conditions = lire_conditions(
+                request.args.get("pret"), request.args.get("taux"), request.args.get("duree")
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+    conn = _db()
+    try:
+        if conditions is None:
+            return _reponse_snapshot(
+                "api_projection", data_version(conn),
+                lambda: _json_bytes(projeter_charges(conn)),
+                "application/json",
+            )
+        return Response(_json_bytes(projeter_charges(conn, conditions)), mimetype="application/json")
+    finally:
+        conn.close()
+
+
+# ── API Valorisation ────────────────────────────────────────
+@app.route("/api/valorisation", methods=["GET"])
+@login_required
+def get_valorisation():
+    """Plus-value, bilan net et retour de chaque lot pour chaque devis ; ?prix_m2=&loyer_m2=."""
+    try:
+        prix_m2 = lire_prix(request.args.get("prix_m2"), VALORISATION_PRIX_M2)
+        loyer_m2 = lire_prix(request.args.get("loyer_m2"), VALORISATION_LOYER_M2)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    conn = _db()
+    try:
+        if (prix_m2, loyer_m2) == (VALORISATION_PRIX_M2, VALORISATION_LOYER_M2):
+            return _reponse_snapshot(
+                "api_valorisation", data_version(conn),
+                lambda: _json_bytes(calculer_valorisation(conn)),
+                "application/json",
+            )
+        return Response(_json_bytes(calculer_valorisation(conn, prix_m2, loyer_m2)), mimetype="application/json")
     finally:
         conn.close()
 
 
 # ── API Votes ───────────────────────────────────────────────
+PARAMETRES_RECHERCHE = FILTRES + ("tri", "curseur", "limite")
+
+
+def _recherche_demandee() -> bool:
+    return any(k in request.args for k in PARAMETRES_RECHERCHE)
+
+
+def _page(rechercher, tris: dict, tri_defaut: str):
+    """Une page de ``rechercher`` selon les paramètres de la requête (400 si invalides)."""
+    try:
+        filtres = lire_filtres(request.args)
+        tri = lire_tri(request.args.get("tri"), tris, tri_defaut)
+        limite = lire_limite(request.args.get("limite"))
+        conn = _db()
+        try:
+            return jsonify(rechercher(conn, filtres, tri, request.args.get("curseur"), limite))
+        finally:
+            conn.close()
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+
 @app.route("/api/votes", methods=["GET"])
 @login_required
 def get_votes():
+    """État complet de la simulation, ou seulement les changements avec ?since=<version>.
+
+    Avec des filtres, un tri, un curseur ou une limite (voir recherche.py) :
+    une page du détail des votes.
+    """
+    if _recherche_demandee():
+        return _page(rechercher_votes, TRIS_VOTES, TRI_VOTES_DEFAUT)
+    since = request.args.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "since invalide"}), 400
+
     conn = _db()
     try:
-        from src.ascenseur.votes import get_votes_detail, calculer_resultats
-        detail = get_votes_detail(conn)
-        resultats = calculer_resultats(conn)
-        return jsonify({"detail": detail, "resultats": resultats})
+        from src.ascenseur.votes import votes_depuis, votes_compacts
+        binaire = _format_accepte() == "msgpack"
+        if since is not None:
+            # Delta : petit et propre à chaque client, pas mis en cache
+            payload = votes_depuis(conn, since)
+            if binaire:
+                resp = Response(messagepack.packb(votes_compacts(payload)), mimetype=messagepack.MIMETYPE)
+            else:
+                resp = Response(_json_bytes(payload), mimetype="application/json")
+        elif binaire:
+            resp = _reponse_snapshot(
+                "api_votes.msgpack", data_version(conn),
+                lambda: messagepack.packb(votes_compacts(votes_depuis(conn, 0))),
+                messagepack.MIMETYPE,
+            )
+        else:
+            resp = _reponse_snapshot(
+                "api_votes", data_version(conn),
+                lambda: _json_bytes(votes_depuis(conn, 0)),
+                "application/json",
+            )
+        resp.vary.add("Accept")
+        return resp
     finally:
         conn.close()
 
@@ -134,48 +430,289 @@ def update_vote(lot_id):
     if not vote:
         return jsonify({"error": "vote requis"}), 400
 
+    if not ECRITURE.executer(mettre_a_jour_vote, lot_id, vote, confiance, _auteur()):
+        return jsonify({"error": "lot introuvable"}), 404
+    return jsonify({"ok": True})
+
+
+@app.route("/api/contact/<int:lot_id>", methods=["POST"])
+@login_required
+def update_contact(lot_id):
+    data = request.get_json(silent=True) or {}
+    if not ECRITURE.executer(mettre_a_jour_contact, lot_id, data.get("contact_fait"), _auteur()):
+        return jsonify({"error": "lot introuvable"}), 404
+    return jsonify({"ok": True})
+
+
+@app.route("/api/votes/reset", methods=["POST"])
+@login_required
+def reset_votes():
+    ECRITURE.executer(reinitialiser_votes, _auteur())
+    return jsonify({"ok": True})
+
+
+@app.route("/api/sync", methods=["POST"])
+@login_required
+def sync_modifications():
+    """Rejoue la file de modifications saisies hors ligne (last-writer-wins)."""
+    data = request.get_json(silent=True) or {}
+    modifications = data.get("modifications")
+    if not isinstance(modifications, list):
+        return jsonify({"error": "modifications requises"}), 400
+
+    resultats = ECRITURE.executer(
+        appliquer_modifications, [m for m in modifications if isinstance(m, dict)], _auteur()
+    )
     conn = _db()
     try:
-        ok = mettre_a_jour_vote(conn, lot_id, vote, confiance)
-        if not ok:
-            return jsonify({"error": "lot introuvable"}), 404
-        return jsonify({"ok": True})
+        return jsonify({"resultats": resultats, "server_time": horodatage_serveur(conn)})
     finally:
         conn.close()
 
 
-@app.route("/api/contact/<int:lot_id>", methods=["POST"])
+# ── API Historique des votes ────────────────────────────────
+@app.route("/api/votes/progression", methods=["GET"])
 @login_required
-def update_contact(lot_id):
-    data = request.get_json(silent=True) or {}
-    contact_fait = 1 if data.get("contact_fait") else 0
+def votes_progression():
+    """Tantièmes par vote et contacts au fil du temps : ?debut=&fin=&pas=heure|jour|semaine."""
+    pas = request.args.get("pas", "jour")
+    if pas not in PAS_PROGRESSION:
+        return jsonify({"error": "pas invalide"}), 400
+    try:
+        debut, fin = (
+            lire_horodatage(v) if v else None
+            for v in (request.args.get("debut"), request.args.get("fin"))
+        )
+    except ValueError:
+        return jsonify({"error": "date invalide"}), 400
+    conn = _db()
+    try:
+        return jsonify(progression(conn, debut, fin, pas))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        conn.close()
+
+
+@app.route("/api/votes/etat", methods=["GET"])
+@login_required
+def votes_etat():
+    """Résultats de la simulation à une date passée : ?au=<ISO 8601>."""
+    try:
+        au = lire_horodatage(request.args.get("au", ""))
+    except ValueError:
+        return jsonify({"error": "date invalide"}), 400
+    conn = _db()
+    try:
+        resultats = etat_a(conn, au)
+        if resultats is None:
+            return jsonify({"error": "date antérieure au journal"}), 404
+        return jsonify({"au": au, "resultats": resultats})
+    finally:
+        conn.close()
+
+
+@app.route("/api/votes/<int:lot_id>/journal", methods=["GET"])
+@login_required
+def vote_journal(lot_id):
+    conn = _db()
+    try:
+        return jsonify(get_journal_lot(conn, lot_id))
+    finally:
+        conn.close()
+
+
+# ── API Démarchage ──────────────────────────────────────────
+def _demarchage(conn: sqlite3.Connection) -> dict:
+    pouvoir = calculer_pouvoir(conn)
+    return {
+        "pouvoir": {k: v for k, v in pouvoir.items() if k != "lots"},
+        "lots": get_full_canvassing_list(conn),
+    }
+
+
+@app.route("/api/canvassing", methods=["GET"])
+@login_required
+def get_canvassing():
+    """Liste de démarchage priorisée, avec les indices de pouvoir de chaque propriétaire.
+
+    Avec des filtres, un tri, un curseur ou une limite : une page de la liste.
+    """
+    if _recherche_demandee():
+        return _page(rechercher_demarchage, TRIS_DEMARCHAGE, TRI_DEMARCHAGE_DEFAUT)
     conn = _db()
     try:
-        result = conn.execute(
-            "UPDATE vote_simulation SET contact_fait = ? WHERE lot_id = ?",
-            (contact_fait, lot_id),
+        return _reponse_snapshot(
+            "api_canvassing", data_version(conn),
+            lambda: _json_bytes(_demarchage(conn)),
+            "application/json",
         )
-        conn.commit()
-        if result.rowcount == 0:
-            return jsonify({"error": "lot introuvable"}), 404
-        return jsonify({"ok": True})
     finally:
         conn.close()
 
 
-@app.route("/api/votes/reset", methods=["POST"])
+@app.route("/api/tournee", methods=["GET"])
 @login_required
-def reset_votes():
+def get_tournee():
+    """Tournée de porte-à-porte : ?minutes=<durée>&bat=A,B (tous les bâtiments par défaut)."""
+    try:
+        minutes = lire_minutes(request.args.get("minutes"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    batiments = [b for b in request.args.get("bat", "").split(",") if b] or None
+    conn = _db()
+    try:
+        return jsonify(tournee(conn, minutes, batiments))
+    finally:
+        conn.close()
+
+
+# ── API Exports tableur ─────────────────────────────────────
+@app.route("/api/export/<nom>.<format_>", methods=["GET"])
+@login_required
+def export_tableur(nom, format_):
+    """Annuaire, quote-parts, soldes ou votes en CSV ou XLSX, envoyés en flux."""
+    if nom not in EXPORTS or format_ not in FORMATS:
+        abort(404)
+    conn = _db()
+    try:
+        conn.execute("BEGIN")  # toutes les lignes lues sur le même instantané
+        colonnes, lignes = ouvrir_export(conn, nom)
+    except Exception:
+        conn.close()
+        raise
+
+    def flux():
+        try:
+            yield from flux_export(colonnes, lignes, format_, nom)
+        finally:
+            conn.close()
+
+    corps = flux()
+    # Le CSV se compresse très bien ; le XLSX est déjà une archive ZIP
+    encodage = _encodage_accepte() if format_ == "csv" else None
+    if encodage is not None:
+        corps = compresser_flux(corps, encodage)
+    resp = Response(corps, content_type=FORMATS[format_])
+    if encodage is not None:
+        resp.headers["Content-Encoding"] = encodage
+    resp.vary.add("Accept-Encoding")
+    resp.headers["Content-Disposition"] = f'attachment; filename="sofia_{nom}.{format_}"'
+    return resp
+
+
+# ── API Courriers ───────────────────────────────────────────
+@app.route("/api/courriers.zip", methods=["GET"])
+@login_required
+def courriers():
+    """Courriers personnalisés de tous les propriétaires (un HTML chacun), en ZIP."""
+    conn = _db()
+    try:
+        conn.execute("BEGIN")  # dossiers lus sur un même instantané
+        dossiers = dossiers_proprietaires(conn)
+    finally:
+        conn.close()
+    resp = Response(flux_courriers(dossiers), mimetype="application/zip")
+    resp.headers["Content-Disposition"] = 'attachment; filename="sofia_courriers.zip"'
+    return resp
+
+
+# ── API Scénarios ───────────────────────────────────────────
+def _scenario_id(valeur):
+    """Identifiant de scénario en paramètre : absent, vide ou « simulation » → None."""
+    if valeur in (None, "", "simulation"):
+        return None
+    return int(valeur)
+
+
+@app.route("/api/scenarios", methods=["GET"])
+@login_required
+def list_scenarios():
+    conn = _db()
+    try:
+        return jsonify(evaluer_scenarios(conn))
+    finally:
+        conn.close()
+
+
+@app.route("/api/scenarios", methods=["POST"])
+@login_required
+def create_scenario():
+    data = request.get_json(silent=True) or {}
+    nom = (data.get("nom") or "").strip()
+    if not nom:
+        return jsonify({"error": "nom requis"}), 400
+    try:
+        base_id = _scenario_id(data.get("base_id"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "base_id invalide"}), 400
+    try:
+        scenario_id = ECRITURE.executer(creer_scenario, nom, data.get("description"), base_id)
+    except sqlite3.IntegrityError:
+        return jsonify({"error": "nom déjà utilisé"}), 409
+    if scenario_id is None:
+        return jsonify({"error": "scénario de base introuvable"}), 404
+    return jsonify({"id": scenario_id}), 201
+
+
+@app.route("/api/scenarios/diff", methods=["GET"])
+@login_required
+def diff_scenarios():
+    """Compare deux scénarios : ?a=<id>&b=<id> (absent : simulation courante)."""
+    try:
+        a, b = _scenario_id(request.args.get("a")), _scenario_id(request.args.get("b"))
+    except ValueError:
+        return jsonify({"error": "identifiant de scénario invalide"}), 400
+    conn = _db()
+    try:
+        if any(s is not None and get_scenario(conn, s) is None for s in (a, b)):
+            return jsonify({"error": "scénario introuvable"}), 404
+        return jsonify(comparer_scenarios(conn, a, b))
+    finally:
+        conn.close()
+
+
+@app.route("/api/scenarios/<int:scenario_id>", methods=["GET"])
+@login_required
+def get_scenario_detail(scenario_id):
     conn = _db()
     try:
-        conn.execute("DELETE FROM vote_simulation")
-        conn.commit()
-        initialiser_votes(conn)
-        return jsonify({"ok": True})
+        scenario = evaluer_scenario(conn, scenario_id)
+        if scenario is None:
+            return jsonify({"error": "scénario introuvable"}), 404
+        return jsonify(scenario)
     finally:
         conn.close()
 
 
+@app.route("/api/scenarios/<int:scenario_id>", methods=["DELETE"])
+@login_required
+def delete_scenario(scenario_id):
+    try:
+        if not ECRITURE.executer(supprimer_scenario, scenario_id):
+            return jsonify({"error": "scénario introuvable"}), 404
+    except sqlite3.IntegrityError:
+        return jsonify({"error": "scénario utilisé comme base d'un autre"}), 409
+    return jsonify({"ok": True})
+
+
+@app.route("/api/scenarios/<int:scenario_id>/lots", methods=["POST"])
+@login_required
+def update_scenario_lots(scenario_id):
+    """Fixe vote/confiance de lots dans un scénario : {"modifications": [...]}."""
+    data = request.get_json(silent=True) or {}
+    modifications = data.get("modifications")
+    if not isinstance(modifications, list) or not all(isinstance(m, dict) for m in modifications):
+        return jsonify({"error": "modifications requises"}), 400
+    try:
+        taille = ECRITURE.executer(modifier_scenario, scenario_id, modifications)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if taille is None:
+        return jsonify({"error": "scénario introuvable"}), 404
+    return jsonify({"ok": True, "nb_modifications": taille})
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=os.environ.get("FLASK_DEBUG", "0") == "1")
@@ -0,0 +1,102 @@
+-- ============================================================
+-- Copropriété SOFIA — Compteurs de version des données
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Compteur de modifications par table, incrémenté par trigger.
+-- La somme des compteurs sert de version globale des données :
+-- les artefacts dérivés (HTML, JSON compressés) sont mis en cache
+-- par version et invalidés dès qu'une table suivie change.
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS table_version (
+    nom_table   TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO table_version (nom_table)
+VALUES
+    ('lot'),
+    ('personne'),
+    ('lot_personne'),
+    ('vote_simulation'),
+    ('devis_ascenseur'),
+    ('frais_annexes'),
+    ('action_plan');
+
+-- lot
+CREATE TRIGGER IF NOT EXISTS trg_lot_version_ai AFTER INSERT ON lot BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'lot';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_version_au AFTER UPDATE ON lot BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'lot';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_version_ad AFTER DELETE ON lot BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'lot';
+END;
+
+-- personne
+CREATE TRIGGER IF NOT EXISTS trg_personne_version_ai AFTER INSERT ON personne BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'personne';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_personne_version_au AFTER UPDATE ON personne BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'personne';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_personne_version_ad AFTER DELETE ON personne BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'personne';
+END;
+
+-- lot_personne
+CREATE TRIGGER IF NOT EXISTS trg_lot_personne_version_ai AFTER INSERT ON lot_personne BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'lot_personne';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_personne_version_au AFTER UPDATE ON lot_personne BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'lot_personne';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_personne_version_ad AFTER DELETE ON lot_personne BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'lot_personne';
+END;
+
+-- vote_simulation
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_version_ai AFTER INSERT ON vote_simulation BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'vote_simulation';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_version_au AFTER UPDATE ON vote_simulation BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'vote_simulation';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_version_ad AFTER DELETE ON vote_simulation BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'vote_simulation';
+END;
+
+-- devis_ascenseur
+CREATE TRIGGER IF NOT EXISTS trg_devis_ascenseur_version_ai AFTER INSERT ON devis_ascenseur BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'devis_ascenseur';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_devis_ascenseur_version_au AFTER UPDATE ON devis_ascenseur BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'devis_ascenseur';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_devis_ascenseur_version_ad AFTER DELETE ON devis_ascenseur BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'devis_ascenseur';
+END;
+
+-- frais_annexes
+CREATE TRIGGER IF NOT EXISTS trg_frais_annexes_version_ai AFTER INSERT ON frais_annexes BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'frais_annexes';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_frais_annexes_version_au AFTER UPDATE ON frais_annexes BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'frais_annexes';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_frais_annexes_version_ad AFTER DELETE ON frais_annexes BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'frais_annexes';
+END;
+
+-- action_plan
+CREATE TRIGGER IF NOT EXISTS trg_action_plan_version_ai AFTER INSERT ON action_plan BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'action_plan';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_action_plan_version_au AFTER UPDATE ON action_plan BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'action_plan';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_action_plan_version_ad AFTER DELETE ON action_plan BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'action_plan';
+END;
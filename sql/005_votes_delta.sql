@@ -0,0 +1,55 @@
+-- ============================================================
+-- Copropriété SOFIA — Versions de ligne des votes (sync delta)
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Séquence des modifications de vote_simulation. Chaque ligne
+-- insérée ou modifiée reçoit la valeur suivante dans sa colonne
+-- version (ajoutée par db.COLONNES_AJOUTEES) ; la valeur courante
+-- est le « high-water mark » renvoyé au client, qui ne redemande
+-- ensuite que les lignes de version supérieure (/api/votes?since=).
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS vote_sequence (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    version     INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO vote_sequence (id) VALUES (1);
+
+-- -----------------------------------------------------------
+-- Tombstones : un lot supprimé de la simulation (réinitialisation)
+-- est noté avec la version de sa suppression. Une ligne par lot au
+-- plus ; la ligne recréée ensuite porte une version supérieure.
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS vote_suppression (
+    lot_id      INTEGER PRIMARY KEY,
+    version     INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_vote_simulation_version ON vote_simulation(version);
+CREATE INDEX IF NOT EXISTS idx_vote_suppression_version ON vote_suppression(version);
+
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_ligne_ai AFTER INSERT ON vote_simulation BEGIN
+    UPDATE vote_sequence SET version = version + 1 WHERE id = 1;
+    UPDATE vote_simulation SET version = (SELECT version FROM vote_sequence WHERE id = 1)
+    WHERE id = NEW.id;
+END;
+
+-- Toutes les colonnes sauf version : la mise à jour de version faite par le
+-- trigger ne le redéclenche pas. IF NOT EXISTS ne remplace pas un trigger
+-- existant : une migration qui ajoute une colonne à vote_simulation doit le
+-- supprimer et le recréer avec la liste complète (voir 012).
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_ligne_au
+AFTER UPDATE OF lot_id, vote, confiance, argument_cle, contact_fait, date_contact, notes, modifie_le
+ON vote_simulation BEGIN
+    UPDATE vote_sequence SET version = version + 1 WHERE id = 1;
+    UPDATE vote_simulation SET version = (SELECT version FROM vote_sequence WHERE id = 1)
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_ligne_ad AFTER DELETE ON vote_simulation BEGIN
+    UPDATE vote_sequence SET version = version + 1 WHERE id = 1;
+    INSERT OR REPLACE INTO vote_suppression (lot_id, version)
+    VALUES (OLD.lot_id, (SELECT version FROM vote_sequence WHERE id = 1));
+END;
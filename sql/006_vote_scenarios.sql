@@ -0,0 +1,29 @@
+-- ============================================================
+-- Copropriété SOFIA — Scénarios de vote nommés
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Un scénario est une surcouche creuse sur une base : la simulation
+-- courante (base_id NULL) ou un autre scénario. Seuls les lots dont
+-- le vote ou la confiance diffère de la base y sont stockés ; les
+-- totaux se calculent comme base + delta de ces lots.
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS vote_scenario (
+    id              INTEGER PRIMARY KEY,
+    nom             TEXT NOT NULL UNIQUE,
+    description     TEXT,
+    base_id         INTEGER REFERENCES vote_scenario(id),
+    cree_le         TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+-- vote / confiance NULL : valeur héritée de la base
+CREATE TABLE IF NOT EXISTS vote_scenario_lot (
+    scenario_id     INTEGER NOT NULL REFERENCES vote_scenario(id) ON DELETE CASCADE,
+    lot_id          INTEGER NOT NULL REFERENCES lot(id),
+    vote            TEXT CHECK (vote IN ('pour', 'contre', 'abstention', 'absent', 'inconnu')),
+    confiance       TEXT CHECK (confiance IN ('certain', 'probable', 'possible', 'inconnu')),
+    PRIMARY KEY (scenario_id, lot_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_vote_scenario_base ON vote_scenario(base_id);
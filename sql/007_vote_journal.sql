@@ -0,0 +1,118 @@
+-- ============================================================
+-- Copropriété SOFIA — Journal des votes et points de contrôle
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Journal append-only des changements de vote_simulation : une
+-- ligne par transition d'un lot (ancien → nouveau état complet),
+-- écrite par trigger dans la transaction de la modification.
+-- Insertion : ancien_* NULL ; suppression : nouveau_* NULL.
+-- Bâtiment et tantièmes sont figés au moment du changement.
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS vote_journal (
+    id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+    horodatage          TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    auteur              TEXT,
+    lot_id              INTEGER NOT NULL,
+    batiment            TEXT,
+    tantiemes           INTEGER,
+    ancien_vote         TEXT,
+    nouveau_vote        TEXT,
+    ancienne_confiance  TEXT,
+    nouvelle_confiance  TEXT,
+    ancien_contact      INTEGER,
+    nouveau_contact     INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_vote_journal_horodatage ON vote_journal(horodatage);
+CREATE INDEX IF NOT EXISTS idx_vote_journal_lot ON vote_journal(lot_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_vote_journal_bu BEFORE UPDATE ON vote_journal BEGIN
+    SELECT RAISE(ABORT, 'vote_journal est en ajout seul');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vote_journal_bd BEFORE DELETE ON vote_journal BEGIN
+    SELECT RAISE(ABORT, 'vote_journal est en ajout seul');
+END;
+
+-- Auteur de la mutation en cours, renseigné par l'application
+-- (votes.journal_auteur) dans la même transaction que l'écriture,
+-- et effacé à la fin de chaque mutation.
+CREATE TABLE IF NOT EXISTS journal_contexte (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    auteur      TEXT
+);
+
+INSERT OR IGNORE INTO journal_contexte (id) VALUES (1);
+-- Un auteur resté d'une écriture interrompue ne doit rien s'attribuer
+UPDATE journal_contexte SET auteur = NULL WHERE id = 1 AND auteur IS NOT NULL;
+
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_journal_ai AFTER INSERT ON vote_simulation BEGIN
+    INSERT INTO vote_journal (auteur, lot_id, batiment, tantiemes,
+                              nouveau_vote, nouvelle_confiance, nouveau_contact)
+    SELECT (SELECT auteur FROM journal_contexte WHERE id = 1), NEW.lot_id, b.code, l.tantiemes,
+           NEW.vote, NEW.confiance, NEW.contact_fait
+    FROM lot l JOIN batiment b ON l.batiment_id = b.id
+    WHERE l.id = NEW.lot_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_journal_au
+AFTER UPDATE OF vote, confiance, contact_fait ON vote_simulation
+WHEN OLD.vote IS NOT NEW.vote
+  OR OLD.confiance IS NOT NEW.confiance
+  OR OLD.contact_fait IS NOT NEW.contact_fait
+BEGIN
+    INSERT INTO vote_journal (auteur, lot_id, batiment, tantiemes,
+                              ancien_vote, nouveau_vote, ancienne_confiance, nouvelle_confiance,
+                              ancien_contact, nouveau_contact)
+    SELECT (SELECT auteur FROM journal_contexte WHERE id = 1), NEW.lot_id, b.code, l.tantiemes,
+           OLD.vote, NEW.vote, OLD.confiance, NEW.confiance, OLD.contact_fait, NEW.contact_fait
+    FROM lot l JOIN batiment b ON l.batiment_id = b.id
+    WHERE l.id = NEW.lot_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vote_simulation_journal_ad AFTER DELETE ON vote_simulation BEGIN
+    INSERT INTO vote_journal (auteur, lot_id, batiment, tantiemes,
+                              ancien_vote, ancienne_confiance, ancien_contact)
+    SELECT (SELECT auteur FROM journal_contexte WHERE id = 1), OLD.lot_id, b.code, l.tantiemes,
+           OLD.vote, OLD.confiance, OLD.contact_fait
+    FROM lot l JOIN batiment b ON l.batiment_id = b.id
+    WHERE l.id = OLD.lot_id;
+END;
+
+-- -----------------------------------------------------------
+-- Points de contrôle : agrégats de la simulation après l'entrée
+-- journal_id du journal, en JSON [[batiment, vote, confiance,
+-- contact_fait, nb, tantiemes], ...]. Un point toutes les 256
+-- entrées (journal.POINT_CONTROLE_TOUS_LES) : l'état à une date
+-- se reconstruit depuis le dernier point antérieur, en rejouant
+-- au plus ~256 changements. Le point 0 est l'état à la création
+-- du journal.
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS vote_point_controle (
+    journal_id  INTEGER PRIMARY KEY,
+    horodatage  TEXT NOT NULL,
+    agregats    TEXT NOT NULL
+);
+
+CREATE VIEW IF NOT EXISTS v_vote_agregats AS
+SELECT b.code AS batiment, vs.vote, vs.confiance, vs.contact_fait,
+       COUNT(*) AS nb, COALESCE(SUM(l.tantiemes), 0) AS tantiemes
+FROM vote_simulation vs
+JOIN lot l ON vs.lot_id = l.id
+JOIN batiment b ON l.batiment_id = b.id
+GROUP BY b.code, vs.vote, vs.confiance, vs.contact_fait;
+
+INSERT OR IGNORE INTO vote_point_controle (journal_id, horodatage, agregats)
+SELECT 0, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
+       json_group_array(json_array(batiment, vote, confiance, contact_fait, nb, tantiemes))
+FROM v_vote_agregats;
+
+CREATE TRIGGER IF NOT EXISTS trg_vote_journal_point_controle AFTER INSERT ON vote_journal
+WHEN NEW.id % 256 = 0
+BEGIN
+    INSERT INTO vote_point_controle (journal_id, horodatage, agregats)
+    SELECT NEW.id, NEW.horodatage,
+           json_group_array(json_array(batiment, vote, confiance, contact_fait, nb, tantiemes))
+    FROM v_vote_agregats;
+END;
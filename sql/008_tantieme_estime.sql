@@ -0,0 +1,39 @@
+-- ============================================================
+-- Copropriété SOFIA — Tantièmes ascenseur estimés
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Estimation des tantièmes ascenseur manquants (lots desservis
+-- sans tantieme_ascenseur), écrite en une passe par
+-- imputation.imputer_tantiemes. Le modèle est ajusté sur tous les
+-- lots connus : toute modification d'un lot qui entre dans le
+-- calcul vide la table (triggers remplacés par 013, qui tient
+-- aussi l'état a_jour), et la première lecture qui la trouve
+-- invalidée met une nouvelle imputation en file.
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS tantieme_estime (
+    lot_id          INTEGER PRIMARY KEY REFERENCES lot(id) ON DELETE CASCADE,
+    valeur          REAL NOT NULL,
+    methode         TEXT NOT NULL,          -- voir imputation.METHODES
+    incertitude     REAL,                   -- écart-type estimé, en tantièmes
+    nb_references   INTEGER NOT NULL,       -- lots connus ayant servi à l'estimation
+    calcule_le      TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_lot_tantieme_estime_ai AFTER INSERT ON lot BEGIN
+    DELETE FROM tantieme_estime;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_tantieme_estime_au
+AFTER UPDATE OF batiment_id, etage, tantiemes, coef_ascenseur, tantieme_ascenseur ON lot
+WHEN OLD.batiment_id IS NOT NEW.batiment_id
+  OR OLD.etage IS NOT NEW.etage
+  OR OLD.tantiemes IS NOT NEW.tantiemes
+  OR OLD.coef_ascenseur IS NOT NEW.coef_ascenseur
+  OR OLD.tantieme_ascenseur IS NOT NEW.tantieme_ascenseur
+BEGIN
+    DELETE FROM tantieme_estime;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_tantieme_estime_ad AFTER DELETE ON lot BEGIN
+    DELETE FROM tantieme_estime;
+END;
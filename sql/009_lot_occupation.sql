@@ -0,0 +1,94 @@
+-- ============================================================
+-- Copropriété SOFIA — Occupation des lots, tenue par triggers
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Classification d'un lot depuis ses rattachements actifs :
+--   bailleur  : un locataire actif
+--   habitant  : un propriétaire actif et un résident actif
+--   vacant    : ni locataire ni résident actif, mais d'anciens
+--   inconnu   : aucune information d'occupation
+-- est_societe / est_membre_cs : un propriétaire actif l'est.
+-- profils : clés des arguments par profil (ARGUMENTS_OVERLAY),
+-- séparées par des virgules.
+-- -----------------------------------------------------------
+CREATE VIEW IF NOT EXISTS v_lot_occupation AS
+SELECT lot_id, occupancy, est_societe, est_membre_cs,
+       RTRIM(
+           CASE WHEN occupancy IN ('habitant', 'bailleur', 'vacant') THEN occupancy || ',' ELSE '' END
+           || CASE WHEN est_societe THEN 'sci,' ELSE '' END
+           || CASE WHEN est_membre_cs THEN 'cs_member,' ELSE '' END,
+           ','
+       ) AS profils
+FROM (
+    SELECT l.id AS lot_id,
+           CASE
+               WHEN EXISTS (SELECT 1 FROM lot_personne lp
+                            WHERE lp.lot_id = l.id AND lp.actif = 1 AND lp.role = 'locataire')
+                   THEN 'bailleur'
+               WHEN EXISTS (SELECT 1 FROM lot_personne lp
+                            WHERE lp.lot_id = l.id AND lp.actif = 1 AND lp.role = 'resident')
+                AND EXISTS (SELECT 1 FROM lot_personne lp
+                            WHERE lp.lot_id = l.id AND lp.actif = 1 AND lp.role = 'proprietaire')
+                   THEN 'habitant'
+               WHEN NOT EXISTS (SELECT 1 FROM lot_personne lp
+                                WHERE lp.lot_id = l.id AND lp.actif = 1
+                                  AND lp.role IN ('locataire', 'resident'))
+                AND EXISTS (SELECT 1 FROM lot_personne lp
+                            WHERE lp.lot_id = l.id AND lp.actif = 0
+                              AND lp.role IN ('locataire', 'resident'))
+                   THEN 'vacant'
+               ELSE 'inconnu'
+           END AS occupancy,
+           COALESCE((SELECT MAX(p.est_societe) FROM lot_personne lp JOIN personne p ON lp.personne_id = p.id
+                     WHERE lp.lot_id = l.id AND lp.actif = 1 AND lp.role = 'proprietaire'), 0) AS est_societe,
+           COALESCE((SELECT MAX(p.est_membre_cs) FROM lot_personne lp JOIN personne p ON lp.personne_id = p.id
+                     WHERE lp.lot_id = l.id AND lp.actif = 1 AND lp.role = 'proprietaire'), 0) AS est_membre_cs
+    FROM lot l
+);
+
+-- Matérialisation : une ligne par lot, recalculée par les triggers
+-- ci-dessous pour les seuls lots touchés par une modification.
+CREATE TABLE IF NOT EXISTS lot_occupation (
+    lot_id          INTEGER PRIMARY KEY REFERENCES lot(id) ON DELETE CASCADE,
+    occupancy       TEXT NOT NULL CHECK (occupancy IN ('habitant', 'bailleur', 'vacant', 'inconnu')),
+    est_societe     INTEGER NOT NULL DEFAULT 0,
+    est_membre_cs   INTEGER NOT NULL DEFAULT 0,
+    profils         TEXT NOT NULL DEFAULT ''
+);
+
+-- Rattrapage (bases existantes, modifications hors triggers)
+INSERT OR REPLACE INTO lot_occupation (lot_id, occupancy, est_societe, est_membre_cs, profils)
+SELECT lot_id, occupancy, est_societe, est_membre_cs, profils FROM v_lot_occupation;
+
+CREATE TRIGGER IF NOT EXISTS trg_lot_occupation_lot_ai AFTER INSERT ON lot BEGIN
+    INSERT OR REPLACE INTO lot_occupation (lot_id, occupancy, est_societe, est_membre_cs, profils)
+    SELECT lot_id, occupancy, est_societe, est_membre_cs, profils FROM v_lot_occupation WHERE lot_id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_occupation_lot_ad AFTER DELETE ON lot BEGIN
+    DELETE FROM lot_occupation WHERE lot_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_lot_occupation_lp_ai AFTER INSERT ON lot_personne BEGIN
+    INSERT OR REPLACE INTO lot_occupation (lot_id, occupancy, est_societe, est_membre_cs, profils)
+    SELECT lot_id, occupancy, est_societe, est_membre_cs, profils FROM v_lot_occupation WHERE lot_id = NEW.lot_id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_occupation_lp_au AFTER UPDATE ON lot_personne BEGIN
+    INSERT OR REPLACE INTO lot_occupation (lot_id, occupancy, est_societe, est_membre_cs, profils)
+    SELECT lot_id, occupancy, est_societe, est_membre_cs, profils FROM v_lot_occupation
+    WHERE lot_id IN (OLD.lot_id, NEW.lot_id);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_lot_occupation_lp_ad AFTER DELETE ON lot_personne BEGIN
+    INSERT OR REPLACE INTO lot_occupation (lot_id, occupancy, est_societe, est_membre_cs, profils)
+    SELECT lot_id, occupancy, est_societe, est_membre_cs, profils FROM v_lot_occupation WHERE lot_id = OLD.lot_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_lot_occupation_personne_au
+AFTER UPDATE OF est_societe, est_membre_cs ON personne
+WHEN OLD.est_societe IS NOT NEW.est_societe OR OLD.est_membre_cs IS NOT NEW.est_membre_cs
+BEGIN
+    INSERT OR REPLACE INTO lot_occupation (lot_id, occupancy, est_societe, est_membre_cs, profils)
+    SELECT lot_id, occupancy, est_societe, est_membre_cs, profils FROM v_lot_occupation
+    WHERE lot_id IN (SELECT lot_id FROM lot_personne WHERE personne_id = NEW.id);
+END;
@@ -0,0 +1,74 @@
+-- ============================================================
+-- Copropriété SOFIA — Compteurs de version des tables de référence
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Complète table_version (004) pour les tables lues par les
+-- sections du dashboard : bâtiments et historique des charges
+-- (projection). Les tables dérivées (tantieme_estime,
+-- lot_occupation) ne sont pas suivies : elles ne changent
+-- qu'avec lot, lot_personne ou personne, déjà comptées.
+-- -----------------------------------------------------------
+INSERT OR IGNORE INTO table_version (nom_table)
+VALUES
+    ('batiment'),
+    ('exercice'),
+    ('poste_charge'),
+    ('appel_de_fonds'),
+    ('charge_lot');
+
+-- batiment
+CREATE TRIGGER IF NOT EXISTS trg_batiment_version_ai AFTER INSERT ON batiment BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'batiment';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_batiment_version_au AFTER UPDATE ON batiment BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'batiment';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_batiment_version_ad AFTER DELETE ON batiment BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'batiment';
+END;
+
+-- exercice
+CREATE TRIGGER IF NOT EXISTS trg_exercice_version_ai AFTER INSERT ON exercice BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'exercice';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_exercice_version_au AFTER UPDATE ON exercice BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'exercice';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_exercice_version_ad AFTER DELETE ON exercice BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'exercice';
+END;
+
+-- poste_charge
+CREATE TRIGGER IF NOT EXISTS trg_poste_charge_version_ai AFTER INSERT ON poste_charge BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'poste_charge';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_poste_charge_version_au AFTER UPDATE ON poste_charge BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'poste_charge';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_poste_charge_version_ad AFTER DELETE ON poste_charge BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'poste_charge';
+END;
+
+-- appel_de_fonds
+CREATE TRIGGER IF NOT EXISTS trg_appel_de_fonds_version_ai AFTER INSERT ON appel_de_fonds BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'appel_de_fonds';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_appel_de_fonds_version_au AFTER UPDATE ON appel_de_fonds BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'appel_de_fonds';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_appel_de_fonds_version_ad AFTER DELETE ON appel_de_fonds BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'appel_de_fonds';
+END;
+
+-- charge_lot
+CREATE TRIGGER IF NOT EXISTS trg_charge_lot_version_ai AFTER INSERT ON charge_lot BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'charge_lot';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_charge_lot_version_au AFTER UPDATE ON charge_lot BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'charge_lot';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_charge_lot_version_ad AFTER DELETE ON charge_lot BEGIN
+    UPDATE table_version SET version = version + 1 WHERE nom_table = 'charge_lot';
+END;
@@ -0,0 +1,10 @@
+-- ============================================================
+-- Copropriété SOFIA — Index de la recherche paginée
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- Filtres de /api/votes et /api/canvassing (recherche.py)
+CREATE INDEX IF NOT EXISTS idx_vote_simulation_vote_confiance ON vote_simulation(vote, confiance);
+CREATE INDEX IF NOT EXISTS idx_lot_batiment_etage ON lot(batiment_id, etage);
+-- Recherche par nom : propriétaires actifs d'un lot
+CREATE INDEX IF NOT EXISTS idx_lot_personne_lot_role ON lot_personne(lot_id, role, actif);
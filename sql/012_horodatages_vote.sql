@@ -0,0 +1,24 @@
+-- ============================================================
+-- Copropriété SOFIA — Horodatages last-writer-wins par type de modification
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- vote_modifie_le et contact_modifie_le (colonnes ajoutées par db.py) :
+-- les lignes écrites avant leur ajout reprennent modifie_le, seule heure
+-- connue de leur dernière écriture.
+UPDATE vote_simulation SET vote_modifie_le = modifie_le
+WHERE vote_modifie_le IS NULL AND modifie_le IS NOT NULL;
+UPDATE vote_simulation SET contact_modifie_le = modifie_le
+WHERE contact_modifie_le IS NULL AND modifie_le IS NOT NULL;
+
+-- Le trigger de version de 005 doit aussi suivre les deux nouvelles colonnes :
+-- recréé avec la liste complète (toutes les colonnes sauf version)
+DROP TRIGGER IF EXISTS trg_vote_simulation_ligne_au;
+CREATE TRIGGER trg_vote_simulation_ligne_au
+AFTER UPDATE OF lot_id, vote, confiance, argument_cle, contact_fait, date_contact, notes,
+                modifie_le, vote_modifie_le, contact_modifie_le
+ON vote_simulation BEGIN
+    UPDATE vote_sequence SET version = version + 1 WHERE id = 1;
+    UPDATE vote_simulation SET version = (SELECT version FROM vote_sequence WHERE id = 1)
+    WHERE id = NEW.id;
+END;
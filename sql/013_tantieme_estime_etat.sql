@@ -0,0 +1,41 @@
+-- ============================================================
+-- Copropriété SOFIA — État des tantièmes ascenseur estimés
+-- Idempotent : ré-exécuté à chaque démarrage (upgrade_schema)
+-- ============================================================
+
+-- -----------------------------------------------------------
+-- Une table tantieme_estime vide est légitime (aucun lot manquant) :
+-- a_jour distingue « estimé, rien à estimer » de « invalidé par une
+-- modification de lot ». Mis à 1 par imputation.imputer_tantiemes,
+-- à 0 par les triggers de lot ci-dessous.
+-- -----------------------------------------------------------
+CREATE TABLE IF NOT EXISTS tantieme_estime_etat (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    a_jour      INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO tantieme_estime_etat (id) VALUES (1);
+
+-- Triggers de 008 recréés : ils invalident aussi l'état
+DROP TRIGGER IF EXISTS trg_lot_tantieme_estime_ai;
+CREATE TRIGGER trg_lot_tantieme_estime_ai AFTER INSERT ON lot BEGIN
+    DELETE FROM tantieme_estime;
+    UPDATE tantieme_estime_etat SET a_jour = 0 WHERE id = 1;
+END;
+DROP TRIGGER IF EXISTS trg_lot_tantieme_estime_au;
+CREATE TRIGGER trg_lot_tantieme_estime_au
+AFTER UPDATE OF batiment_id, etage, tantiemes, coef_ascenseur, tantieme_ascenseur ON lot
+WHEN OLD.batiment_id IS NOT NEW.batiment_id
+  OR OLD.etage IS NOT NEW.etage
+  OR OLD.tantiemes IS NOT NEW.tantiemes
+  OR OLD.coef_ascenseur IS NOT NEW.coef_ascenseur
+  OR OLD.tantieme_ascenseur IS NOT NEW.tantieme_ascenseur
+BEGIN
+    DELETE FROM tantieme_estime;
+    UPDATE tantieme_estime_etat SET a_jour = 0 WHERE id = 1;
+END;
+DROP TRIGGER IF EXISTS trg_lot_tantieme_estime_ad;
+CREATE TRIGGER trg_lot_tantieme_estime_ad AFTER DELETE ON lot BEGIN
+    DELETE FROM tantieme_estime;
+    UPDATE tantieme_estime_etat SET a_jour = 0 WHERE id = 1;
+END;
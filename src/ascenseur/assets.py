@@ -0,0 +1,108 @@
+"""Ressources statiques du dashboard : noms hachés, cache long, variantes précompressées."""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from ..compression import compresser
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+# Nom logique → fichier dans static/
+ASSETS = {
+    "dashboard.css": "dashboard.css",
+    "dashboard.js": "dashboard.js",
+    "calc.js": "calc.js",
+    "msgpack.js": "msgpack.js",
+    "chart.js": "vendor/chart.umd.min.js",
+}
+
+MIMETYPES = {
+    ".css": "text/css",
+    ".js": "text/javascript",
+}
+
+
+@dataclass
+class Asset:
+    """Fichier statique chargé en mémoire, servi sous un nom haché immuable."""
+    nom_hache: str
+    mimetype: str
+    contenu: bytes
+    variantes: dict[str, bytes] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def variante(self, encodage: str | None) -> bytes:
+        """Contenu compressé pour l'encodage demandé (calculé une seule fois)."""
+        if encodage is None:
+            return self.contenu
+        with self._lock:
+            if encodage not in self.variantes:
+                self.variantes[encodage] = compresser(self.contenu, encodage)
+            return self.variantes[encodage]
+
+
+def _nom_hache(fichier: str, contenu: bytes) -> str:
+    """dashboard.css → dashboard.<empreinte>.css"""
+    nom = Path(fichier).name
+    base, _, ext = nom.rpartition(".")
+    empreinte = hashlib.sha256(contenu).hexdigest()[:12]
+    return f"{base}.{empreinte}.{ext}"
+
+
+@lru_cache(maxsize=1)
+def _manifest() -> tuple[dict[str, Asset], dict[str, Asset]]:
+    """Charge les ressources une fois par processus : (par nom logique, par nom haché)."""
+    par_nom: dict[str, Asset] = {}
+    par_hache: dict[str, Asset] = {}
+    for nom, fichier in ASSETS.items():
+        path = STATIC_DIR / fichier
+        contenu = path.read_bytes()
+        asset = Asset(
+            nom_hache=_nom_hache(fichier, contenu),
+            mimetype=MIMETYPES.get(path.suffix, "application/octet-stream"),
+            contenu=contenu,
+        )
+        par_nom[nom] = asset
+        par_hache[asset.nom_hache] = asset
+    return par_nom, par_hache
+
+
+def url_asset(nom: str) -> str:
+    """URL versionnée d'une ressource, ex. /static/dashboard.1a2b3c4d5e6f.js."""
+    return "/static/" + _manifest()[0][nom].nom_hache
+
+
+def texte_asset(nom: str) -> str:
+    """Contenu texte d'une ressource (pour l'export HTML auto-contenu)."""
+    return _manifest()[0][nom].contenu.decode("utf-8")
+
+
+def get_asset(nom_hache: str) -> Asset | None:
+    """Ressource correspondant à un nom haché, ou None si inconnu."""
+    return _manifest()[1].get(nom_hache)
+
+
+def precompresser(encodages: tuple[str, ...]) -> None:
+    """Calcule d'avance toutes les variantes compressées (au démarrage)."""
+    for asset in _manifest()[0].values():
+        for encodage in encodages:
+            asset.variante(encodage)
+
+
+@lru_cache(maxsize=1)
+def service_worker() -> bytes:
+    """Service worker avec la liste des ressources hachées à précharger.
+
+    Son nom de cache dépend des empreintes : toute nouvelle version du CSS/JS
+    produit un nouveau service worker qui purge l'ancien cache.
+    """
+    urls = [url_asset(nom) for nom in ASSETS]
+    version = hashlib.sha256("\n".join(urls).encode()).hexdigest()[:12]
+    texte = (STATIC_DIR / "sw.js").read_text(encoding="utf-8")
+    texte = texte.replace("__VERSION__", version).replace("__PRECACHE__", json.dumps(urls))
+    return texte.encode("utf-8")
@@ -0,0 +1,22 @@
+"""Mise en colonnes des tables envoyées au client (payload dashboard, API binaire)."""
+from __future__ import annotations
+
+
+def en_colonnes(rows: list[dict], champs: list[str]) -> dict:
+    """Met une liste de lignes en colonnes (champ → valeurs, dans l'ordre des lignes).
+
+    Une colonne de chaînes répétitives (au plus une valeur distincte pour deux
+    lignes) est codée par dictionnaire : {"dict": [valeurs], "codes": [indices]}.
+    Le décodage côté client est fromColumns (dashboard.js).
+    """
+    cols = {}
+    for champ in champs:
+        valeurs = [r.get(champ) for r in rows]
+        distinctes = list(dict.fromkeys(valeurs))
+        if (valeurs and all(v is None or isinstance(v, str) for v in valeurs)
+                and len(distinctes) * 2 <= len(valeurs)):
+            index = {v: i for i, v in enumerate(distinctes)}
+            cols[champ] = {"dict": distinctes, "codes": [index[v] for v in valeurs]}
+        else:
+            cols[champ] = valeurs
+    return cols
@@ -0,0 +1,278 @@
+"""Courriers personnalisés aux copropriétaires avant l'AG, en archive ZIP.
+
+Un courrier par propriétaire, regroupant ses lots : quote-part du devis de
+référence, mensualité du prêt par défaut, part de maintenance, argument de
+l'étage (ARGUMENTS_PAR_ETAGE, ARGUMENT_BAT_BC) et arguments de son profil
+d'occupation (lot_occupation.profils), comme les cartes de l'argumentaire.
+
+Les dossiers sont lus en base dans le processus appelant, puis le rendu
+(modèle string.Template, HTML imprimable) et la compression de chaque
+courrier sont répartis sur un pool de processus créé au démarrage du
+serveur (demarrer_pool). Le processus appelant n'écrit que les en-têtes
+ZIP : les courriers entrent dans l'archive dans l'ordre des dossiers, au fur
+et à mesure, et l'archive part en flux.
+"""
+from __future__ import annotations
+
+import html
+import multiprocessing
+import re
+import sqlite3
+import struct
+import threading
+import time
+import unicodedata
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from string import Template
+from typing import Iterator
+
+from ..config import COURRIERS_PROCESSUS, FINANCEMENT_DEFAUT
+from .export_dashboard import ARGUMENTS_OVERLAY
+from .financement import devis_comparables, facteurs_unitaires, parts_ascenseur
+from .strategy import ARGUMENTS_PAR_ETAGE, ARGUMENT_BAT_BC
+
+# Variables : $date, $proprietaire, $adresse, $fournisseur, $lots,
+# $total_quote_part, $total_mensualite, $total_maintenance, $conditions,
+# $arguments, $profils
+MODELE_COURRIER = Template("""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>Projet ascenseur — $proprietaire</title>
+<style>
+body { font-family: Georgia, serif; font-size: 11pt; max-width: 17cm; margin: 2cm auto; color: #222; }
+.entete { display: flex; justify-content: space-between; margin-bottom: 1.5cm; }
+.destinataire { white-space: pre-line; text-align: right; }
+table { width: 100%; border-collapse: collapse; margin: 1em 0; }
+th, td { border-bottom: 1px solid #ccc; padding: 4px 6px; text-align: left; }
+td.montant, th.montant { text-align: right; }
+tfoot td { font-weight: bold; border-top: 2px solid #222; }
+h2 { font-size: 12pt; margin-top: 1.5em; }
+@media print { body { margin: 0 auto; } }
+</style>
+</head>
+<body>
+<div class="entete">
+<div>Conseil syndical — Copropriété SOFIA<br>$date</div>
+<div class="destinataire"><strong>$proprietaire</strong>
+$adresse</div>
+</div>
+<p><strong>Objet : projet d'installation d'un ascenseur — vote en assemblée générale</strong></p>
+<p>Madame, Monsieur,</p>
+<p>La prochaine assemblée générale se prononcera sur l'installation d'un
+ascenseur au bâtiment A. Voici ce que le projet représente pour vos lots,
+sur la base du devis $fournisseur.</p>
+<table>
+<thead><tr><th>Lot</th><th>Bât.</th><th>Étage</th><th>Localisation</th>
+<th class="montant">Quote-part</th><th class="montant">Mensualité</th>
+<th class="montant">Maintenance / an</th></tr></thead>
+<tbody>
+$lots
+</tbody>
+<tfoot><tr><td colspan="4">Total</td><td class="montant">$total_quote_part</td>
+<td class="montant">$total_mensualite</td><td class="montant">$total_maintenance</td></tr></tfoot>
+</table>
+<p><small>Mensualité : $conditions.</small></p>
+$arguments
+$profils
+<p>Les membres du conseil syndical restent à votre disposition pour en
+parler avant l'assemblée.</p>
+<p>Bien cordialement,<br>Le conseil syndical</p>
+</body>
+</html>
+""")
+
+
+# ── Dossiers ─────────────────────────────────────────────────
+
+def dossiers_proprietaires(conn: sqlite3.Connection) -> list[dict]:
+    """Un dossier par propriétaire actif : ses lots chiffrés et ses arguments.
+
+    Les dossiers ne contiennent que des types simples : ils sont envoyés
+    tels quels aux processus de rendu.
+    """
+    rows = conn.execute(
+        """SELECT p.id AS personne_id, p.nom_complet, p.adresse,
+                  l.id AS lot_id, l.numero, b.code AS batiment, l.etage, l.localisation,
+                  COALESCE(o.profils, '') AS profils
+           FROM lot_personne lp
+           JOIN personne p ON lp.personne_id = p.id
+           JOIN lot l ON lp.lot_id = l.id
+           JOIN batiment b ON l.batiment_id = b.id
+           LEFT JOIN lot_occupation o ON o.lot_id = l.id
+           WHERE lp.role = 'proprietaire' AND lp.actif = 1
+           ORDER BY p.nom_complet, p.id, b.code, l.etage, l.numero"""
+    ).fetchall()
+
+    # Devis de référence : le premier comparable, comme l'argumentaire du dashboard
+    comparables = devis_comparables(conn)
+    reference = comparables[0] if comparables else None
+    parts = {lot_id: part for lot_id, _, part in parts_ascenseur(conn)}
+    facteurs = facteurs_unitaires(
+        FINANCEMENT_DEFAUT["pret"], FINANCEMENT_DEFAUT["taux"], FINANCEMENT_DEFAUT["duree_ans"]
+    )
+    taux = f"{FINANCEMENT_DEFAUT['taux'] * 100:.2f}".replace(".", ",")
+    commun = {
+        "date": date.today().strftime("%d/%m/%Y"),
+        "fournisseur": reference["fournisseur"] if reference else "—",
+        "conditions": (
+            f"prêt {FINANCEMENT_DEFAUT['pret']} sur {FINANCEMENT_DEFAUT['duree_ans']} ans "
+            f"à {taux} %, assurance comprise"
+        ),
+    }
+
+    dossiers: dict[int, dict] = {}
+    for r in rows:
+        dossier = dossiers.get(r["personne_id"])
+        if dossier is None:
+            dossier = dossiers[r["personne_id"]] = dict(
+                commun, personne_id=r["personne_id"], proprietaire=r["nom_complet"],
+                adresse=r["adresse"] or "", lots=[], arguments=[], profils=[],
+            )
+        part = parts.get(r["lot_id"], 0)
+        quote_part = round(reference["montant_ttc"] * part, 2) if reference else 0
+        dossier["lots"].append({
+            "numero": r["numero"], "batiment": r["batiment"], "etage": r["etage"],
+            "localisation": r["localisation"] or "",
+            "quote_part": quote_part,
+            "mensualite": round(quote_part * facteurs["mensualite"], 2),
+            "maintenance": round(reference["maintenance_ttc"] * part, 2) if reference else 0,
+        })
+        if r["batiment"] == "A":
+            argument = ARGUMENTS_PAR_ETAGE.get(r["etage"], ARGUMENTS_PAR_ETAGE[0])
+        else:
+            argument = ARGUMENT_BAT_BC
+        texte = {"titre": argument["titre"], "argument": argument["argument"]}
+        if texte not in dossier["arguments"]:
+            dossier["arguments"].append(texte)
+        for cle in filter(None, r["profils"].split(",")):
+            overlay = ARGUMENTS_OVERLAY.get(cle)
+            if overlay is not None and overlay not in dossier["profils"]:
+                dossier["profils"].append(overlay)
+    return list(dossiers.values())
+
+
+# ── Rendu ────────────────────────────────────────────────────
+
+def _euros(montant: float) -> str:
+    """12345.6 → « 12 345,60 € » (espace insécable)."""
+    return f"{montant:,.2f} €".replace(",", " ").replace(".", ",")
+
+
+def _nom_fichier(dossier: dict) -> str:
+    nom = unicodedata.normalize("NFKD", dossier["proprietaire"]).encode("ascii", "ignore").decode()
+    nom = re.sub(r"[^A-Za-z0-9]+", "_", nom).strip("_") or "proprietaire"
+    return f"{dossier['personne_id']:04d}_{nom[:60]}.html"
+
+
+def rendre_courrier(dossier: dict, modele: Template = MODELE_COURRIER) -> tuple[str, bytes]:
+    """(nom du fichier, courrier HTML) d'un dossier de dossiers_proprietaires."""
+    e = html.escape
+    lots = "\n".join(
+        f"<tr><td>{e(str(l['numero']))}</td><td>{e(l['batiment'])}</td>"
+        f"<td>{e(str(l['etage']))}</td><td>{e(l['localisation'])}</td>"
+        f"<td class=\"montant\">{_euros(l['quote_part'])}</td>"
+        f"<td class=\"montant\">{_euros(l['mensualite'])}</td>"
+        f"<td class=\"montant\">{_euros(l['maintenance'])}</td></tr>"
+        for l in dossier["lots"]
+    )
+    arguments = "\n".join(
+        f"<h2>{e(a['titre'])}</h2>\n<p>{e(a['argument'])}</p>" for a in dossier["arguments"]
+    )
+    profils = "\n".join(
+        f"<h2>{e(p['titre'])}</h2>\n<ul>{''.join(f'<li>{e(point)}</li>' for point in p['points'])}</ul>"
+        for p in dossier["profils"]
+    )
+    texte = modele.safe_substitute(
+        date=e(dossier["date"]),
+        proprietaire=e(dossier["proprietaire"]),
+        adresse=e(dossier["adresse"]),
+        fournisseur=e(dossier["fournisseur"]),
+        conditions=e(dossier["conditions"]),
+        lots=lots,
+        total_quote_part=_euros(sum(l["quote_part"] for l in dossier["lots"])),
+        total_mensualite=_euros(sum(l["mensualite"] for l in dossier["lots"])),
+        total_maintenance=_euros(sum(l["maintenance"] for l in dossier["lots"])),
+        arguments=arguments,
+        profils=profils,
+    )
+    return _nom_fichier(dossier), texte.encode("utf-8")
+
+
+# ── Pool de processus ───────────────────────────────────────
+# Processus créés par fork au démarrage du serveur (demarrer_pool), tant que
+# le processus n'a qu'un thread : un fork plus tard, depuis un serveur
+# multi-thread, copierait des verrous tenus par d'autres threads. Le rendu ne
+# touche pas à SQLite : il ne reçoit que des dossiers en types simples.
+# (« spawn » et « forkserver » réimporteraient app.py dans chaque processus,
+# migrations comprises.)
+
+_POOL: ProcessPoolExecutor | None = None
+
+
+def demarrer_pool() -> None:
+    """Crée les COURRIERS_PROCESSUS processus de rendu, à appeler au démarrage.
+
+    Sans effet si un autre thread tourne déjà : les courriers sont alors
+    rendus dans le processus du serveur.
+    """
+    global _POOL
+    if _POOL is not None or COURRIERS_PROCESSUS <= 1 or threading.active_count() > 1:
+        return
+    _POOL = ProcessPoolExecutor(
+        max_workers=COURRIERS_PROCESSUS, mp_context=multiprocessing.get_context("fork")
+    )
+    # Avec fork, le premier envoi crée tous les processus d'un coup, et
+    # avant les threads de gestion du pool
+    _POOL.submit(int).result()
+
+
+def _rendre_compresse(dossier: dict, modele: Template) -> tuple[str, int, int, bytes]:
+    """(nom, CRC-32, taille, contenu deflate brut) d'un courrier, pour l'archive."""
+    nom, contenu = rendre_courrier(dossier, modele)
+    compresseur = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return nom, zlib.crc32(contenu), len(contenu), compresseur.compress(contenu) + compresseur.flush()
+
+
+def _date_dos() -> tuple[int, int]:
+    t = time.localtime()
+    return (
+        t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2,
+        (t.tm_year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday,
+    )
+
+
+def flux_courriers(dossiers: list[dict], modele: Template = MODELE_COURRIER) -> Iterator[bytes]:
+    """Archive ZIP des courriers de ``dossiers``, écrite en flux.
+
+    Entrées déjà compressées par les processus de rendu : zipfile ne sait
+    pas les recevoir, les en-têtes sont donc écrits ici (noms en UTF-8,
+    sans ZIP64 : moins de 65 535 courriers et 4 Go).
+    """
+    rendre = partial(_rendre_compresse, modele=modele)
+    if _POOL is not None and len(dossiers) > 1:
+        # Quelques lots de dossiers par processus : moins d'allers-retours
+        taille = max(1, len(dossiers) // (4 * COURRIERS_PROCESSUS))
+        courriers = _POOL.map(rendre, dossiers, chunksize=taille)
+    else:
+        courriers = map(rendre, dossiers)
+
+    heure, jour = _date_dos()
+    central, position = [], 0
+    for nom, crc, taille_brute, donnees in courriers:
+        nom_octets = nom.encode("utf-8")
+        # version 2.0, bit 11 : nom en UTF-8, méthode 8 : deflate
+        champs = (20, 0x800, 8, heure, jour, crc, len(donnees), taille_brute, len(nom_octets), 0)
+        entete = struct.pack("<I5H3I2H", 0x04034B50, *champs) + nom_octets
+        central.append(
+            struct.pack("<I6H3I5HII", 0x02014B50, 20, *champs, 0, 0, 0, 0, position) + nom_octets
+        )
+        position += len(entete) + len(donnees)
+        yield entete + donnees
+    repertoire = b"".join(central)
+    yield repertoire + struct.pack(
+        "<I4H2IH", 0x06054B50, 0, 0, len(central), len(central), len(repertoire), position, 0
+    )
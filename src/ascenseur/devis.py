@@ -1,7 +1,36 @@
 """Comparaison et analyse des devis ascenseur."""
 from __future__ import annotations
 
+import math
+import random
+import re
 import sqlite3
+from functools import lru_cache
+from operator import mul
+
+from ..config import (
+    MAINTENANCE_INDEXATION, MAINTENANCE_TVA, POIDS_CRITERES_DEVIS,
+    SENSIBILITE_CONCENTRATION, SENSIBILITE_TIRAGES,
+)
+
+# Critère → (colonne, sens) ; sens 1 : plus = mieux, -1 : moins = mieux.
+# duree_mois est calculée depuis duree_travaux (parser_duree_mois).
+CRITERES_DEVIS = {
+    "prix":          ("montant_ttc", -1),
+    "maintenance":   ("maintenance_ht", -1),
+    "capacite":      ("capacite_kg", 1),
+    "accessibilite": ("pmr_en81_70", 1),
+    "rapidite":      ("duree_mois", -1),
+    "niveaux":       ("niveaux", 1),
+}
+
+# Une quantité : un nombre ou une fourchette (« 4-5 », « 4 à 5 »), puis son unité
+_DUREE = re.compile(
+    r"(\d+(?:[.,]\d+)?)(?:\s*(?:-|–|à)\s*(\d+(?:[.,]\d+)?))?"
+    r"\s*(mois|semaines?|jours?|ans?|années?|annees?)?\b",
+    re.IGNORECASE,
+)
+MOIS_PAR_UNITE = {"mois": 1, "semaine": 12 / 52, "jour": 12 / 365, "an": 12, "année": 12, "annee": 12}
 
 
 def get_devis_list(conn: sqlite3.Connection) -> list[dict]:
@@ -16,15 +45,186 @@ def get_devis_list(conn: sqlite3.Connection) -> list[dict]:
 
 
 def compute_cout_total_10ans(devis: dict) -> float | None:
-    """Coût total sur 10 ans : installation TTC + 10 × maintenance annuelle HT × 1.20."""
+    """Coût total sur 10 ans : installation TTC + 10 années de maintenance TTC.
+
+    La maintenance de la première année est révisée de MAINTENANCE_INDEXATION
+    chaque année suivante.
+    """
     if devis["maintenance_ht"] is None:
         return None
-    maintenance_ttc_an = devis["maintenance_ht"] * 1.20
-    return devis["montant_ttc"] + 10 * maintenance_ttc_an
+    maintenance_ttc_an = devis["maintenance_ht"] * (1 + MAINTENANCE_TVA)
+    return round(devis["montant_ttc"] + sum(
+        maintenance_ttc_an * (1 + MAINTENANCE_INDEXATION) ** annee for annee in range(10)
+    ), 2)
+
+
+def parser_duree_mois(texte: str | None) -> float | None:
+    """Durée de travaux en mois : '4-5 mois' → 4.5, '~5,5 mois' → 5.5, '20 semaines' → 4.62.
+
+    Chaque nombre prend l'unité qui le suit ('2 mois + 3 semaines' → 2.69) ;
+    une fourchette vaut son milieu, les quantités s'additionnent. Sans unité
+    juste après, le nombre est en mois. None si le texte ne contient aucun
+    nombre.
+    """
+    if not texte:
+        return None
+    quantites = []
+    for debut, fin, unite in _DUREE.findall(texte):
+        valeur = float(debut.replace(",", "."))
+        if fin:
+            valeur = (valeur + float(fin.replace(",", "."))) / 2
+        unite = unite.lower()
+        if unite != "mois":
+            unite = unite.rstrip("s")  # pluriels ; '' (sans unité) reste en mois
+        quantites.append(valeur * MOIS_PAR_UNITE.get(unite, 1))
+    return round(sum(quantites), 2) if quantites else None
+
+
+def normaliser_poids(poids: dict | None = None) -> dict:
+    """Poids des critères, complétés par les défauts et ramenés à une somme de 1.
+
+    Lève ValueError sur un critère inconnu, un poids négatif ou non numérique,
+    ou des poids tous nuls.
+    """
+    complets = dict(POIDS_CRITERES_DEVIS)
+    for nom, valeur in (poids or {}).items():
+        if nom not in CRITERES_DEVIS:
+            raise ValueError(f"critère inconnu : {nom}")
+        try:
+            valeur = float(valeur)
+        except (TypeError, ValueError):
+            raise ValueError(f"poids invalide pour {nom}") from None
+        if not valeur >= 0 or math.isinf(valeur):
+            raise ValueError(f"poids invalide pour {nom}")
+        complets[nom] = valeur
+    total = sum(complets.values())
+    if total <= 0:
+        raise ValueError("au moins un poids doit être positif")
+    return {nom: complets[nom] / total for nom in CRITERES_DEVIS}
+
+
+def _valeurs(devis_list: list[dict]) -> list[list[float]]:
+    """Matrice devis × critères, orientée « plus = mieux ».
+
+    Une valeur manquante prend la pire valeur observée pour ce critère.
+    """
+    colonnes = []
+    for colonne, sens in CRITERES_DEVIS.values():
+        brutes = [d[colonne] for d in devis_list]
+        connues = [sens * v for v in brutes if v is not None]
+        pire = min(connues) if connues else 0
+        colonnes.append([sens * v if v is not None else pire for v in brutes])
+    return [list(ligne) for ligne in zip(*colonnes)]
+
+
+def _ecarts_topsis(valeurs: list[list[float]]) -> tuple[list[list[float]], list[list[float]]]:
+    """Écarts carrés de chaque devis à l'idéal et à l'anti-idéal, critère par critère.
 
+    Avec la normalisation euclidienne de TOPSIS et des poids positifs, l'idéal
+    pondéré vaut poids × meilleure valeur normalisée : les distances pour un
+    vecteur de poids w sont √Σ w_j²·a_ij et √Σ w_j²·b_ij. Les matrices a et b ne
+    dépendent pas des poids et servent à tous les tirages.
+    """
+    colonnes = []
+    for colonne in zip(*valeurs):
+        norme = math.sqrt(sum(v * v for v in colonne)) or 1
+        colonnes.append([v / norme for v in colonne])
+    ideal = [max(c) for c in colonnes]
+    anti = [min(c) for c in colonnes]
+    lignes = list(zip(*colonnes))
+    a = [[(r - i) ** 2 for r, i in zip(ligne, ideal)] for ligne in lignes]
+    b = [[(r - i) ** 2 for r, i in zip(ligne, anti)] for ligne in lignes]
+    return a, b
 
-def get_devis_comparison(conn: sqlite3.Connection) -> dict:
-    """Comparaison structurée des devis avec scores et recommandation."""
+
+def _proximites(a: list[list[float]], b: list[list[float]], carres: list[float]) -> list[float]:
+    """Coefficients de proximité TOPSIS (0 : anti-idéal, 1 : idéal) pour des poids au carré."""
+    scores = []
+    for ai, bi in zip(a, b):
+        plus = math.sqrt(sum(map(mul, carres, ai)))
+        moins = math.sqrt(sum(map(mul, carres, bi)))
+        scores.append(moins / (plus + moins) if plus + moins else 0.5)
+    return scores
+
+
+def _tirages_dirichlet(rng: random.Random, alphas: tuple, nb: int) -> list[list[float]]:
+    """``nb`` vecteurs de poids de loi de Dirichlet(alphas) — uniformes sur le simplexe si tous à 1."""
+    tirages = []
+    for _ in range(nb):
+        g = [rng.gammavariate(alpha, 1) if alpha > 0 else 0.0 for alpha in alphas]
+        total = sum(g) or 1
+        tirages.append([x / total for x in g])
+    return tirages
+
+
+@lru_cache(maxsize=8)
+def _balayer(valeurs: tuple, alphas: tuple, nb_tirages: int, graine: int) -> tuple[list, list]:
+    """Premiers et rangs cumulés de chaque devis sur ``nb_tirages`` vecteurs de poids.
+
+    Traitement par colonnes : tous les tirages d'abord, puis une passe par devis
+    sur l'ensemble des tirages. Mis en cache : les devis changent rarement.
+    """
+    a, b = _ecarts_topsis([list(ligne) for ligne in valeurs])
+    carres = [[x * x for x in w] for w in _tirages_dirichlet(random.Random(graine), alphas, nb_tirages)]
+    par_devis = [
+        [
+            m / (p + m) if p + m else 0.5
+            for p, m in zip(
+                (math.sqrt(sum(map(mul, c, ai))) for c in carres),
+                (math.sqrt(sum(map(mul, c, bi))) for c in carres),
+            )
+        ]
+        for ai, bi in zip(a, b)
+    ]
+    premiers = [0] * len(valeurs)
+    rangs = [0] * len(valeurs)
+    indices = range(len(valeurs))
+    for scores in zip(*par_devis):
+        ordre = sorted(indices, key=scores.__getitem__, reverse=True)
+        premiers[ordre[0]] += 1
+        for rang, i in enumerate(ordre, 1):
+            rangs[i] += rang
+    return premiers, rangs
+
+
+def sensibilite_poids(
+    devis_list: list[dict], poids: dict, recommande: str,
+    nb_tirages: int = SENSIBILITE_TIRAGES, graine: int = 0,
+) -> dict:
+    """Robustesse du classement TOPSIS aux poids des critères.
+
+    Deux balayages de ``nb_tirages`` vecteurs de poids : uniformes sur le
+    simplexe (tous les arbitrages possibles), puis de Dirichlet centrés sur les
+    poids retenus (arbitrages voisins). Pour chacun : part des tirages où
+    chaque devis arrive premier, rang moyen, et part où ``recommande`` gagne.
+    """
+    fournisseurs = [d["fournisseur"] for d in devis_list]
+    valeurs = tuple(tuple(ligne) for ligne in _valeurs(devis_list))
+    balayages = {
+        "global": (1.0,) * len(CRITERES_DEVIS),
+        "local": tuple(SENSIBILITE_CONCENTRATION * len(CRITERES_DEVIS) * poids[c] for c in CRITERES_DEVIS),
+    }
+    resultat = {"nb_tirages": nb_tirages, "recommande": recommande}
+    for nom, alphas in balayages.items():
+        premiers, rangs = _balayer(valeurs, alphas, nb_tirages, graine)
+        premier = {f: round(n / nb_tirages, 4) for f, n in zip(fournisseurs, premiers)}
+        resultat[nom] = {
+            "premier": premier,
+            "rang_moyen": {f: round(r / nb_tirages, 2) for f, r in zip(fournisseurs, rangs)},
+            "robustesse": premier.get(recommande, 0),
+        }
+    return resultat
+
+
+def get_devis_comparison(conn: sqlite3.Connection, poids: dict | None = None) -> dict:
+    """Comparaison structurée des devis avec scores et recommandation.
+
+    Les devis comparables sont classés par TOPSIS sur les colonnes des devis
+    (CRITERES_DEVIS) avec les poids donnés, complétés par POIDS_CRITERES_DEVIS.
+    La recommandation est le devis retenu en base, à défaut le premier du
+    classement ; ``sensibilite`` mesure sa robustesse aux poids.
+    """
+    poids = normaliser_poids(poids)
     devis_list = get_devis_list(conn)
 
     # Tous les devis avec données complètes sont comparables
@@ -33,45 +233,34 @@ def get_devis_comparison(conn: sqlite3.Connection) -> dict:
 
     for d in devis_list:
         d["cout_10ans"] = compute_cout_total_10ans(d)
+        d["duree_mois"] = parser_duree_mois(d["duree_travaux"])
+
+    if not comparables:
+        return {"comparables": [], "reference": reference, "recommande": None,
+                "poids": poids, "classement": [], "sensibilite": None}
+
+    # Scores radar (1-5) : 5 pour le meilleur devis du critère, 1 pour le pire
+    valeurs = _valeurs(comparables)
+    for j, nom in enumerate(CRITERES_DEVIS):
+        colonne = [ligne[j] for ligne in valeurs]
+        pire, meilleur = min(colonne), max(colonne)
+        for d, v in zip(comparables, colonne):
+            d[f"score_{nom}"] = round(1 + 4 * (v - pire) / (meilleur - pire), 1) if meilleur > pire else 5
+
+    a, b = _ecarts_topsis(valeurs)
+    for d, score in zip(comparables, _proximites(a, b, [poids[c] ** 2 for c in CRITERES_DEVIS])):
+        d["score_topsis"] = round(score, 4)
+    classement = sorted(comparables, key=lambda d: -d["score_topsis"])
+    for rang, d in enumerate(classement, 1):
+        d["rang"] = rang
 
-    # Scores radar (1-5) pour les devis comparables
-    for d in comparables:
-        # Prix : moins cher = meilleur score
-        prix_scores = {"MCA": 5, "NSA/AFL": 4, "CEPA": 3, "SIETRAM": 2}
-        d["score_prix"] = prix_scores.get(d["fournisseur"], 3)
-
-        # Capacité
-        d["score_capacite"] = 5 if (d["capacite_kg"] or 0) >= 225 else 3
-
-        # Accessibilité PMR
-        d["score_accessibilite"] = 5 if d["pmr_en81_70"] else 2
-
-        # Rapidité travaux
-        duree = d["duree_travaux"] or ""
-        if "20" in duree or "22" in duree:
-            d["score_rapidite"] = 2
-        elif "5,5" in duree or "5.5" in duree:
-            d["score_rapidite"] = 3
-        elif "4" in duree:
-            d["score_rapidite"] = 5
-        else:
-            d["score_rapidite"] = 4
-
-        # Maintenance (coût annuel — moins = mieux)
-        if d["maintenance_ht"] and d["maintenance_ht"] <= 1620:
-            d["score_maintenance"] = 5
-        elif d["maintenance_ht"] and d["maintenance_ht"] <= 1660:
-            d["score_maintenance"] = 4
-        else:
-            d["score_maintenance"] = 3
-
-        # Niveaux desservis (7 = complet, 6 = partiel)
-        d["score_niveaux"] = 5 if d["niveaux"] == 7 else 3
-
-    recommande = next((d for d in comparables if d["recommande"]), comparables[0])
+    recommande = next((d for d in comparables if d["recommande"]), classement[0])
 
     return {
         "comparables": comparables,
         "reference": reference,
         "recommande": recommande,
+        "poids": poids,
+        "classement": [d["fournisseur"] for d in classement],
+        "sensibilite": sensibilite_poids(comparables, poids, recommande["fournisseur"]),
     }
@@ -0,0 +1,225 @@
+"""Exports tableur (CSV, XLSX) en flux : annuaire, quote-parts, soldes, votes.
+
+Les lignes sont lues par blocs de EXPORT_LIGNES_PAR_BLOC sur le curseur
+SQLite et chaque bloc est encodé puis envoyé aussitôt : la mémoire utilisée
+ne dépend pas du nombre de lignes.
+
+Le XLSX est écrit directement (archive ZIP en flux, feuille en XML avec
+chaînes en ligne) : une bibliothèque comme openpyxl, même en mode
+write-only, ne produit le fichier qu'à la sauvegarde et ne peut donc pas
+l'envoyer au fil de l'eau.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import math
+import re
+import sqlite3
+import zipfile
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from ..config import EXPORT_LIGNES_PAR_BLOC
+
+# Nom → requête ; l'ordre des lignes est celui des vues
+EXPORTS = {
+    "annuaire": "SELECT * FROM v_annuaire",
+    "quoteparts": "SELECT * FROM v_quotepart_par_devis",
+    "soldes": "SELECT * FROM v_solde_lot",
+    "votes": """SELECT vs.lot_id, l.numero AS lot_numero, b.code AS batiment, l.etage,
+                      l.localisation, l.tantiemes, l.coef_ascenseur, l.tantieme_ascenseur,
+                      (SELECT GROUP_CONCAT(DISTINCT p.nom_complet)
+                       FROM lot_personne lp JOIN personne p ON lp.personne_id = p.id
+                       WHERE lp.lot_id = l.id AND lp.role = 'proprietaire' AND lp.actif = 1
+                      ) AS proprietaire,
+                      vs.vote, vs.confiance, vs.argument_cle, vs.contact_fait,
+                      vs.date_contact, vs.modifie_le
+               FROM vote_simulation vs
+               JOIN lot l ON vs.lot_id = l.id
+               JOIN batiment b ON l.batiment_id = b.id
+               ORDER BY b.code, l.etage, l.localisation""",
+}
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def ouvrir_export(conn: sqlite3.Connection, nom: str) -> tuple[list[str], Iterator[tuple]]:
+    """Exécute l'export ``nom`` : (colonnes, lignes lues par blocs sur le curseur)."""
+    curseur = conn.execute(EXPORTS[nom])
+    colonnes = [d[0] for d in curseur.description]
+
+    def lignes():
+        while True:
+            bloc = curseur.fetchmany(EXPORT_LIGNES_PAR_BLOC)
+            if not bloc:
+                return
+            yield from (tuple(r) for r in bloc)
+
+    return colonnes, lignes()
+
+
+def _blocs(lignes: Iterable[tuple]) -> Iterator[list[tuple]]:
+    bloc = []
+    for ligne in lignes:
+        bloc.append(ligne)
+        if len(bloc) >= EXPORT_LIGNES_PAR_BLOC:
+            yield bloc
+            bloc = []
+    if bloc:
+        yield bloc
+
+
+# ── CSV ──────────────────────────────────────────────────────
+
+def flux_csv(colonnes: list[str], lignes: Iterable[tuple]) -> Iterator[bytes]:
+    """CSV UTF-8 avec BOM (reconnu par Excel), un morceau par bloc de lignes."""
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    ecrivain.writerow(colonnes)
+    yield ("\ufeff" + tampon.getvalue()).encode("utf-8")
+    for bloc in _blocs(lignes):
+        tampon.seek(0)
+        tampon.truncate()
+        ecrivain.writerows(bloc)
+        yield tampon.getvalue().encode("utf-8")
+
+
+# ── XLSX ─────────────────────────────────────────────────────
+
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_PARTIES_XLSX = {
+    "[Content_Types].xml": (
+        _XML + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        _XML + f'<Relationships xmlns="{_NS_PKG}">'
+        f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        _XML + f'<Relationships xmlns="{_NS_PKG}">'
+        f'<Relationship Id="rId1" Type="{_NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+        "</Relationships>"
+    ),
+    # Style 1 : en-tête en gras
+    "xl/styles.xml": (
+        _XML + f'<styleSheet xmlns="{_NS}">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        "</styleSheet>"
+    ),
+}
+
+# Caractères de contrôle interdits en XML 1.0
+_INTERDITS_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _Tampon:
+    """Fichier en écriture non positionnable : zipfile y écrit, le flux le vide."""
+
+    def __init__(self) -> None:
+        self._morceaux: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._morceaux.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def vider(self) -> bytes:
+        data = b"".join(self._morceaux)
+        self._morceaux.clear()
+        return data
+
+
+def _lettre_colonne(i: int) -> str:
+    """0 → A, 25 → Z, 26 → AA."""
+    lettres = ""
+    i += 1
+    while i:
+        i, reste = divmod(i - 1, 26)
+        lettres = chr(65 + reste) + lettres
+    return lettres
+
+
+def _cellule(ref: str, valeur, style: str = "") -> str:
+    if valeur is None:
+        return ""
+    if isinstance(valeur, int) and not isinstance(valeur, bool) or (
+        isinstance(valeur, float) and math.isfinite(valeur)
+    ):
+        return f'<c r="{ref}"{style}><v>{valeur!r}</v></c>'
+    texte = escape(_INTERDITS_XML.sub("", str(valeur)))
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{texte}</t></is></c>'
+
+
+def _ligne_xml(numero: int, lettres: list[str], valeurs, style: str = "") -> str:
+    cellules = "".join(_cellule(f"{l}{numero}", v, style) for l, v in zip(lettres, valeurs))
+    return f'<row r="{numero}">{cellules}</row>'
+
+
+def flux_xlsx(
+    colonnes: list[str], lignes: Iterable[tuple], feuille: str = "Export"
+) -> Iterator[bytes]:
+    """Classeur XLSX d'une feuille, écrit en flux (archive ZIP sans retour en arrière)."""
+    lettres = [_lettre_colonne(i) for i in range(len(colonnes))]
+    tampon = _Tampon()
+    with zipfile.ZipFile(tampon, "w", zipfile.ZIP_DEFLATED) as archive:
+        for nom, contenu in _PARTIES_XLSX.items():
+            archive.writestr(nom, contenu)
+        archive.writestr("xl/workbook.xml", (
+            _XML + f'<workbook xmlns="{_NS}" xmlns:r="{_NS_REL}"><sheets>'
+            f'<sheet name="{escape(feuille[:31])}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        yield tampon.vider()
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as fichier:
+            fichier.write((
+                _XML + f'<worksheet xmlns="{_NS}"><sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                "</sheetView></sheetViews><sheetData>"
+                + _ligne_xml(1, lettres, colonnes, ' s="1"')
+            ).encode("utf-8"))
+            numero = 1
+            for bloc in _blocs(lignes):
+                xml = []
+                for valeurs in bloc:
+                    numero += 1
+                    xml.append(_ligne_xml(numero, lettres, valeurs))
+                fichier.write("".join(xml).encode("utf-8"))
+                yield tampon.vider()
+            fichier.write(b"</sheetData></worksheet>")
+    yield tampon.vider()
+
+
+def flux_export(
+    colonnes: list[str], lignes: Iterable[tuple], format_: str, feuille: str
+) -> Iterator[bytes]:
+    """Flux du fichier au ``format_`` demandé (clé de FORMATS)."""
+    if format_ == "xlsx":
+        return flux_xlsx(colonnes, lignes, feuille)
+    return flux_csv(colonnes, lignes)
@@ -0,0 +1,242 @@
+"""Financement des quote-parts : prêts amortissables, maintenance indexée, VAN.
+
+Un prêt à échéances constantes est linéaire en son capital : l'échéancier
+d'une quote-part est celui d'un capital de 1 € multiplié par la quote-part
+(seuls les frais de dossier fixes s'y ajoutent). Les facteurs unitaires sont
+calculés une fois par (prêt, taux, durée) ; la grille lots × devis × prêts ×
+taux × durées n'est ensuite qu'un produit par cellule.
+
+Chaque copropriétaire paie sa quote-part et sa part de maintenance TTC au
+prorata de ses tantièmes ascenseur. La VAN actualise au taux
+TAUX_ACTUALISATION les échéances mensuelles, les frais (à la signature) et
+la maintenance (en fin d'année, révisée de MAINTENANCE_INDEXATION par an)
+sur HORIZON_FINANCEMENT_ANS.
+"""
+from __future__ import annotations
+
+import sqlite3
+from functools import lru_cache
+
+from ..config import (
+    FINANCEMENT_DEFAUT, FINANCEMENT_DUREES_ANS, FINANCEMENT_PRETS, FINANCEMENT_TAUX,
+    HORIZON_FINANCEMENT_ANS, MAINTENANCE_INDEXATION, MAINTENANCE_TVA, TAUX_ACTUALISATION,
+)
+from .colonnes import en_colonnes
+from .devis import get_devis_list
+from .simulation import calculer_repartition
+
+CHAMPS_FINANCEMENT = [
+    "lot_id", "devis_id", "pret", "taux", "duree_ans", "mensualite",
+    "cout_credit", "frais", "van",
+]
+DUREE_MAX_ANS = 30
+TAUX_MAX = 0.20
+
+
+def _taux_mensuel(taux_annuel: float) -> float:
+    """Taux mensuel équivalent (actuariel) à un taux annuel."""
+    return (1 + taux_annuel) ** (1 / 12) - 1
+
+
+def _annuite(taux_mensuel: float, nb: int) -> float:
+    """Échéance constante remboursant 1 € en ``nb`` mois."""
+    if not taux_mensuel:
+        return 1 / nb
+    return taux_mensuel / (1 - (1 + taux_mensuel) ** -nb)
+
+
+def _valeur_rente(taux_mensuel: float, nb: int) -> float:
+    """Valeur actuelle de ``nb`` versements mensuels de 1 € (fin de mois)."""
+    if not taux_mensuel:
+        return float(nb)
+    return (1 - (1 + taux_mensuel) ** -nb) / taux_mensuel
+
+
+@lru_cache(maxsize=128)
+def facteurs_unitaires(pret: str, taux: float, duree_ans: int) -> dict:
+    """Mensualité, coût du crédit et VAN d'un capital de 1 €, hors frais fixes.
+
+    Taux nominal annuel (taux mensuel = taux / 12, usage des prêts
+    immobiliers) ; assurance mensuelle constante sur le capital initial.
+    """
+    conditions = FINANCEMENT_PRETS[pret]
+    nb = 12 * duree_ans
+    mensualite = _annuite(taux / 12, nb) + conditions["assurance"] / 12
+    return {
+        "mensualite": mensualite,
+        "cout_credit": mensualite * nb - 1 + conditions["frais_pct"],
+        "van": mensualite * _valeur_rente(_taux_mensuel(TAUX_ACTUALISATION), nb) + conditions["frais_pct"],
+    }
+
+
+@lru_cache(maxsize=1)
+def facteur_maintenance() -> float:
+    """VAN sur l'horizon d'une maintenance de 1 €/an la première année, indexée."""
+    return sum(
+        (1 + MAINTENANCE_INDEXATION) ** (annee - 1) / (1 + TAUX_ACTUALISATION) ** annee
+        for annee in range(1, HORIZON_FINANCEMENT_ANS + 1)
+    )
+
+
+@lru_cache(maxsize=64)
+def _echeancier_unitaire(pret: str, taux: float, duree_ans: int) -> tuple[tuple[float, ...], ...]:
+    """Échéancier annuel d'un capital de 1 € : (intérêts, capital, assurance, restant) par année."""
+    conditions = FINANCEMENT_PRETS[pret]
+    i = taux / 12
+    nb = 12 * duree_ans
+    echeance = _annuite(i, nb)
+    assurance = conditions["assurance"] / 12
+    restant = 1.0
+    annees = []
+    for _ in range(duree_ans):
+        interets = capital = 0.0
+        for _ in range(12):
+            interet = restant * i
+            interets += interet
+            capital += echeance - interet
+            restant -= echeance - interet
+        annees.append((interets, capital, 12 * assurance, max(restant, 0.0)))
+    return tuple(annees)
+
+
+def parts_ascenseur(conn: sqlite3.Connection) -> list[tuple[int, int, float]]:
+    """(lot_id, numéro, part des tantièmes ascenseur) des lots payeurs."""
+    repartition = calculer_repartition(conn, 0)
+    total = sum(r["tantieme_ascenseur"] for r in repartition)
+    if not total:
+        return []
+    return [
+        (r["lot_id"], r["lot_numero"], r["tantieme_ascenseur"] / total)
+        for r in repartition if r["tantieme_ascenseur"] > 0
+    ]
+
+
+def devis_comparables(conn: sqlite3.Connection) -> list[dict]:
+    """Devis comparables (montant et maintenance connus) avec leur maintenance TTC annuelle."""
+    return [
+        {
+            "devis_id": d["id"], "fournisseur": d["fournisseur"], "montant_ttc": d["montant_ttc"],
+            "maintenance_ttc": round(d["maintenance_ht"] * (1 + MAINTENANCE_TVA), 2),
+        }
+        for d in get_devis_list(conn) if d["montant_ttc"] and d["maintenance_ht"] is not None
+    ]
+
+
+def parametres_financement() -> dict:
+    """Hypothèses de calcul, renvoyées avec chaque résultat."""
+    return {
+        "taux": list(FINANCEMENT_TAUX),
+        "durees_ans": list(FINANCEMENT_DUREES_ANS),
+        "prets": FINANCEMENT_PRETS,
+        "defaut": FINANCEMENT_DEFAUT,
+        "maintenance_tva": MAINTENANCE_TVA,
+        "maintenance_indexation": MAINTENANCE_INDEXATION,
+        "taux_actualisation": TAUX_ACTUALISATION,
+        "horizon_ans": HORIZON_FINANCEMENT_ANS,
+    }
+
+
+def grille_financement(conn: sqlite3.Connection) -> dict:
+    """Financement de chaque lot payeur pour chaque devis, prêt, taux et durée.
+
+    ``lignes`` (en colonnes, CHAMPS_FINANCEMENT) : mensualité assurance
+    comprise, coût du crédit (intérêts, assurance, frais), frais à la
+    signature et VAN de l'ensemble des décaissements, maintenance comprise.
+    ``lots`` donne par lot et par devis la quote-part, la maintenance de la
+    première année et la VAN d'un paiement comptant, pour comparaison.
+    """
+    parts = parts_ascenseur(conn)
+    devis = devis_comparables(conn)
+    f_maintenance = facteur_maintenance()
+    combinaisons = [
+        (pret, taux, duree, facteurs_unitaires(pret, taux, duree), FINANCEMENT_PRETS[pret]["frais_fixes"])
+        for pret in FINANCEMENT_PRETS for taux in FINANCEMENT_TAUX for duree in FINANCEMENT_DUREES_ANS
+    ]
+
+    lignes = []
+    lots = []
+    for lot_id, numero, part in parts:
+        for d in devis:
+            qp = d["montant_ttc"] * part
+            maintenance = d["maintenance_ttc"] * part
+            van_maintenance = maintenance * f_maintenance
+            lots.append({
+                "lot_id": lot_id, "lot_numero": numero, "devis_id": d["devis_id"],
+                "quote_part": round(qp, 2), "maintenance_an1": round(maintenance, 2),
+                "van_comptant": round(qp + van_maintenance, 2),
+            })
+            for pret, taux, duree, f, frais_fixes in combinaisons:
+                lignes.append({
+                    "lot_id": lot_id, "devis_id": d["devis_id"], "pret": pret,
+                    "taux": taux, "duree_ans": duree,
+                    "mensualite": round(qp * f["mensualite"], 2),
+                    "cout_credit": round(qp * f["cout_credit"] + frais_fixes, 2),
+                    "frais": round(qp * FINANCEMENT_PRETS[pret]["frais_pct"] + frais_fixes, 2),
+                    "van": round(qp * f["van"] + frais_fixes + van_maintenance, 2),
+                })
+
+    return {
+        "parametres": parametres_financement(),
+        "devis": devis,
+        "lots": en_colonnes(lots, ["lot_id", "lot_numero", "devis_id", "quote_part",
+                                   "maintenance_an1", "van_comptant"]),
+        "lignes": en_colonnes(lignes, CHAMPS_FINANCEMENT),
+    }
+
+
+def lire_conditions(pret: str | None, taux, duree_ans) -> tuple[str, float, int]:
+    """Valide un prêt, un taux et une durée (défauts : FINANCEMENT_DEFAUT). Lève ValueError."""
+    pret = pret or FINANCEMENT_DEFAUT["pret"]
+    if pret not in FINANCEMENT_PRETS:
+        raise ValueError(f"prêt inconnu : {pret}")
+    try:
+        taux = float(FINANCEMENT_DEFAUT["taux"] if taux is None else taux)
+        duree_ans = int(FINANCEMENT_DEFAUT["duree_ans"] if duree_ans is None else duree_ans)
+    except (TypeError, ValueError):
+        raise ValueError("taux ou durée invalide") from None
+    if not 0 <= taux <= TAUX_MAX:
+        raise ValueError(f"taux hors de [0, {TAUX_MAX}]")
+    if not 1 <= duree_ans <= DUREE_MAX_ANS:
+        raise ValueError(f"durée hors de [1, {DUREE_MAX_ANS}] ans")
+    return pret, taux, duree_ans
+
+
+def echeancier_lot(
+    conn: sqlite3.Connection, lot_id: int, devis_id: int, pret: str, taux: float, duree_ans: int
+) -> dict | None:
+    """Tableau d'amortissement annuel d'un lot pour un devis, avec sa maintenance indexée.
+
+    None si le lot ne paie pas l'ascenseur ou si le devis est inconnu.
+    """
+    part = next((p for l_id, _, p in parts_ascenseur(conn) if l_id == lot_id), None)
+    d = next((d for d in devis_comparables(conn) if d["devis_id"] == devis_id), None)
+    if part is None or d is None:
+        return None
+    qp = d["montant_ttc"] * part
+    maintenance = d["maintenance_ttc"] * part
+    f = facteurs_unitaires(pret, taux, duree_ans)
+    conditions = FINANCEMENT_PRETS[pret]
+    annees = []
+    for annee, (interets, capital, assurance, restant) in enumerate(
+        _echeancier_unitaire(pret, taux, duree_ans), 1
+    ):
+        maintenance_annee = maintenance * (1 + MAINTENANCE_INDEXATION) ** (annee - 1)
+        annees.append({
+            "annee": annee,
+            "echeances": round(qp * (interets + capital + assurance), 2),
+            "interets": round(qp * interets, 2),
+            "capital": round(qp * capital, 2),
+            "assurance": round(qp * assurance, 2),
+            "capital_restant": round(qp * restant, 2),
+            "maintenance": round(maintenance_annee, 2),
+        })
+    return {
+        "lot_id": lot_id, "devis_id": devis_id, "fournisseur": d["fournisseur"],
+        "pret": pret, "taux": taux, "duree_ans": duree_ans,
+        "quote_part": round(qp, 2),
+        "mensualite": round(qp * f["mensualite"], 2),
+        "frais": round(qp * conditions["frais_pct"] + conditions["frais_fixes"], 2),
+        "cout_credit": round(qp * f["cout_credit"] + conditions["frais_fixes"], 2),
+        "van": round(qp * f["van"] + conditions["frais_fixes"] + maintenance * facteur_maintenance(), 2),
+        "annees": annees,
+    }
@@ -0,0 +1,171 @@
+"""Imputation des tantièmes ascenseur manquants.
+
+Un lot desservi (coef_ascenseur > 0) sans tantieme_ascenseur reçoit une
+estimation. Le modèle est un ratio tantième ascenseur / tantièmes généraux,
+ajusté en une passe sur tous les lots connus des bâtiments à ascenseur, du
+plus précis au plus général :
+
+- ``ratio_coef`` : ratio moyen des lots de même coefficient ;
+- ``ratio_etage`` : ratio moyen des lots du même étage ;
+- ``modele_coef`` : ratio proportionnel au coefficient (ratio = k × coef,
+  moindres carrés sur tous les lots connus) ;
+- ``mediane_coef`` : sans tantièmes généraux, médiane des tantièmes
+  ascenseur des lots de même coefficient (à défaut, de tous).
+
+Un groupe doit compter au moins MIN_REFERENCES lots. L'incertitude est
+l'écart-type des ratios du groupe (résidus pour ``modele_coef``) ramené aux
+tantièmes du lot. Les estimations sont stockées dans tantieme_estime
+(008) et relues tant qu'aucun lot n'a changé (tantieme_estime_etat, 013) ;
+après une modification, la première lecture les ré-estime et met leur
+écriture en file (brancher_ecriture).
+"""
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+from statistics import median, pstdev
+
+from ..config import BATIMENTS_ASCENSEUR
+from ..ecriture import FileEcriture
+
+METHODES = ("ratio_coef", "ratio_etage", "modele_coef", "mediane_coef")
+MIN_REFERENCES = 2
+
+_ECRITURE: FileEcriture | None = None
+_EN_FILE = threading.Lock()  # tenu tant qu'une imputation attend son commit
+
+
+def _lots(conn: sqlite3.Connection) -> list:
+    return conn.execute(
+        f"""SELECT l.id, l.etage, l.tantiemes, l.coef_ascenseur, l.tantieme_ascenseur
+            FROM lot l JOIN batiment b ON l.batiment_id = b.id
+            WHERE b.code IN ({",".join("?" * len(BATIMENTS_ASCENSEUR))})""",
+        sorted(BATIMENTS_ASCENSEUR),
+    ).fetchall()
+
+
+def _manquant(lot) -> bool:
+    """Lot desservi dont le tantième ascenseur n'est pas renseigné."""
+    return (lot["coef_ascenseur"] or 0) > 0 and not lot["tantieme_ascenseur"]
+
+
+def _ecart_type(valeurs: list[float]) -> float:
+    return pstdev(valeurs) if len(valeurs) > 1 else 0.0
+
+
+def estimer_tantiemes(conn: sqlite3.Connection) -> dict[int, dict]:
+    """Estime en une passe tous les tantièmes ascenseur manquants.
+
+    Retourne lot_id → {"valeur", "methode", "incertitude", "nb_references"}.
+    Un lot manquant est absent du résultat si aucun lot n'est connu.
+    """
+    lots = _lots(conn)
+    connus = [
+        l for l in lots
+        if l["tantieme_ascenseur"] and l["tantieme_ascenseur"] > 0
+        and (l["tantiemes"] or 0) > 0 and (l["coef_ascenseur"] or 0) > 0
+    ]
+    manquants = [l for l in lots if _manquant(l)]
+    if not connus or not manquants:
+        return {}
+
+    par_coef: dict = {}
+    par_etage: dict = {}
+    for l in connus:
+        ratio = l["tantieme_ascenseur"] / l["tantiemes"]
+        par_coef.setdefault(l["coef_ascenseur"], []).append(ratio)
+        par_etage.setdefault(l["etage"], []).append(ratio)
+    # ratio = k × coef : k = Σ r·c / Σ c², résidus r − k·c
+    k = (sum(l["tantieme_ascenseur"] / l["tantiemes"] * l["coef_ascenseur"] for l in connus)
+         / sum(l["coef_ascenseur"] ** 2 for l in connus))
+    residus = [l["tantieme_ascenseur"] / l["tantiemes"] - k * l["coef_ascenseur"] for l in connus]
+    ta_par_coef: dict = {}
+    for l in connus:
+        ta_par_coef.setdefault(l["coef_ascenseur"], []).append(l["tantieme_ascenseur"])
+
+    estimations = {}
+    for l in manquants:
+        tantiemes = l["tantiemes"] or 0
+        coef = l["coef_ascenseur"]
+        if tantiemes <= 0:
+            references = ta_par_coef.get(coef, [])
+            if len(references) < MIN_REFERENCES:
+                references = [c["tantieme_ascenseur"] for c in connus]
+            valeur, ecart, methode = median(references), _ecart_type(references), "mediane_coef"
+        elif len(par_coef.get(coef, [])) >= MIN_REFERENCES:
+            references = par_coef[coef]
+            ratio = sum(references) / len(references)
+            valeur, ecart, methode = tantiemes * ratio, tantiemes * _ecart_type(references), "ratio_coef"
+        elif len(par_etage.get(l["etage"], [])) >= MIN_REFERENCES:
+            references = par_etage[l["etage"]]
+            ratio = sum(references) / len(references)
+            valeur, ecart, methode = tantiemes * ratio, tantiemes * _ecart_type(references), "ratio_etage"
+        else:
+            references = connus
+            valeur = tantiemes * k * coef
+            ecart = tantiemes * math.sqrt(sum(r * r for r in residus) / len(residus))
+            methode = "modele_coef"
+        estimations[l["id"]] = {
+            "valeur": round(valeur, 1),
+            "methode": methode,
+            "incertitude": round(ecart, 1),
+            "nb_references": len(references),
+        }
+    return estimations
+
+
+def brancher_ecriture(ecriture: FileEcriture) -> None:
+    """Fait persister par ``ecriture`` les estimations trouvées invalidées à la lecture.
+
+    Sans file d'écriture (export statique), elles sont ré-estimées en mémoire
+    à chaque lecture jusqu'à la prochaine imputation.
+    """
+    global _ECRITURE
+    _ECRITURE = ecriture
+
+
+def _mettre_en_file() -> None:
+    """Soumet imputer_tantiemes à la file d'écriture, une seule fois à la fois."""
+    if _ECRITURE is None or not _EN_FILE.acquire(blocking=False):
+        return
+    try:
+        futur = _ECRITURE.soumettre(imputer_tantiemes)
+    except BaseException:
+        _EN_FILE.release()
+        raise
+    futur.add_done_callback(lambda _: _EN_FILE.release())
+
+
+def tantiemes_estimes(conn: sqlite3.Connection) -> dict[int, dict]:
+    """Estimations stockées ; si un lot a changé depuis, ré-estimées en mémoire.
+
+    Lecture seule : la table est réécrite par imputer_tantiemes, mise en file
+    d'écriture à la première lecture qui la trouve invalidée.
+    """
+    etat = conn.execute("SELECT a_jour FROM tantieme_estime_etat WHERE id = 1").fetchone()
+    if etat and etat[0]:  # table vide : aucun lot manquant
+        rows = conn.execute(
+            "SELECT lot_id, valeur, methode, incertitude, nb_references FROM tantieme_estime"
+        ).fetchall()
+        return {r["lot_id"]: {k: r[k] for k in r.keys() if k != "lot_id"} for r in rows}
+    _mettre_en_file()
+    return estimer_tantiemes(conn)
+
+
+# Mutation (sans commit : l'appelant valide la transaction)
+
+def imputer_tantiemes(conn: sqlite3.Connection) -> int:
+    """Recalcule et stocke les estimations de tous les lots manquants. Retourne leur nombre."""
+    estimations = estimer_tantiemes(conn)
+    conn.execute("DELETE FROM tantieme_estime")
+    conn.executemany(
+        """INSERT INTO tantieme_estime (lot_id, valeur, methode, incertitude, nb_references)
+           VALUES (?, ?, ?, ?, ?)""",
+        [
+            (lot_id, e["valeur"], e["methode"], e["incertitude"], e["nb_references"])
+            for lot_id, e in estimations.items()
+        ],
+    )
+    conn.execute("UPDATE tantieme_estime_etat SET a_jour = 1 WHERE id = 1")
+    return len(estimations)
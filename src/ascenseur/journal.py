@@ -0,0 +1,172 @@
+"""Historique de la simulation de vote : journal des changements et progression."""
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from .votes import VOTES, resultats_depuis_agregats
+
+# Doit correspondre au modulo du trigger trg_vote_journal_point_controle (007)
+POINT_CONTROLE_TOUS_LES = 256
+
+PAS_PROGRESSION = {
+    "heure": timedelta(hours=1),
+    "jour": timedelta(days=1),
+    "semaine": timedelta(weeks=1),
+}
+PROGRESSION_POINTS_MAX = 1000
+
+
+def _iso(dt: datetime) -> str:
+    """Format des horodatages du journal (UTC, millisecondes)."""
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def lire_horodatage(valeur: str) -> str:
+    """Normalise un horodatage ISO 8601 reçu en paramètre. Lève ValueError."""
+    dt = datetime.fromisoformat(valeur.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return _iso(dt)
+
+
+def _appliquer(agregats: dict, entree) -> None:
+    """Rejoue une entrée du journal sur des agrégats (bat, vote, confiance, contact)."""
+    tantiemes = entree["tantiemes"] or 0
+    for signe, vote, confiance, contact in (
+        (-1, entree["ancien_vote"], entree["ancienne_confiance"], entree["ancien_contact"]),
+        (1, entree["nouveau_vote"], entree["nouvelle_confiance"], entree["nouveau_contact"]),
+    ):
+        if vote is None:  # insertion (pas d'ancien état) ou suppression (pas de nouveau)
+            continue
+        cle = (entree["batiment"], vote, confiance, contact)
+        cellule = agregats.setdefault(cle, [0, 0])
+        cellule[0] += signe
+        cellule[1] += signe * tantiemes
+        if cellule[0] == 0:
+            del agregats[cle]
+
+
+def _point_controle(conn: sqlite3.Connection, horodatage: str):
+    """Dernier point de contrôle au plus tard à ``horodatage`` : (journal_id, agrégats)."""
+    row = conn.execute(
+        """SELECT journal_id, agregats FROM vote_point_controle
+           WHERE horodatage <= ? ORDER BY journal_id DESC LIMIT 1""",
+        (horodatage,),
+    ).fetchone()
+    if row is None:
+        return None, None
+    agregats = {tuple(c[:4]): [c[4], c[5]] for c in json.loads(row["agregats"])}
+    return row["journal_id"], agregats
+
+
+def _entrees(conn: sqlite3.Connection, apres_id: int, jusqua: str):
+    return conn.execute(
+        """SELECT id, horodatage, batiment, tantiemes, ancien_vote, nouveau_vote,
+                  ancienne_confiance, nouvelle_confiance, ancien_contact, nouveau_contact
+           FROM vote_journal
+           WHERE id > ? AND horodatage <= ?
+           ORDER BY id""",
+        (apres_id, jusqua),
+    )
+
+
+def _resultats(agregats: dict) -> dict:
+    """Résultats de vote (forme de calculer_resultats) + contacts, depuis les agrégats."""
+    par_vote: dict = {}
+    contactes = [0, 0]
+    for (bat, vote, confiance, contact), (nb, tantiemes) in agregats.items():
+        cellule = par_vote.setdefault((bat, vote, confiance), [0, 0])
+        cellule[0] += nb
+        cellule[1] += tantiemes
+        if contact:
+            contactes[0] += nb
+            contactes[1] += tantiemes
+    resultats = resultats_depuis_agregats(par_vote)
+    resultats["contactes"] = {"nb": contactes[0], "tantiemes": contactes[1]}
+    return resultats
+
+
+def etat_a(conn: sqlite3.Connection, horodatage: str) -> dict | None:
+    """Résultats de la simulation tels qu'ils étaient à ``horodatage``.
+
+    Part du dernier point de contrôle antérieur et rejoue les seuls changements
+    écrits depuis. None si la date précède le début du journal.
+    """
+    journal_id, agregats = _point_controle(conn, horodatage)
+    if agregats is None:
+        return None
+    for entree in _entrees(conn, journal_id, horodatage):
+        _appliquer(agregats, entree)
+    return _resultats(agregats)
+
+
+def progression(
+    conn: sqlite3.Connection, debut: str | None = None, fin: str | None = None, pas: str = "jour"
+) -> dict:
+    """Série temporelle des tantièmes par vote et des contacts, un point par pas.
+
+    Chaque point est l'état à la fin de son intervalle. Le premier est obtenu
+    depuis un point de contrôle, les suivants en avançant dans le journal :
+    une seule passe sur les changements de la période. Retourne des colonnes
+    (une liste par grandeur) prêtes pour un graphique.
+    """
+    delta = PAS_PROGRESSION[pas]
+    if debut is None:
+        row = conn.execute("SELECT MIN(horodatage) FROM vote_point_controle").fetchone()
+        debut = row[0]
+    if fin is None:
+        fin = _iso(datetime.now(timezone.utc))
+    series: dict = {
+        "horodatages": [], "pour": [], "contre": [], "abstention": [], "absent": [],
+        "inconnu": [], "contactes": [], "tantiemes_contactes": [], "modifications": [],
+    }
+    if debut is None or debut > fin:
+        return {"pas": pas, "debut": debut, "fin": fin, **series}
+
+    t0 = datetime.fromisoformat(debut.replace("Z", "+00:00"))
+    t1 = datetime.fromisoformat(fin.replace("Z", "+00:00"))
+    nb_points = max(1, math.ceil((t1 - t0) / delta))
+    if nb_points > PROGRESSION_POINTS_MAX:
+        raise ValueError(f"plus de {PROGRESSION_POINTS_MAX} points : élargir le pas")
+    bornes = [min(_iso(t0 + delta * (i + 1)), fin) for i in range(nb_points)]
+
+    journal_id, agregats = _point_controle(conn, debut)
+    if agregats is None:  # début antérieur au journal : premier point de contrôle
+        row = conn.execute(
+            "SELECT journal_id, horodatage FROM vote_point_controle ORDER BY journal_id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return {"pas": pas, "debut": debut, "fin": fin, **series}
+        journal_id, agregats = _point_controle(conn, row["horodatage"])
+
+    entrees = iter(_entrees(conn, journal_id, fin))
+    entree = next(entrees, None)
+    for borne in bornes:
+        nb_modifs = 0
+        while entree is not None and entree["horodatage"] <= borne:
+            _appliquer(agregats, entree)
+            if entree["horodatage"] > debut:
+                nb_modifs += 1
+            entree = next(entrees, None)
+        resultats = _resultats(agregats)
+        series["horodatages"].append(borne)
+        for vote in VOTES:
+            series[vote].append(resultats["totaux"].get(vote, {}).get("tantiemes", 0))
+        series["contactes"].append(resultats["contactes"]["nb"])
+        series["tantiemes_contactes"].append(resultats["contactes"]["tantiemes"])
+        series["modifications"].append(nb_modifs)
+    return {"pas": pas, "debut": debut, "fin": fin, **series}
+
+
+def get_journal_lot(conn: sqlite3.Connection, lot_id: int) -> list[dict]:
+    """Historique des changements d'un lot, du plus récent au plus ancien."""
+    rows = conn.execute(
+        """SELECT id, horodatage, auteur, ancien_vote, nouveau_vote,
+                  ancienne_confiance, nouvelle_confiance, ancien_contact, nouveau_contact
+           FROM vote_journal WHERE lot_id = ? ORDER BY id DESC""",
+        (lot_id,),
+    ).fetchall()
+    return [dict(r) for r in rows]
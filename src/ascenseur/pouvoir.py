@@ -0,0 +1,307 @@
+"""Indices de pouvoir des propriétaires indécis (Banzhaf, Shapley–Shubik).
+
+Les lots dont la confiance est « certain » sont acquis : leurs tantièmes
+« pour » s'ajoutent d'office, les autres votes certains sont hors jeu. Les
+autres lots, regroupés par propriétaire (un propriétaire vote d'un bloc pour
+tous ses lots), sont les joueurs d'un jeu de vote pondéré dont le quota est le
+seuil visé (majorité art.25, passerelle) moins les tantièmes acquis.
+
+Un joueur de poids w est décisif pour une coalition S des autres si
+quota − w ≤ poids(S) < quota. Pour un petit jeu, on compte exactement ces
+coalitions, par taille, avec la fonction génératrice Π (1 + y·x^w) tronquée
+au quota :
+
+- Banzhaf : nombre de coalitions où le joueur est décisif / 2^(n−1) ;
+- Shapley–Shubik : même compte pondéré par k!(n−1−k)!/n! (k = taille de S).
+
+Le polynôme en x de chaque taille k est rangé dans un entier Python, un
+coefficient par tranche de B bits : ajouter ou retirer un joueur revient à
+des décalages et additions d'entiers, faits en C. Les comptes « sans le
+joueur i » s'obtiennent en divisant le produit par (1 + y·x^w), une fois par
+poids distinct, sans recalculer le produit.
+
+Ce calcul coûte O(n²·quota) tranches de ~n bits et reste exact jusqu'à
+quelques centaines de joueurs. Au-delà de POUVOIR_BITS_EXACT_MAX, on
+abandonne les tailles et le résultat est marqué « approche ». Banzhaf est la
+probabilité d'être décisif quand chaque autre joueur vote « pour » à pile ou
+face : la loi de poids(S), Π ((1 + x^w)/2), se calcule en virgule fixe (62
+bits par tranche) en O(n·quota), et celle sans le joueur i s'en déduit par
+fenêtres de largeur w. Shapley–Shubik est l'intégrale sur p ∈ [0, 1] de la
+même probabilité quand chacun vote « pour » avec la probabilité p (extension
+multilinéaire d'Owen) ; la loi de poids(S) y est approchée par une loi
+normale, puis les indices ramenés à une somme de 1.
+"""
+from __future__ import annotations
+
+import math
+import sqlite3
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate
+from math import comb, factorial
+
+from ..config import (
+    MAJORITE_ART25, POUVOIR_BITS_EXACT_MAX, POUVOIR_NOEUDS_SHAPLEY, SEUIL_PASSERELLE,
+)
+
+SEUILS_POUVOIR = {
+    "art25": MAJORITE_ART25,
+    "passerelle": SEUIL_PASSERELLE,
+}
+
+
+def _somme_tranches(valeur: int, nb: int, b: int) -> int:
+    """Somme des ``nb`` tranches de ``b`` bits d'un entier (somme < 2^b).
+
+    Replie la moitié haute sur la moitié basse : log2(nb) passes linéaires,
+    bien moins coûteux qu'une réduction modulo 2^b − 1.
+    """
+    while nb > 1:
+        moitie = nb // 2
+        valeur = (valeur & ((1 << (moitie * b)) - 1)) + (valeur >> (moitie * b))
+        nb -= moitie
+    return valeur
+
+
+def _gauss_legendre(m: int) -> list[tuple[float, float]]:
+    """Points et poids de la quadrature de Gauss–Legendre à m points, sur [0, 1]."""
+    points = []
+    for i in range(1, m + 1):
+        x = math.cos(math.pi * (i - 0.25) / (m + 0.5))
+        for _ in range(100):  # Newton sur le polynôme de Legendre P_m
+            p0, p1 = 1.0, x
+            for k in range(2, m + 1):
+                p0, p1 = p1, ((2 * k - 1) * x * p1 - (k - 1) * p0) / k
+            derivee = m * (x * p1 - p0) / (x * x - 1)
+            pas = p1 / derivee
+            x -= pas
+            if abs(pas) < 1e-15:
+                break
+        points.append(((1 - x) / 2, 1 / ((1 - x * x) * derivee * derivee)))
+    return points
+
+
+_GAUSS = _gauss_legendre(POUVOIR_NOEUDS_SHAPLEY)
+_FRACTION = 62  # bits après la virgule d'une probabilité, dans une tranche de 64
+
+
+def _repartition_moitie(poids: tuple[int, ...], horizon: int) -> list[float]:
+    """P(poids(S) < s) pour 0 ≤ s ≤ horizon, chaque joueur étant dans S à pile ou face.
+
+    Loi Π ((1 + x^w)/2) en virgule fixe, une tranche de 64 bits par poids ;
+    l'arrondi par défaut perd au plus n·2^−62 par coefficient.
+    """
+    masque = int.from_bytes(((1 << (_FRACTION + 1)) - 1).to_bytes(8, "little") * horizon, "little")
+    loi = 1 << _FRACTION
+    for w in poids:
+        if w < horizon:
+            loi += loi << (w * 64)
+        loi = (loi >> 1) & masque  # tronque aussi à l'horizon
+    echelle = 2.0 ** -_FRACTION
+    tranches = memoryview(loi.to_bytes(horizon * 8, "little")).cast("Q")
+    return [0.0, *accumulate(t * echelle for t in tranches)]
+
+
+def _banzhaf(prefixe: list[float], quota: int, w: int) -> float:
+    """P(quota − w ≤ poids(S) < quota), S tirée à pile ou face parmi les autres joueurs.
+
+    ``prefixe`` : _repartition_moitie avec tous les joueurs. Sans le joueur,
+    la loi g vérifie f(s) = (g(s) + g(s − w))/2 : de proche en proche depuis
+    0, la masse de g sur [quota − w, quota) est une somme alternée des masses
+    de f sur les fenêtres de largeur w en dessous.
+    """
+    if w >= quota:
+        return 2 * prefixe[quota]
+    impairs = sum(prefixe[quota - w::-2 * w])
+    pairs = sum(prefixe[quota - 2 * w::-2 * w]) if quota >= 2 * w else 0.0
+    return 2 * prefixe[quota] - 4 * (impairs - pairs)
+
+
+def _shapley(quota: int, w: int, reste: int, carres: int) -> float:
+    """Shapley–Shubik approché d'un joueur de poids w (extension multilinéaire d'Owen).
+
+    ``reste`` et ``carres`` : somme des poids et des carrés des autres joueurs.
+    Chacun votant « pour » avec la probabilité p, poids(S) suit à peu près
+    N(p·reste, p(1 − p)·carres) ; on intègre sur p la probabilité d'être
+    décisif (correction de continuité), là seulement où elle n'est pas
+    négligeable (à moins de 8 écarts-types).
+    """
+    if not carres:  # seul joueur
+        return float(w >= quota)
+    marge = 8 * 0.5 * math.sqrt(carres)
+    bas = max(0.0, (quota - w - 0.5 - marge) / reste)
+    haut = min(1.0, (quota - 0.5 + marge) / reste)
+    if bas >= haut:
+        return 0.0
+    somme = 0.0
+    for x, coef in _GAUSS:
+        p = bas + (haut - bas) * x
+        ecart = math.sqrt(2 * p * (1 - p) * carres)
+        moyenne = p * reste
+        somme += coef * (math.erf((quota - 0.5 - moyenne) / ecart)
+                          - math.erf((quota - w - 0.5 - moyenne) / ecart))
+    return somme * (haut - bas) / 2
+
+
+def _indices_approches(
+    poids: tuple[int, ...], effectifs: list[int | None], horizon: int
+) -> tuple[dict, ...]:
+    """Banzhaf en virgule fixe, Shapley–Shubik approché : O(n·quota).
+
+    Les Shapley–Shubik sont ramenés à une somme de 1, comme les exacts : l'écart
+    de l'approximation normale, surtout commun à tous les joueurs, s'en va.
+    """
+    prefixe = _repartition_moitie(poids, horizon)
+    total, carres = sum(poids), sum(w * w for w in poids)
+    effectif_par_poids = Counter(poids)
+    resultats = tuple({} for _ in effectifs)
+    for i, quota in enumerate(effectifs):
+        if quota is None:
+            resultats[i].update((w, (0.0, 0.0)) for w in effectif_par_poids)
+            continue
+        shapley = {w: _shapley(quota, w, total - w, carres - w * w) for w in effectif_par_poids}
+        somme = sum(v * effectif_par_poids[w] for w, v in shapley.items()) or 1.0
+        for w, v in shapley.items():
+            resultats[i][w] = (_banzhaf(prefixe, quota, w), v / somme)
+    return resultats
+
+
+@lru_cache(maxsize=16)
+def _indices_par_poids(
+    poids: tuple[int, ...], quotas: tuple[int, ...]
+) -> tuple[bool, tuple[dict, ...]]:
+    """Indices de chaque poids distinct : (approche, ({poids → (banzhaf, shapley)}, ...)).
+
+    Un seul produit, tronqué au plus grand quota utile, sert à tous les quotas.
+    Calcul exact en O(n·K·quota) tranches d'entiers, K étant la taille maximale
+    d'une coalition sous ce quota, tant qu'il reste sous POUVOIR_BITS_EXACT_MAX ;
+    _indices_approches au-delà (``approche`` vrai). Mis en cache : une modification qui ne change
+    ni les joueurs ni les tantièmes acquis (vote d'un indécis, contact) est
+    gratuite.
+    """
+    n = len(poids)
+    total = sum(poids)
+    # Symétrie : S est décisive pour i ssi son complément parmi les autres l'est
+    # pour le quota total − quota + 1 ; on garde le plus petit des deux. None :
+    # seuil déjà atteint ou hors de portée, personne n'est décisif.
+    effectifs = [min(q, total - q + 1) if 0 < q <= total else None for q in quotas]
+    horizon = max((q for q in effectifs if q is not None), default=0)
+    if not horizon:
+        return False, tuple({w: (0.0, 0.0) for w in poids} for _ in quotas)
+
+    minimum = [0]  # minimum[k] : plus petit poids possible d'une coalition de taille k
+    for w in sorted(poids):
+        if minimum[-1] + w >= horizon:
+            break
+        minimum.append(minimum[-1] + w)
+    k_max = len(minimum) - 1
+
+    # Tranches assez larges pour tout compte (≤ C(n, k)), donc aussi pour la
+    # somme des coefficients d'une fenêtre (coalitions de taille k parmi n − 1)
+    b = comb(n, min(k_max, n // 2)).bit_length()
+    if n * sum(horizon - m for m in minimum) * b > POUVOIR_BITS_EXACT_MAX:
+        return True, _indices_approches(poids, effectifs, horizon)
+
+    # c[k] : coefficients x^s des coalitions de taille k, pour minimum[k] ≤ s < horizon,
+    # stockés à partir de la tranche 0 (les poids plus faibles sont impossibles)
+    largeurs = [(horizon - m) * b for m in minimum]
+    masques = [(1 << largeur) - 1 for largeur in largeurs]
+
+    def decaler(valeur: int, w: int, k: int) -> int:
+        """Passe un polynôme de taille k − 1 à la taille k en ajoutant un joueur de poids w."""
+        d = (w + minimum[k - 1] - minimum[k]) * b
+        valeur = (valeur << d) if d >= 0 else (valeur >> -d)
+        if valeur.bit_length() > largeurs[k]:  # tronque à l'horizon
+            valeur &= masques[k]
+        return valeur
+
+    c = [1] + [0] * k_max
+    for w in sorted(poids):  # légers d'abord : les entiers restent courts plus longtemps
+        if w >= horizon:
+            continue  # ce joueur n'entre dans aucune coalition sous l'horizon
+        for k in range(k_max, 0, -1):
+            if c[k - 1]:
+                c[k] += decaler(c[k - 1], w, k)
+
+    fact = [factorial(i) for i in range(n + 1)]
+    deux_n = 1 << (n - 1)
+    resultats = tuple({} for _ in quotas)
+    for w in set(poids):
+        swings = [0] * len(quotas)
+        ponderes = [0] * len(quotas)
+        sans = c[0]  # coalitions des autres joueurs, de taille k
+        for k in range(k_max + 1):
+            if k:
+                sans = c[k] - decaler(sans, w, k) if w < horizon else c[k]
+            for i, quota in enumerate(effectifs):
+                if quota is None or quota <= minimum[k]:
+                    continue
+                # coefficients quota − w ≤ s < quota
+                debut = max(0, quota - w - minimum[k])
+                nb_tranches = quota - minimum[k] - debut
+                fenetre = (sans >> (debut * b)) & ((1 << (nb_tranches * b)) - 1)
+                if fenetre:
+                    nb = _somme_tranches(fenetre, nb_tranches, b)
+                    swings[i] += nb
+                    ponderes[i] += nb * fact[k] * fact[n - 1 - k]
+        for i in range(len(quotas)):
+            resultats[i][w] = (swings[i] / deux_n, ponderes[i] / fact[n])
+    return False, resultats
+
+
+def _joueurs(conn: sqlite3.Connection) -> tuple[int, list[dict]]:
+    """Tantièmes « pour » acquis et joueurs (propriétaires indécis avec leurs lots)."""
+    rows = conn.execute(
+        """SELECT l.id AS lot_id, l.tantiemes, vs.vote, vs.confiance,
+                  (SELECT GROUP_CONCAT(personne_id) FROM (
+                       SELECT lp.personne_id FROM lot_personne lp
+                       WHERE lp.lot_id = l.id AND lp.role = 'proprietaire' AND lp.actif = 1
+                       ORDER BY lp.personne_id)) AS proprietaires
+           FROM vote_simulation vs
+           JOIN lot l ON vs.lot_id = l.id"""
+    ).fetchall()
+    acquis = 0
+    joueurs: dict = {}
+    for r in rows:
+        tantiemes = r["tantiemes"] or 0
+        if r["confiance"] == "certain":
+            if r["vote"] == "pour":
+                acquis += tantiemes
+            continue
+        if not tantiemes:
+            continue
+        # Sans propriétaire connu, le lot est son propre joueur
+        cle = r["proprietaires"] or f"lot:{r['lot_id']}"
+        joueur = joueurs.setdefault(cle, {"tantiemes": 0, "lots": []})
+        joueur["tantiemes"] += tantiemes
+        joueur["lots"].append(r["lot_id"])
+    return acquis, list(joueurs.values())
+
+
+def calculer_pouvoir(conn: sqlite3.Connection) -> dict:
+    """Indices de pouvoir de chaque propriétaire indécis, par seuil.
+
+    Retourne ``{"acquis", "nb_joueurs", "approche", "seuils": {nom: {"seuil",
+    "quota"}}, "lots": {lot_id: {nom: {"banzhaf", "shapley"}}}}`` ; chaque lot
+    porte les indices de son propriétaire. Les lots acquis (confiance certaine)
+    n'y figurent pas. ``approche`` : jeu trop grand pour le calcul exact,
+    Shapley–Shubik approché (voir _indices_approches).
+    """
+    acquis, joueurs = _joueurs(conn)
+    joueurs.sort(key=lambda j: j["tantiemes"])
+    quotas = tuple(seuil - acquis for seuil in SEUILS_POUVOIR.values())
+    approche, par_seuil = _indices_par_poids(tuple(j["tantiemes"] for j in joueurs), quotas)
+
+    seuils = {}
+    lots: dict = {lot_id: {} for j in joueurs for lot_id in j["lots"]}
+    for (nom, seuil), quota, indices in zip(SEUILS_POUVOIR.items(), quotas, par_seuil):
+        seuils[nom] = {"seuil": seuil, "quota": quota}
+        for j in joueurs:
+            banzhaf, shapley = indices[j["tantiemes"]]
+            for lot_id in j["lots"]:
+                lots[lot_id][nom] = {"banzhaf": round(banzhaf, 6), "shapley": round(shapley, 6)}
+    return {
+        "acquis": acquis, "nb_joueurs": len(joueurs), "approche": approche,
+        "seuils": seuils, "lots": lots,
+    }
+
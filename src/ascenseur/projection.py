@@ -0,0 +1,254 @@
+"""Projection pluriannuelle des charges par lot et par trimestre, avec ou sans ascenseur.
+
+Les appels trimestriels passés (exercice, appel_de_fonds, poste_charge)
+donnent deux séries annuelles : charges courantes et fonds de travaux (postes
+de catégorie « travaux »). Chacune est prolongée par sa tendance géométrique
+(moindres carrés sur le logarithme des montants). Sans historique en base, on
+part du budget voté (BUDGET_DATA).
+
+La charge d'un lot au trimestre t pour un devis d est séparable :
+
+    part_courant × courant[t] + part_fonds × fonds[t]
+        + part_ascenseur × (installation_d[t] + maintenance_d[t])
+
+Les séries ne sont calculées qu'une fois pour toute la copropriété, puis
+combinées aux parts des lots : les parts des charges courantes et du fonds
+viennent des charges appelées (charge_lot), à défaut des tantièmes ; la part
+ascenseur est celle des tantièmes ascenseur (bât A).
+"""
+from __future__ import annotations
+
+import math
+import sqlite3
+
+from ..config import (
+    FINANCEMENT_PRETS, MAINTENANCE_INDEXATION, MAINTENANCE_TVA, PROJECTION_ANS,
+    PROJECTION_APPELS_TRAVAUX, PROJECTION_DECALAGE_TRAVAUX, TANTIEMES_TOTAL_COPRO,
+)
+from .colonnes import en_colonnes
+from .devis import get_devis_list, parser_duree_mois
+from .financement import facteurs_unitaires, parts_ascenseur
+
+# ── Budget historique (source: budget_2025.py / PV AG) ───────
+# Repli de la projection tant que les exercices ne sont pas saisis en base
+BUDGET_DATA = {
+    "historique": [
+        {"annee": 2022, "budget": 137720, "realise": 148623},
+        {"annee": 2023, "budget": 137720, "realise": 166817},
+        {"annee": 2024, "budget": 143002, "realise": 168087},
+        {"annee": 2025, "budget": 144000, "realise": None},
+    ],
+    "budget_2025": 144000,
+    "fonds_travaux_pct": 0.05,
+    "appel_trimestriel": 36000,
+}
+
+POSTES_PROJECTION = ("courant", "fonds_travaux")
+# Catégorie de poste_charge → série projetée
+POSTE_PAR_CATEGORIE = {"travaux": "fonds_travaux"}
+
+
+def _historique(conn: sqlite3.Connection) -> tuple[dict, str]:
+    """Montants annuels des appels trimestriels par série : ({poste: {annee: montant}}, source)."""
+    rows = conn.execute(
+        """SELECT e.annee, pc.categorie, SUM(a.montant_total) AS montant
+           FROM appel_de_fonds a
+           JOIN exercice e ON a.exercice_id = e.id
+           JOIN poste_charge pc ON a.poste_charge_id = pc.id
+           WHERE a.type_appel = 'trimestriel' AND a.montant_total IS NOT NULL
+           GROUP BY e.annee, pc.categorie"""
+    ).fetchall()
+    series: dict = {poste: {} for poste in POSTES_PROJECTION}
+    for r in rows:
+        serie = series[POSTE_PAR_CATEGORIE.get(r["categorie"], "courant")]
+        serie[r["annee"]] = serie.get(r["annee"], 0) + r["montant"]
+    if series["courant"]:
+        return series, "exercices"
+
+    pct = BUDGET_DATA["fonds_travaux_pct"]
+    budgets = {h["annee"]: h["budget"] for h in BUDGET_DATA["historique"]}
+    return {
+        "courant": budgets,
+        "fonds_travaux": {annee: budget * pct for annee, budget in budgets.items()},
+    }, "budget_vote"
+
+
+def ajuster_tendance(serie: dict[int, float]) -> dict:
+    """Croissance géométrique d'une série annuelle (moindres carrés sur log(montant)).
+
+    Retourne ``{"annee_base", "base", "croissance", "r2", "nb_annees"}`` :
+    montant(a) = base × (1 + croissance)^(a − annee_base), la base étant la
+    valeur ajustée de la dernière année connue.
+    """
+    points = sorted((a, math.log(m)) for a, m in serie.items() if m and m > 0)
+    if not points:
+        return {"annee_base": None, "base": 0.0, "croissance": 0.0, "r2": None, "nb_annees": 0}
+    n = len(points)
+    mx = sum(a for a, _ in points) / n
+    my = sum(y for _, y in points) / n
+    sxx = sum((a - mx) ** 2 for a, _ in points)
+    pente = sum((a - mx) * (y - my) for a, y in points) / sxx if sxx else 0.0
+    syy = sum((y - my) ** 2 for _, y in points)
+    residus = sum((y - my - pente * (a - mx)) ** 2 for a, y in points)
+    derniere = points[-1][0]
+    return {
+        "annee_base": derniere,
+        "base": math.exp(my + pente * (derniere - mx)),
+        "croissance": math.exp(pente) - 1,
+        "r2": round(1 - residus / syy, 4) if syy else None,
+        "nb_annees": n,
+    }
+
+
+def _parts_lots(conn: sqlite3.Connection) -> list[dict]:
+    """Parts de chaque lot dans les charges courantes, le fonds de travaux et l'ascenseur.
+
+    Parts des charges : montants appelés au lot sur le dernier exercice
+    renseigné dans charge_lot, rapportés aux appels ; à défaut, tantièmes
+    généraux / TANTIEMES_TOTAL_COPRO.
+    """
+    observees: dict = {}
+    rows = conn.execute(
+        """WITH dernier AS (
+               SELECT MAX(e.annee) AS annee
+               FROM charge_lot cl
+               JOIN appel_de_fonds a ON cl.appel_de_fonds_id = a.id
+               JOIN exercice e ON a.exercice_id = e.id
+               WHERE a.type_appel = 'trimestriel'
+           )
+           SELECT cl.lot_id, pc.categorie, SUM(cl.montant) AS montant,
+                  SUM(a.montant_total) AS total
+           FROM charge_lot cl
+           JOIN appel_de_fonds a ON cl.appel_de_fonds_id = a.id
+           JOIN exercice e ON a.exercice_id = e.id
+           JOIN poste_charge pc ON a.poste_charge_id = pc.id
+           WHERE a.type_appel = 'trimestriel' AND e.annee = (SELECT annee FROM dernier)
+           GROUP BY cl.lot_id, pc.categorie"""
+    ).fetchall()
+    cumuls: dict = {}
+    for r in rows:
+        cle = (r["lot_id"], POSTE_PAR_CATEGORIE.get(r["categorie"], "courant"))
+        cumul = cumuls.setdefault(cle, [0.0, 0.0])
+        cumul[0] += r["montant"] or 0
+        cumul[1] += r["total"] or 0
+    for cle, (montant, total) in cumuls.items():
+        if total:
+            observees[cle] = montant / total
+
+    ascenseur = {lot_id: part for lot_id, _, part in parts_ascenseur(conn)}
+    lots = []
+    for r in conn.execute("SELECT id, numero, tantiemes FROM lot ORDER BY id"):
+        defaut = (r["tantiemes"] or 0) / TANTIEMES_TOTAL_COPRO
+        lot = {"lot_id": r["id"], "numero": r["numero"]}
+        for poste in POSTES_PROJECTION:
+            lot[f"part_{poste}"] = observees.get((r["id"], poste), defaut)
+        lot["part_ascenseur"] = ascenseur.get(r["id"], 0.0)
+        lots.append(lot)
+    return lots
+
+
+def _serie_installation(montant: float, nb: int, conditions: tuple | None) -> list[float]:
+    """Appels travaux d'un devis par trimestre : comptant, ou échéances d'un prêt."""
+    serie = [0.0] * nb
+    debut = PROJECTION_DECALAGE_TRAVAUX
+    if conditions is None:
+        for i, fraction in enumerate(PROJECTION_APPELS_TRAVAUX):
+            if debut + i < nb:
+                serie[debut + i] = montant * fraction
+        return serie
+    # Prêt : frais à la signature, puis trois mensualités par trimestre
+    # (les frais de dossier fixes, propres à chaque emprunteur, sont exclus)
+    pret, taux, duree_ans = conditions
+    echeance = 3 * montant * facteurs_unitaires(pret, taux, duree_ans)["mensualite"]
+    if debut < nb:
+        serie[debut] += montant * FINANCEMENT_PRETS[pret]["frais_pct"]
+    for t in range(debut, min(nb, debut + 4 * duree_ans)):
+        serie[t] += echeance
+    return serie
+
+
+def _serie_maintenance(maintenance_ttc: float, debut: int, nb: int) -> list[float]:
+    """Maintenance par trimestre à partir de la réception, révisée chaque année de contrat."""
+    return [
+        maintenance_ttc / 4 * (1 + MAINTENANCE_INDEXATION) ** ((t - debut) // 4) if t >= debut else 0.0
+        for t in range(nb)
+    ]
+
+
+def projeter_charges(
+    conn: sqlite3.Connection, conditions: tuple | None = None, detail: bool = True
+) -> dict:
+    """Charges trimestrielles projetées sur PROJECTION_ANS, par lot et par devis.
+
+    ``conditions`` (prêt, taux, durée) remplace les appels travaux comptant
+    par les échéances d'un prêt. Retourne les tendances ajustées,
+    les séries de la copropriété (``series``, une valeur par trimestre), les
+    parts des lots (en colonnes) et, si ``detail``, les charges de chaque lot
+    (``charges`` : lot × trimestre, dans l'ordre de ``lots``), sans ascenseur
+    et pour chaque devis.
+    """
+    historique, source = _historique(conn)
+    tendances = {poste: ajuster_tendance(historique[poste]) for poste in POSTES_PROJECTION}
+    annee_base = max((t["annee_base"] for t in tendances.values() if t["annee_base"]), default=None)
+    debut = (annee_base or 0) + 1
+    nb = 4 * PROJECTION_ANS
+    trimestres = [f"{debut + t // 4}-T{t % 4 + 1}" for t in range(nb)]
+
+    series = {}
+    for poste, tendance in tendances.items():
+        if tendance["annee_base"] is None:
+            series[poste] = [0.0] * nb
+            continue
+        facteur = 1 + tendance["croissance"]
+        series[poste] = [
+            tendance["base"] * facteur ** (debut + t // 4 - tendance["annee_base"]) / 4 for t in range(nb)
+        ]
+
+    devis = []
+    for d in get_devis_list(conn):
+        if not d["montant_ttc"] or d["maintenance_ht"] is None:
+            continue
+        duree = parser_duree_mois(d["duree_travaux"])
+        reception = PROJECTION_DECALAGE_TRAVAUX + max(
+            len(PROJECTION_APPELS_TRAVAUX), math.ceil(duree / 3) if duree else 0
+        )
+        devis.append({
+            "devis_id": d["id"], "fournisseur": d["fournisseur"],
+            "debut_maintenance": trimestres[reception] if reception < nb else None,
+            "installation": _serie_installation(d["montant_ttc"], nb, conditions),
+            "maintenance": _serie_maintenance(d["maintenance_ht"] * (1 + MAINTENANCE_TVA), reception, nb),
+        })
+
+    lots = _parts_lots(conn)
+    resultat = {
+        "source": source,
+        "conditions": list(conditions) if conditions else None,
+        "trimestres": trimestres,
+        "tendances": tendances,
+        "series": {poste: [round(v, 2) for v in serie] for poste, serie in series.items()},
+        "devis": [
+            dict(d, installation=[round(v, 2) for v in d["installation"]],
+                 maintenance=[round(v, 2) for v in d["maintenance"]])
+            for d in devis
+        ],
+        "lots": en_colonnes(lots, ["lot_id", "numero", "part_courant", "part_fonds_travaux", "part_ascenseur"]),
+    }
+    if not detail:
+        return resultat
+
+    sans = [
+        [
+            l["part_courant"] * c + l["part_fonds_travaux"] * f
+            for c, f in zip(series["courant"], series["fonds_travaux"])
+        ]
+        for l in lots
+    ]
+    charges = {"sans_ascenseur": [[round(v, 2) for v in ligne] for ligne in sans]}
+    for d in devis:
+        ascenseur = [i + m for i, m in zip(d["installation"], d["maintenance"])]
+        charges[d["devis_id"]] = [
+            [round(v + l["part_ascenseur"] * a, 2) for v, a in zip(ligne, ascenseur)]
+            for l, ligne in zip(lots, sans)
+        ]
+    resultat["charges"] = charges
+    return resultat
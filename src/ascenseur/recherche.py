@@ -0,0 +1,266 @@
+"""Recherche paginée des votes et de la liste de démarchage.
+
+Filtres (bâtiment, étage, vote, confiance, contact, texte libre sur le nom du
+propriétaire) et tris sont exécutés en SQL. La pagination se fait par
+curseur (keyset) : le curseur code les valeurs de tri de la dernière ligne
+servie, départagées par lot_id, et la page suivante reprend strictement
+après, sans OFFSET. Une page coûte donc le même prix quelle que soit sa
+position, et une modification entre deux pages ne décale pas les lignes.
+
+Le tri s'écrit comme les listes du dashboard : « bat-asc,ta-desc ».
+La liste de démarchage est triée en Python (priorité et indices de pouvoir
+ne sont pas en base), sur les seules lignes retenues par les filtres SQL.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import sqlite3
+from functools import cmp_to_key
+
+from .strategy import get_full_canvassing_list
+from .votes import CONFIANCES, VOTES, version_votes
+
+LIMITE_DEFAUT = 50
+LIMITE_MAX = 500
+
+# Clé de tri → expression SQL (alias l, b, vs, te), comme cmpFor (dashboard.js)
+TRIS_VOTES = {
+    "bat": "b.code",
+    "ta": "COALESCE(NULLIF(l.tantieme_ascenseur, 0), te.valeur, 0)",
+    "tant": "COALESCE(l.tantiemes, 0)",
+    "etage": "COALESCE(l.etage, 0)",
+    "lot": "COALESCE(l.numero, 0)",
+    "vote": "CASE vs.vote "
+            + " ".join(f"WHEN '{v}' THEN {i}" for i, v in enumerate(VOTES)) + " ELSE 9 END",
+}
+TRI_VOTES_DEFAUT = "bat-asc,ta-desc"
+
+# Clé de tri → valeur d'une ligne de get_full_canvassing_list
+TRIS_DEMARCHAGE = {
+    "priorite": lambda r: r["priorite_demarchage"],
+    "pivot": lambda r: r["pivot"],
+    "bat": lambda r: r["batiment"],
+    "tant": lambda r: r["tantiemes"] or 0,
+    "etage": lambda r: r["etage"] or 0,
+    "lot": lambda r: r["numero"] or 0,
+}
+TRI_DEMARCHAGE_DEFAUT = "priorite-desc,pivot-desc,tant-desc"
+
+FILTRES = ("bat", "etage", "vote", "confiance", "contact", "q")
+
+_PROPRIETAIRE_CONTIENT = """EXISTS (
+    SELECT 1 FROM lot_personne lpq JOIN personne pq ON lpq.personne_id = pq.id
+    WHERE lpq.lot_id = l.id AND lpq.role = 'proprietaire' AND lpq.actif = 1
+      AND pq.nom_complet LIKE ? ESCAPE '\\')"""
+
+
+# ── Paramètres ───────────────────────────────────────────────
+
+def lire_limite(valeur) -> int:
+    """Taille de page demandée, bornée à LIMITE_MAX. Lève ValueError."""
+    if valeur in (None, ""):
+        return LIMITE_DEFAUT
+    try:
+        limite = int(valeur)
+    except (TypeError, ValueError):
+        raise ValueError("limite invalide") from None
+    if limite < 1:
+        raise ValueError("limite invalide")
+    return min(limite, LIMITE_MAX)
+
+
+def lire_tri(texte: str | None, cles, defaut: str) -> list[tuple[str, int]]:
+    """« bat-asc,ta-desc » → [("bat", 1), ("ta", -1)]. Lève ValueError."""
+    tri = []
+    for terme in (texte or defaut).split(","):
+        cle, _, sens = terme.strip().partition("-")
+        if cle == "none":
+            continue
+        if cle not in cles or sens not in ("", "asc", "desc"):
+            raise ValueError(f"tri invalide : {terme}")
+        if cle not in (c for c, _ in tri):
+            tri.append((cle, -1 if sens == "desc" else 1))
+    return tri
+
+
+def lire_filtres(args) -> dict:
+    """Filtres présents dans ``args`` (request.args), validés. Lève ValueError."""
+    filtres = {k: args.get(k) for k in FILTRES if args.get(k) not in (None, "")}
+    if "vote" in filtres and filtres["vote"] not in VOTES:
+        raise ValueError(f"vote invalide : {filtres['vote']}")
+    if "confiance" in filtres and filtres["confiance"] not in CONFIANCES:
+        raise ValueError(f"confiance invalide : {filtres['confiance']}")
+    for cle in ("etage", "contact"):
+        if cle in filtres:
+            try:
+                filtres[cle] = int(filtres[cle])
+            except ValueError:
+                raise ValueError(f"{cle} invalide") from None
+    return filtres
+
+
+def _conditions(filtres: dict) -> tuple[list[str], list]:
+    """Conditions SQL des filtres, sur les alias l, b et vs."""
+    conditions, params = [], []
+    if "bat" in filtres:
+        conditions.append("b.code = ?")
+        params.append(filtres["bat"])
+    if "etage" in filtres:
+        conditions.append("l.etage = ?")
+        params.append(filtres["etage"])
+    if "vote" in filtres:
+        conditions.append("COALESCE(vs.vote, 'inconnu') = ?")
+        params.append(filtres["vote"])
+    if "confiance" in filtres:
+        conditions.append("COALESCE(vs.confiance, 'inconnu') = ?")
+        params.append(filtres["confiance"])
+    if "contact" in filtres:
+        conditions.append("COALESCE(vs.contact_fait, 0) = ?")
+        params.append(1 if filtres["contact"] else 0)
+    if "q" in filtres:
+        motif = filtres["q"].replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append(_PROPRIETAIRE_CONTIENT)
+        params.append(f"%{motif}%")
+    return conditions, params
+
+
+# ── Curseurs ─────────────────────────────────────────────────
+
+def _termes(tri: list[tuple[str, int]]) -> list[str]:
+    return [f"{c}-{'desc' if s < 0 else 'asc'}" for c, s in tri]
+
+
+def encoder_curseur(tri: list[tuple[str, int]], valeurs: list) -> str:
+    """Curseur opaque : le tri et les valeurs de la dernière ligne servie."""
+    texte = json.dumps([_termes(tri), valeurs], separators=(",", ":"))
+    return base64.urlsafe_b64encode(texte.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decoder_curseur(curseur: str | None, tri: list[tuple[str, int]]) -> list | None:
+    """Valeurs codées dans ``curseur`` (None si absent). Lève ValueError."""
+    if not curseur:
+        return None
+    try:
+        texte = base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4)).decode("utf-8")
+        termes, valeurs = json.loads(texte)
+    except (ValueError, TypeError):
+        raise ValueError("curseur invalide") from None
+    if termes != _termes(tri) or len(valeurs) != len(tri) + 1:
+        raise ValueError("curseur d'un autre tri")
+    return valeurs
+
+
+def _apres_sql(expressions: list[str], sens: list[int], valeurs: list) -> tuple[str, list]:
+    """Condition « ligne strictement après ``valeurs`` » dans l'ordre du tri.
+
+    (k1 > v1) OR (k1 = v1 AND k2 < v2) OR … : les sens mêlés interdisent la
+    comparaison de n-uplets de SQLite.
+    """
+    alternatives, params = [], []
+    for i, (expression, s) in enumerate(zip(expressions, sens)):
+        egalites = [f"{e} = ?" for e in expressions[:i]]
+        alternatives.append(" AND ".join(egalites + [f"{expression} {'>' if s > 0 else '<'} ?"]))
+        params.extend(valeurs[:i + 1])
+    return "(" + " OR ".join(f"({a})" for a in alternatives) + ")", params
+
+
+def _comparer(a, b, sens: list[int]) -> int:
+    """Ordre de deux clés de tri (n-uplets) selon les sens de chaque terme."""
+    for x, y, s in zip(a, b, sens):
+        if x != y:
+            return s if x > y else -s
+    return 0
+
+
+# ── Recherches ───────────────────────────────────────────────
+
+def rechercher_votes(
+    conn: sqlite3.Connection, filtres: dict, tri: list[tuple[str, int]],
+    curseur: str | None = None, limite: int = LIMITE_DEFAUT,
+) -> dict:
+    """Une page du détail des votes (lignes de get_votes_detail) filtrée et triée.
+
+    Retourne ``lignes``, ``suivant`` (curseur de la page suivante, None à la
+    fin), ``total`` et ``tantiemes`` (sur toutes les lignes filtrées) et la
+    version des votes, lus dans une même transaction.
+    """
+    apres = decoder_curseur(curseur, tri)
+    conditions, params = _conditions(filtres)
+    expressions = [TRIS_VOTES[c] for c, _ in tri] + ["vs.lot_id"]
+    sens = [s for _, s in tri] + [1]
+    jointures = """FROM vote_simulation vs
+           JOIN lot l ON vs.lot_id = l.id
+           JOIN batiment b ON l.batiment_id = b.id
+           LEFT JOIN tantieme_estime te ON te.lot_id = l.id"""
+    where = " AND ".join(conditions) or "1"
+
+    conn.execute("BEGIN")
+    try:
+        total, tantiemes = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(l.tantiemes), 0) {jointures} WHERE {where}", params
+        ).fetchone()
+        page_conditions, page_params = list(conditions), list(params)
+        if apres is not None:
+            condition, valeurs = _apres_sql(expressions, sens, apres)
+            page_conditions.append(condition)
+            page_params.extend(valeurs)
+        ordre = ", ".join(f"{e} {'DESC' if s < 0 else 'ASC'}" for e, s in zip(expressions, sens))
+        cles = ", ".join(f"{e} AS cle_{i}" for i, e in enumerate(expressions))
+        rows = conn.execute(
+            f"""SELECT vs.lot_id, l.numero, b.code AS batiment, l.etage, l.localisation,
+                      l.tantiemes, l.coef_ascenseur, l.tantieme_ascenseur,
+                      vs.vote, vs.confiance, vs.argument_cle, vs.contact_fait, vs.modifie_le,
+                      (SELECT GROUP_CONCAT(DISTINCT p.nom_complet)
+                       FROM lot_personne lp JOIN personne p ON lp.personne_id = p.id
+                       WHERE lp.lot_id = l.id AND lp.role = 'proprietaire' AND lp.actif = 1
+                      ) AS proprietaire,
+                      {cles}
+               {jointures}
+               WHERE {" AND ".join(page_conditions) or "1"}
+               ORDER BY {ordre}
+               LIMIT ?""",
+            page_params + [limite + 1],
+        ).fetchall()
+        version = version_votes(conn)
+    finally:
+        conn.commit()
+
+    lignes = [
+        {k: r[k] for k in r.keys() if not k.startswith("cle_")} for r in rows[:limite]
+    ]
+    suivant = None
+    if len(rows) > limite:
+        dernier = rows[limite - 1]
+        suivant = encoder_curseur(tri, [dernier[f"cle_{i}"] for i in range(len(expressions))])
+    return {
+        "lignes": lignes, "suivant": suivant, "total": total, "tantiemes": tantiemes,
+        "version": version,
+    }
+
+
+def rechercher_demarchage(
+    conn: sqlite3.Connection, filtres: dict, tri: list[tuple[str, int]],
+    curseur: str | None = None, limite: int = LIMITE_DEFAUT,
+) -> dict:
+    """Une page de la liste de démarchage filtrée (en SQL) et triée.
+
+    Retourne ``lignes`` (lignes de get_full_canvassing_list), ``suivant``
+    et ``total``.
+    """
+    apres = decoder_curseur(curseur, tri)
+    conditions, params = _conditions(filtres)
+    lots = get_full_canvassing_list(conn, " AND ".join(conditions), tuple(params))
+
+    sens = [s for _, s in tri] + [1]
+
+    def cle(r):
+        return tuple(TRIS_DEMARCHAGE[c](r) for c, _ in tri) + (r["lot_id"],)
+
+    lots.sort(key=cmp_to_key(lambda a, b: _comparer(cle(a), cle(b), sens)))
+    total = len(lots)
+    if apres is not None:
+        lots = [r for r in lots if _comparer(cle(r), apres, sens) > 0]
+    page = lots[:limite]
+    suivant = encoder_curseur(tri, list(cle(page[-1]))) if len(lots) > limite else None
+    return {"lignes": page, "suivant": suivant, "total": total}
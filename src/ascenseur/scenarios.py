@@ -0,0 +1,272 @@
+"""Scénarios de vote nommés : surcouches creuses sur la simulation courante.
+
+Un scénario ne stocke que les lots dont le vote ou la confiance diffère de sa
+base (la simulation courante, ou un autre scénario). Ses résultats partent des
+agrégats de la simulation, calculés une fois, auxquels on applique le delta
+des seuls lots modifiés : le coût d'un scénario est celui de ses modifications.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+from .votes import (
+    VOTES, CONFIANCES, agreger_votes, ajouter_lot_agregats, resultats_depuis_agregats,
+)
+
+CHAMPS_SCENARIO = ("vote", "confiance")
+
+
+def get_scenarios(conn: sqlite3.Connection) -> list[dict]:
+    """Liste des scénarios avec le nombre de lots de leur propre surcouche."""
+    rows = conn.execute(
+        """SELECT s.id, s.nom, s.description, s.base_id, s.cree_le,
+                  COUNT(sl.lot_id) AS nb_modifications
+           FROM vote_scenario s
+           LEFT JOIN vote_scenario_lot sl ON sl.scenario_id = s.id
+           GROUP BY s.id
+           ORDER BY s.id"""
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def get_scenario(conn: sqlite3.Connection, scenario_id: int) -> dict | None:
+    """Retourne un scénario (sans ses modifications), None s'il n'existe pas."""
+    row = conn.execute(
+        "SELECT id, nom, description, base_id, cree_le FROM vote_scenario WHERE id = ?",
+        (scenario_id,),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def _surcouches_propres(conn: sqlite3.Connection, ids: list[int] | None = None) -> dict:
+    """scenario_id → {lot_id → champs renseignés} (toutes, ou celles de ``ids``)."""
+    if ids is None:
+        rows = conn.execute("SELECT scenario_id, lot_id, vote, confiance FROM vote_scenario_lot")
+    else:
+        rows = conn.execute(
+            f"""SELECT scenario_id, lot_id, vote, confiance FROM vote_scenario_lot
+                WHERE scenario_id IN ({",".join("?" * len(ids))})""",
+            ids,
+        )
+    propres: dict = {}
+    for r in rows:
+        propres.setdefault(r["scenario_id"], {})[r["lot_id"]] = {
+            c: r[c] for c in CHAMPS_SCENARIO if r[c] is not None
+        }
+    return propres
+
+
+def _chaine(conn: sqlite3.Connection, scenario_id: int) -> list[int]:
+    """Le scénario puis ses bases successives, du plus proche au plus lointain."""
+    rows = conn.execute(
+        """WITH RECURSIVE chaine(id, base_id, rang) AS (
+               SELECT id, base_id, 0 FROM vote_scenario WHERE id = ?
+               UNION ALL
+               SELECT s.id, s.base_id, c.rang + 1
+               FROM vote_scenario s JOIN chaine c ON s.id = c.base_id
+           )
+           SELECT id FROM chaine ORDER BY rang""",
+        (scenario_id,),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def _fusionner(surcouches: list[dict]) -> dict:
+    """Fusionne des surcouches (la plus proche en premier) champ par champ."""
+    fusion: dict = {}
+    for surcouche in reversed(surcouches):
+        for lot_id, champs in surcouche.items():
+            fusion.setdefault(lot_id, {}).update(champs)
+    return fusion
+
+
+def surcouche_effective(conn: sqlite3.Connection, scenario_id: int | None) -> dict:
+    """Modifications effectives d'un scénario par rapport à la simulation courante.
+
+    lot_id → {vote?, confiance?} ; bases comprises. None désigne la simulation
+    elle-même (aucune modification).
+    """
+    if scenario_id is None:
+        return {}
+    chaine = _chaine(conn, scenario_id)
+    if not chaine:
+        return {}
+    propres = _surcouches_propres(conn, chaine)
+    return _fusionner([propres.get(sid, {}) for sid in chaine])
+
+
+def _lots_simulation(conn: sqlite3.Connection, lot_ids) -> dict:
+    """État courant dans la simulation des seuls lots demandés."""
+    ids = list(lot_ids)
+    if not ids:
+        return {}
+    rows = conn.execute(
+        f"""SELECT vs.lot_id, l.numero, b.code AS batiment, l.etage, l.tantiemes,
+                   vs.vote, vs.confiance
+            FROM vote_simulation vs
+            JOIN lot l ON vs.lot_id = l.id
+            JOIN batiment b ON l.batiment_id = b.id
+            WHERE vs.lot_id IN ({",".join("?" * len(ids))})""",
+        ids,
+    ).fetchall()
+    return {r["lot_id"]: dict(r) for r in rows}
+
+
+def _resultats(agregats: dict, lots: dict, surcouche: dict) -> dict:
+    """Résultats = agrégats de la simulation + delta des lots de la surcouche."""
+    agregats = {k: list(v) for k, v in agregats.items()}  # quelques dizaines de cellules
+    for lot_id, champs in surcouche.items():
+        lot = lots.get(lot_id)
+        if lot is None or not champs:
+            continue
+        ajouter_lot_agregats(agregats, lot, -1)
+        ajouter_lot_agregats(agregats, dict(lot, **champs), 1)
+    return resultats_depuis_agregats(agregats)
+
+
+def evaluer_scenarios(conn: sqlite3.Connection) -> list[dict]:
+    """Tous les scénarios avec leurs résultats (agrégats de base calculés une fois)."""
+    scenarios = get_scenarios(conn)
+    propres = _surcouches_propres(conn)
+    bases = {s["id"]: s["base_id"] for s in scenarios}
+    effectives: dict = {}
+
+    def effective(sid):
+        if sid is None:
+            return {}
+        if sid not in effectives:
+            effectives[sid] = _fusionner([propres.get(sid, {}), effective(bases.get(sid))])
+        return effectives[sid]
+
+    for s in scenarios:
+        effective(s["id"])
+    lots = _lots_simulation(conn, {lot_id for e in effectives.values() for lot_id in e})
+    agregats = agreger_votes(conn)
+    for s in scenarios:
+        s["resultats"] = _resultats(agregats, lots, effectives[s["id"]])
+    return scenarios
+
+
+def evaluer_scenario(conn: sqlite3.Connection, scenario_id: int) -> dict | None:
+    """Un scénario : ses modifications propres et ses résultats."""
+    scenario = get_scenario(conn, scenario_id)
+    if scenario is None:
+        return None
+    surcouche = surcouche_effective(conn, scenario_id)
+    propres = _surcouches_propres(conn, [scenario_id]).get(scenario_id, {})
+    scenario["modifications"] = [dict(champs, lot_id=lot_id) for lot_id, champs in sorted(propres.items())]
+    scenario["resultats"] = _resultats(agreger_votes(conn), _lots_simulation(conn, surcouche), surcouche)
+    return scenario
+
+
+def comparer_scenarios(conn: sqlite3.Connection, a: int | None, b: int | None) -> dict:
+    """Différences entre deux scénarios (None : simulation courante).
+
+    Retourne les lots dont le vote ou la confiance diffère, l'écart de
+    tantièmes par vote (b − a) et les résultats des deux côtés.
+    """
+    sa, sb = surcouche_effective(conn, a), surcouche_effective(conn, b)
+    lots = _lots_simulation(conn, set(sa) | set(sb))
+    differences = []
+    for lot_id in sorted(lots):
+        lot = lots[lot_id]
+        etat_a = {c: sa.get(lot_id, {}).get(c, lot[c]) for c in CHAMPS_SCENARIO}
+        etat_b = {c: sb.get(lot_id, {}).get(c, lot[c]) for c in CHAMPS_SCENARIO}
+        if etat_a != etat_b:
+            differences.append({
+                "lot_id": lot_id, "numero": lot["numero"], "batiment": lot["batiment"],
+                "etage": lot["etage"], "tantiemes": lot["tantiemes"], "a": etat_a, "b": etat_b,
+            })
+    agregats = agreger_votes(conn)
+    ra, rb = _resultats(agregats, lots, sa), _resultats(agregats, lots, sb)
+    ecart = {
+        v: rb["totaux"].get(v, {}).get("tantiemes", 0) - ra["totaux"].get(v, {}).get("tantiemes", 0)
+        for v in VOTES
+    }
+    return {"a": a, "b": b, "lots": differences, "ecart_tantiemes": ecart, "resultats": {"a": ra, "b": rb}}
+
+
+# Mutations (sans commit : exécutées par la file d'écriture)
+
+def creer_scenario(
+    conn: sqlite3.Connection, nom: str, description: str | None = None, base_id: int | None = None
+) -> int | None:
+    """Crée un scénario vide sur une base. None si la base n'existe pas.
+
+    Un nom déjà pris lève sqlite3.IntegrityError.
+    """
+    if base_id is not None and get_scenario(conn, base_id) is None:
+        return None
+    cur = conn.execute(
+        "INSERT INTO vote_scenario (nom, description, base_id) VALUES (?, ?, ?)",
+        (nom, description, base_id),
+    )
+    return cur.lastrowid
+
+
+def supprimer_scenario(conn: sqlite3.Connection, scenario_id: int) -> bool:
+    """Supprime un scénario et sa surcouche.
+
+    Un scénario servant de base à un autre lève sqlite3.IntegrityError.
+    """
+    return conn.execute("DELETE FROM vote_scenario WHERE id = ?", (scenario_id,)).rowcount > 0
+
+
+def modifier_scenario(conn: sqlite3.Connection, scenario_id: int, modifications: list[dict]) -> int | None:
+    """Fixe vote et/ou confiance de lots dans un scénario.
+
+    Chaque modification est ``{"lot_id", "vote"?, "confiance"?}`` ; une valeur
+    absente ou None garde celle du scénario (sa surcouche, sinon la base). Seuls
+    les champs qui diffèrent de la base sont stockés, et un lot identique à sa
+    base est retiré de la surcouche.
+    Lève ValueError sur un vote, une confiance ou un lot inconnus.
+
+    Retourne la taille de la surcouche propre du scénario, None s'il n'existe pas.
+    """
+    scenario = get_scenario(conn, scenario_id)
+    if scenario is None:
+        return None
+    try:
+        ids = [int(m["lot_id"]) for m in modifications]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("lot_id requis") from None
+    base = surcouche_effective(conn, scenario["base_id"])
+    lots = _lots_simulation(conn, ids)
+    propres = {
+        r["lot_id"]: {c: r[c] for c in CHAMPS_SCENARIO}
+        for r in conn.execute(
+            "SELECT lot_id, vote, confiance FROM vote_scenario_lot WHERE scenario_id = ?",
+            (scenario_id,),
+        )
+    }
+
+    for lot_id, m in zip(ids, modifications):
+        if lot_id not in lots:
+            raise ValueError(f"lot {lot_id} introuvable")
+        if m.get("vote") is not None and m["vote"] not in VOTES:
+            raise ValueError(f"vote invalide : {m['vote']}")
+        if m.get("confiance") is not None and m["confiance"] not in CONFIANCES:
+            raise ValueError(f"confiance invalide : {m['confiance']}")
+        etat_base = {c: base.get(lot_id, {}).get(c, lots[lot_id][c]) for c in CHAMPS_SCENARIO}
+        # Champs absents : la surcouche déjà stockée est conservée
+        propre = propres.get(lot_id, {})
+        etat = {
+            c: m[c] if m.get(c) is not None else propre.get(c) or etat_base[c]
+            for c in CHAMPS_SCENARIO
+        }
+        champs = {c: v for c, v in etat.items() if v != etat_base[c]}
+        propres[lot_id] = champs
+        if champs:
+            conn.execute(
+                """INSERT OR REPLACE INTO vote_scenario_lot (scenario_id, lot_id, vote, confiance)
+                   VALUES (?, ?, ?, ?)""",
+                (scenario_id, lot_id, champs.get("vote"), champs.get("confiance")),
+            )
+        else:
+            conn.execute(
+                "DELETE FROM vote_scenario_lot WHERE scenario_id = ? AND lot_id = ?",
+                (scenario_id, lot_id),
+            )
+    return conn.execute(
+        "SELECT COUNT(*) FROM vote_scenario_lot WHERE scenario_id = ?", (scenario_id,)
+    ).fetchone()[0]
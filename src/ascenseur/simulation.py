@@ -3,43 +3,14 @@ from __future__ import annotations
 
 import sqlite3
 
-from ..config import COEF_ASCENSEUR_PAR_ETAGE, TANTIEMES_ASCENSEUR_TOTAL
-
-
-def _estimer_tantieme_lot24(conn: sqlite3.Connection) -> float:
-    """Estime le tantième ascenseur du lot #24 à partir de son coef et des lots voisins.
-
-    Lot #24 : étage 5, coef 3.0, tantieme_ascenseur NULL.
-    On utilise la moyenne des tantièmes des autres lots étage 5 ayant un tantième,
-    pondérée par le ratio tantiemes_generaux.
-    """
-    # Lots étage 5 avec tantième ascenseur connu
-    rows = conn.execute(
-        """SELECT l.tantiemes, l.tantieme_ascenseur
-           FROM lot l JOIN batiment b ON l.batiment_id = b.id
-           WHERE b.code = 'A' AND l.etage = 5
-             AND l.tantieme_ascenseur IS NOT NULL AND l.tantieme_ascenseur > 0
-             AND l.tantiemes > 0"""
-    ).fetchall()
-
-    if not rows:
-        return 0.0
-
-    # Ratio moyen tantieme_ascenseur / tantiemes pour l'étage
-    ratios = [r["tantieme_ascenseur"] / r["tantiemes"] for r in rows]
-    avg_ratio = sum(ratios) / len(ratios)
-
-    # Tantièmes généraux du lot 24
-    lot24 = conn.execute("SELECT tantiemes FROM lot WHERE numero = 24").fetchone()
-    tantiemes_gen = lot24["tantiemes"] if lot24 and lot24["tantiemes"] else 190
-
-    return round(tantiemes_gen * avg_ratio, 1)
+from .imputation import imputer_tantiemes, tantiemes_estimes
 
 
 def calculer_repartition(conn: sqlite3.Connection, montant: float) -> list[dict]:
     """Calcule la quote-part de chaque lot bât A pour un montant donné.
 
-    Utilise tantieme_ascenseur existants + estimation pour le lot #24.
+    Utilise les tantieme_ascenseur existants ; un lot desservi sans tantième
+    prend son estimation (imputation.py), avec sa méthode et son incertitude.
     Retourne une liste triée par étage/localisation.
     """
     rows = conn.execute(
@@ -56,21 +27,18 @@ def calculer_repartition(conn: sqlite3.Connection, montant: float) -> list[dict]
            ORDER BY l.etage, l.localisation"""
     ).fetchall()
 
-    # Estimer lot #24
-    est_lot24 = _estimer_tantieme_lot24(conn)
+    estimations = tantiemes_estimes(conn)
 
     # Construire la liste avec tantièmes effectifs
     lots = []
     total_tantiemes = 0.0
     for r in rows:
         ta = r["tantieme_ascenseur"]
+        estimation = None
         if ta is None or ta == 0:
-            if r["coef_ascenseur"] == 0:
-                ta = 0.0  # RDC ne paie pas
-            elif r["numero"] == 24:
-                ta = est_lot24
-            else:
-                ta = 0.0
+            # RDC (coef 0) ne paie pas ; sans aucun lot connu, pas d'estimation
+            estimation = estimations.get(r["id"])
+            ta = estimation["valeur"] if estimation else 0.0
         total_tantiemes += ta
         lots.append({
             "lot_id": r["id"],
@@ -81,7 +49,9 @@ def calculer_repartition(conn: sqlite3.Connection, montant: float) -> list[dict]
             "coef_ascenseur": r["coef_ascenseur"],
             "tantieme_ascenseur": ta,
             "proprietaire": r["proprietaire"],
-            "estime": r["tantieme_ascenseur"] is None and ta > 0,
+            "estime": estimation is not None,
+            "methode_estimation": estimation["methode"] if estimation else None,
+            "incertitude": estimation["incertitude"] if estimation else None,
         })
 
     # Calculer les quote-parts
@@ -111,6 +81,7 @@ def generer_simulations_tous_devis(conn: sqlite3.Connection) -> None:
     """Pré-calcule et insère les simulations pour tous les devis dans simulation_quotepart."""
     devis_list = conn.execute("SELECT id, montant_ttc FROM devis_ascenseur").fetchall()
 
+    imputer_tantiemes(conn)
     conn.execute("DELETE FROM simulation_quotepart")
 
     for d in devis_list:
@@ -0,0 +1,128 @@
+// Calculs numériques du dashboard (simulation des quote-parts, valorisation).
+// Chargé deux fois : comme script de page (repli sans Worker) et comme Web Worker.
+// Les données par lot sont tenues en colonnes typées, indexées comme les lots
+// de la simulation de base.
+
+let calcData = null;
+
+function indexParNumero(numero) {
+    const index = new Map();
+    numero.forEach((n, i) => index.set(n, i));
+    return index;
+}
+
+// Pondération = tg × (1 + étage × pas) ; RDC et lots sans tantièmes exclus,
+// puis quote-part = pondération / Σ pondérations × montant et transferts de
+// prises en charge (payeur paie plus, bénéficiaire paie moins).
+function computeSimulation(d, p) {
+    const n = d.tg.length;
+    const weights = new Float64Array(n);
+    const qp = new Float64Array(n);
+    const transferts = new Float64Array(n);
+    let totalWeight = 0;
+    for (let i = 0; i < n; i++) {
+        const e = d.etage[i];
+        const tg = d.tg[i];
+        if (e === 0 || tg <= 0) continue;
+        const coef = e > 0 && e <= 6 ? e * p.coefStep : 0;
+        const w = tg * (1 + coef);
+        weights[i] = w;
+        totalWeight += w;
+    }
+    if (totalWeight > 0) {
+        const k = p.montant / totalWeight;
+        for (let i = 0; i < n; i++) qp[i] = weights[i] * k;
+    }
+    (p.pec || []).forEach(r => {
+        const b = d.index.get(r.beneficiaire);
+        const py = d.index.get(r.payeur);
+        if (b === undefined || py === undefined) return;
+        const mt = qp[b] * r.pct / 100;
+        transferts[b] -= mt;
+        transferts[py] += mt;
+    });
+    return { weights, qp, transferts, totalWeight };
+}
+
+// Moyenne d'une colonne par étage (0..maxEtage) en une passe
+function moyennesParEtage(etage, valeurs, maxEtage) {
+    const sommes = new Float64Array(maxEtage + 1);
+    const nb = new Uint32Array(maxEtage + 1);
+    for (let i = 0; i < etage.length; i++) {
+        const e = etage[i];
+        if (e < 0 || e > maxEtage) continue;
+        sommes[e] += valeurs[i];
+        nb[e]++;
+    }
+    for (let e = 0; e <= maxEtage; e++) sommes[e] = nb[e] > 0 ? sommes[e] / nb[e] : 0;
+    return sommes;
+}
+
+function computeValorisation(d, p) {
+    const surface = p.surface, prixM2 = p.prixM2;
+    const params = d.parEtage[p.etage] || d.parEtage[3];
+    const valeurBase = surface * prixM2;
+    const apprec = (params.appreciation_min + params.appreciation_max) / 2;
+    const decote = (params.decote_min + params.decote_max) / 2;
+    const valeurSans = valeurBase * (1 - decote);
+    const valeurAvec = valeurBase * (1 + apprec);
+    const plusValue = valeurAvec - valeurSans;
+
+    const qpMoy = moyennesParEtage(d.etage, d.quotePart, 6);
+    const maint = d.maintenance[p.contrat];
+    const maintMoy = maint ? moyennesParEtage(maint.etage, maint.montant, 6) : new Float64Array(7);
+    const avgQP = p.etage >= 0 && p.etage <= 6 ? qpMoy[p.etage] : 0;
+
+    const loyerAvant = surface * d.loyerM2;
+    const loyerApres = loyerAvant * (1 + (params.impact_loyer_min + params.impact_loyer_max) / 2);
+
+    const etages = [1, 2, 3, 4, 5, 6];
+    const synthese = etages.map(e => {
+        const pe = d.parEtage[e];
+        const pvMin = valeurBase * (pe.appreciation_min + pe.decote_min);
+        const pvMax = valeurBase * (pe.appreciation_max + pe.decote_max);
+        return {
+            etage: e,
+            prime: (pe.appreciation_min + pe.appreciation_max + pe.decote_min + pe.decote_max) / 2 * 100,
+            quotePart: qpMoy[e],
+            maintenance: maintMoy[e],
+            plusValue: valeurBase * ((pe.appreciation_min + pe.appreciation_max) / 2 + (pe.decote_min + pe.decote_max) / 2),
+            pvMin, pvMax,
+            netMin: pvMin - qpMoy[e],
+            netMax: pvMax - qpMoy[e],
+        };
+    });
+
+    return {
+        params, valeurSans, valeurAvec, plusValue, avgQP,
+        roiPct: avgQP > 0 ? (plusValue - avgQP) / avgQP * 100 : 0,
+        roiX: avgQP > 0 ? plusValue / avgQP : 0,
+        primeTotal: (apprec + decote) * 100,
+        loyerAvant, loyerApres,
+        gainAnnuel: (loyerApres - loyerAvant) * 12,
+        synthese,
+    };
+}
+
+const CALC = {
+    init(params) {
+        calcData = params;
+        calcData.simulation.index = indexParNumero(params.simulation.numero);
+    },
+    simulation: params => computeSimulation(calcData.simulation, params),
+    valorisation: params => computeValorisation(calcData.valorisation, params),
+};
+
+// Côté Worker : une requête { type, params } → une réponse { type, params, result }
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    self.onmessage = e => {
+        const { type, params } = e.data;
+        const result = CALC[type](params);
+        if (type === 'simulation') {
+            self.postMessage({ type, params, result },
+                [result.weights.buffer, result.qp.buffer, result.transferts.buffer]);
+        } else if (result !== undefined) {
+            self.postMessage({ type, params, result });
+        }
+    };
+}
@@ -0,0 +1,1687 @@
+Chart.defaults.color = 'rgba(255,255,255,0.6)';
+Chart.defaults.borderColor = 'rgba(255,255,255,0.08)';
+
+// ═══════════════ DONNÉES ═══════════════
+// Le serveur envoie chaque table une seule fois, en colonnes (champ → valeurs ;
+// chaînes répétitives codées par dictionnaire). On reconstruit ici les vues de
+// chaque onglet ; les montants par devis se déduisent des tantièmes ascenseur.
+function fromColumns(cols) {
+    const fields = Object.keys(cols);
+    const arrays = fields.map(f => Array.isArray(cols[f]) ? cols[f] : cols[f].codes.map(c => cols[f].dict[c]));
+    const n = arrays.length ? arrays[0].length : 0;
+    const rows = new Array(n);
+    for (let i = 0; i < n; i++) {
+        const row = {};
+        for (let j = 0; j < fields.length; j++) row[fields[j]] = arrays[j][i];
+        rows[i] = row;
+    }
+    return rows;
+}
+
+// Arrondi sur la valeur décimale exacte, comme round(x, 2) côté Python
+const round2 = x => +x.toFixed(2);
+
+function hydrateData(D) {
+    const lots = fromColumns(D.lots);
+    const lotById = new Map(lots.map(l => [l.lot_id, l]));
+    const votes = fromColumns(D.votes.lignes);
+    const voteById = new Map(votes.map(v => [v.lot_id, v]));
+    const repart = fromColumns(D.repartition);
+    const repartById = new Map(repart.map(r => [r.lot_id, r]));
+    const payeurs = repart.filter(r => r.tantieme_ascenseur > 0);
+    const totalTA = repart.reduce((s, r) => s + r.tantieme_ascenseur, 0);
+    // Quote-part d'un montant : (tant. asc. / Σ tant. asc.) × montant
+    const part = (montant, ta) => totalTA > 0 && ta > 0 ? round2(montant * ta / totalTA) : 0;
+
+    Object.values(D.simulations).forEach(sim => {
+        sim.lots = repart.map(r => {
+            const l = lotById.get(r.lot_id);
+            return {
+                lot_id: r.lot_id, lot_numero: l.numero, etage: l.etage, localisation: l.localisation,
+                tantiemes_generaux: l.tantiemes, coef_ascenseur: l.coef_ascenseur,
+                tantieme_ascenseur: r.tantieme_ascenseur, proprietaire: l.proprietaire,
+                estime: r.estime, methode_estimation: r.methode_estimation, incertitude: r.incertitude,
+                quote_part: part(sim.montant, r.tantieme_ascenseur),
+            };
+        });
+    });
+
+    const BVD = D.budget_valorisation;
+    const payeurRow = (r, champ, montant) => {
+        const l = lotById.get(r.lot_id);
+        return {
+            lot_numero: l.numero, etage: l.etage, proprietaire: l.proprietaire,
+            tantieme_ascenseur: r.tantieme_ascenseur, [champ]: part(montant, r.tantieme_ascenseur),
+        };
+    };
+    Object.values(BVD.maintenance).forEach(m => {
+        m.lots = payeurs.map(r => payeurRow(r, 'maintenance_annuelle', m.maintenance_ttc));
+    });
+    // Référence : premier devis comparable et son contrat de maintenance
+    const montantRef = Object.values(D.simulations)[0].montant;
+    const maintRef = Object.values(BVD.maintenance)[0].maintenance_ttc;
+    BVD.lots = payeurs.map(r => payeurRow(r, 'quote_part', montantRef));
+
+    // Mensualité du prêt par défaut (assurance comprise) = quote-part × facteur unitaire
+    const FIN = D.argumentaire.financement;
+    // Valorisation calculée côté serveur (valorisation.py), bilan pour le devis de référence
+    const refDevis = D.valorisation.devis.find(d => d.fournisseur === Object.keys(D.simulations)[0]);
+    const valoById = new Map(fromColumns(D.valorisation.lots).map(v => [v.lot_id, v]));
+    const bilanById = new Map(fromColumns(D.valorisation.par_devis)
+        .filter(b => refDevis && b.devis_id === refDevis.devis_id).map(b => [b.lot_id, b]));
+    D.argumentaire.lots = lots.map(l => {
+        const r = repartById.get(l.lot_id);
+        const ta = r ? r.tantieme_ascenseur : 0;
+        const qp = part(montantRef, ta);
+        const v = voteById.get(l.lot_id);
+        return {
+            lot_id: l.lot_id, numero: l.numero, batiment: l.batiment, etage: l.etage,
+            localisation: l.localisation, tantiemes: l.tantiemes, coef_ascenseur: l.coef_ascenseur,
+            vote: v ? v.vote : null, confiance: v ? v.confiance : null,
+            proprietaire: l.proprietaire, est_societe: l.est_societe, est_membre_cs: l.est_membre_cs,
+            occupancy: l.occupancy, profils: l.profils, quote_part_cepa: qp, tantieme_ascenseur: ta,
+            surface: l.surface, surface_estimee: l.surface_estimee,
+            mensualite: qp ? round2(qp * FIN.mensualite_unitaire) : 0,
+            maintenance_annuelle: part(maintRef, ta),
+            valo: valoById.get(l.lot_id) || null, bilan: bilanById.get(l.lot_id) || null,
+        };
+    });
+
+    D.votes.detail = votes.map(v => {
+        const l = lotById.get(v.lot_id);
+        return {
+            lot_id: v.lot_id, numero: l.numero, batiment: l.batiment, etage: l.etage,
+            localisation: l.localisation, tantiemes: l.tantiemes, coef_ascenseur: l.coef_ascenseur,
+            tantieme_ascenseur: l.tantieme_ascenseur, vote: v.vote, confiance: v.confiance,
+            argument_cle: v.argument_cle, contact_fait: v.contact_fait, modifie_le: v.modifie_le,
+            proprietaire: l.proprietaire,
+        };
+    });
+
+    D.canvassing = fromColumns(D.canvassing).map(c => {
+        const l = lotById.get(c.lot_id);
+        const v = voteById.get(c.lot_id);
+        return {
+            lot_id: c.lot_id, numero: l.numero, batiment: l.batiment, etage: l.etage,
+            localisation: l.localisation, tantiemes: l.tantiemes, coef_ascenseur: l.coef_ascenseur,
+            vote: v ? v.vote : null, confiance: v ? v.confiance : null, contact_fait: v ? v.contact_fait : null,
+            proprietaire: l.proprietaire, telephone: l.telephone, email: l.email,
+            est_societe: l.est_societe, est_membre_cs: l.est_membre_cs,
+            argument_demarchage: c.argument_demarchage, groupe: c.groupe,
+            priorite_demarchage: c.priorite_demarchage,
+            shapley_art25: c.shapley_art25, shapley_passerelle: c.shapley_passerelle,
+            pouvoir_approche: c.pouvoir_approche,
+        };
+    });
+}
+hydrateData(DATA);
+
+const C = DATA.constantes;
+
+// ═══════════════ TABS ═══════════════
+// Rendu paresseux : chaque onglet est rendu à sa première activation, puis
+// seulement lorsque ses entrées ont changé (voir invalidateTabs).
+const TAB_RENDERERS = {
+    devis: () => renderDevis(),
+    simulation: () => renderSimulation(+document.getElementById('montant-slider').value, +document.getElementById('coef-slider').value),
+    votes: () => renderVotes(),
+    demarchage: () => renderCanvassing(),
+    argumentaire: () => { initArgumentaire(); renderArgumentaire(); },
+    budget: () => { renderBudget(); renderProjection(); renderValorisation(); },
+    plan: () => renderPlan(),
+};
+const tabDirty = new Set(Object.keys(TAB_RENDERERS));
+let activeTab = null;
+
+function renderTabIfDirty(name) {
+    if (!tabDirty.has(name)) return;
+    tabDirty.delete(name);
+    TAB_RENDERERS[name]();
+}
+
+function activateTab(name) {
+    document.querySelectorAll('.tab').forEach(t => t.classList.toggle('active', t.dataset.panel === name));
+    document.querySelectorAll('.panel').forEach(p => p.classList.remove('active'));
+    document.getElementById('panel-' + name).classList.add('active');
+    activeTab = name;
+    renderTabIfDirty(name);
+}
+
+// Marque des onglets à re-rendre ; l'onglet visible est rendu immédiatement
+function invalidateTabs(...names) {
+    names.forEach(n => tabDirty.add(n));
+    if (names.includes(activeTab)) renderTabIfDirty(activeTab);
+}
+
+document.querySelectorAll('.tab').forEach(tab => {
+    tab.addEventListener('click', () => activateTab(tab.dataset.panel));
+});
+
+// ═══════════════ UTILS ═══════════════
+function fmtEur(n) { return n.toLocaleString('fr-FR', {minimumFractionDigits: 2, maximumFractionDigits: 2}) + ' €'; }
+function fmtPct(x) { return x == null ? '-' : (x * 100).toLocaleString('fr-FR', {maximumFractionDigits: 1}) + ' %'; }
+function fmtProp(s) { if (!s) return '-'; return s.split(',').map(n => n.trim()).join(', '); }
+
+// ═══════════════ DEVIS ═══════════════
+function renderDevis() {
+    const comparables = DATA.devis.comparables;
+    const ref = DATA.devis.reference;
+    const all = [...comparables, ...ref];
+    let html = '<tr><th>Critère</th>';
+    all.forEach(d => html += `<th>${d.fournisseur}${d.recommande ? ' ★' : ''}</th>`);
+    html += '</tr>';
+
+    const rows = [
+        ['Montant TTC', d => d.montant_ttc ? d.montant_ttc.toLocaleString('fr-FR') + ' €' : '-'],
+        ['Capacité', d => d.capacite_kg ? `${d.capacite_kg} kg / ${d.capacite_pers || '?'} pers` : '-'],
+        ['Passage', d => d.passage_mm ? d.passage_mm + ' mm' : '-'],
+        ['Cuvette', d => d.cuvette_mm ? d.cuvette_mm + ' mm' : '-'],
+        ['PMR EN 81-70', d => d.pmr_en81_70 ? '<span class="tag tag-pour">Oui</span>' : '<span class="tag tag-contre">Non</span>'],
+        ['Niveaux', d => d.niveaux],
+        ['Maintenance HT/an', d => d.maintenance_ht ? d.maintenance_ht.toLocaleString('fr-FR') + ' €' : '-'],
+        ['Durée travaux', d => d.duree_travaux || '-'],
+    ];
+
+    rows.forEach(([label, fn]) => {
+        html += `<tr><td><strong>${label}</strong></td>`;
+        all.forEach(d => html += `<td>${fn(d)}</td>`);
+        html += '</tr>';
+    });
+
+    document.getElementById('devis-table').innerHTML = html;
+    const sens = DATA.devis.sensibilite;
+    const topsis = DATA.devis.classement
+        .map(f => `${f} ${comparables.find(d => d.fournisseur === f).score_topsis.toFixed(2)}`).join(' · ');
+    document.getElementById('reco-box').innerHTML =
+        `<strong>Recommandation :</strong> ${DATA.devis.recommande} — Seul devis conforme PMR (EN 81-70), passage 700mm permettant l'accès fauteuil roulant, cuvette réduite 350mm.` +
+        `<br><small>Classement multicritère (TOPSIS) : ${topsis}. ${sens.recommande} arrive 1er pour ` +
+        `${fmtPct(sens.local.robustesse)} des pondérations proches de celles retenues et ` +
+        `${fmtPct(sens.global.robustesse)} de ${sens.nb_tirages.toLocaleString('fr-FR')} pondérations tirées au hasard.</small>`;
+
+    // Radar chart
+    const labels = ['Prix', 'Capacité', 'Accessibilité', 'Rapidité', 'Maintenance', 'Niveaux'];
+    const colors = ['#6c8aff', '#ff9f43', '#4cd97b', '#c084fc'];
+    const bgColors = ['rgba(108,138,255,0.2)', 'rgba(255,159,67,0.2)', 'rgba(76,217,123,0.2)', 'rgba(192,132,252,0.2)'];
+    const datasets = comparables.map((d, i) => ({
+        label: d.fournisseur,
+        data: [d.score_prix, d.score_capacite, d.score_accessibilite, d.score_rapidite, d.score_maintenance, d.score_niveaux || 3],
+        borderColor: colors[i % colors.length],
+        backgroundColor: bgColors[i % bgColors.length],
+        pointRadius: 4,
+    }));
+    new Chart(document.getElementById('radar-chart'), {
+        type: 'radar',
+        data: { labels, datasets },
+        options: { scales: { r: { min: 0, max: 5, ticks: { stepSize: 1 } } }, plugins: { legend: { position: 'bottom' } } }
+    });
+
+    // Cost 10y chart (maintenance indexée, calculée côté serveur)
+    const cost10y = comparables.map(d => d.cout_10ans);
+    new Chart(document.getElementById('cost-chart'), {
+        type: 'bar',
+        data: {
+            labels: comparables.map(d => d.fournisseur),
+            datasets: [{ label: 'Coût 10 ans (€)', data: cost10y, backgroundColor: ['#6c8aff', '#ff9f43', '#4cd97b'] }]
+        },
+        options: { plugins: { legend: { display: false } }, scales: { y: { beginAtZero: true, ticks: { callback: v => (v/1000).toFixed(0) + 'k €' } } } }
+    });
+}
+
+// ═══════════════ SIMULATION ═══════════════
+// Générer les boutons de simulation dynamiquement
+const simKeys = Object.keys(DATA.simulations);
+const btnContainer = document.getElementById('montant-buttons');
+simKeys.forEach(key => {
+    const sim = DATA.simulations[key];
+    const btn = document.createElement('span');
+    btn.className = 'btn';
+    btn.dataset.montant = sim.montant;
+    btn.textContent = key + ' ' + sim.montant.toLocaleString('fr-FR') + ' €';
+    btnContainer.appendChild(btn);
+});
+
+const baseKey = simKeys[0];
+let currentMontant = DATA.simulations[baseKey].montant;
+// Résultats de la dernière simulation (partagés avec la page Votes)
+let lastSimResult = {};
+const baseLots = DATA.simulations[baseKey].lots;
+const payeurs = baseLots.filter(l => l.tantieme_ascenseur > 0);
+const totalTA = baseLots.reduce((s, l) => s + l.tantieme_ascenseur, 0);
+const defaultCoefStep = C.coef_step_defaut || 0.5;
+// lot_numero → position dans baseLots (et dans les colonnes du worker)
+const simLotIndex = new Map(baseLots.map((l, i) => [l.lot_numero, i]));
+
+// Compute coefficients: RDC=0, étage e≥1 → e × step
+function computeCoefs(step) {
+    const coefs = {};
+    for (let e = 0; e <= 6; e++) {
+        coefs[e] = e * step;
+    }
+    return coefs;
+}
+
+// Render coefficient badges
+function renderCoefBadges(step) {
+    const coefs = computeCoefs(step);
+    const etageNames = ['RDC', '1er', '2e', '3e', '4e', '5e', '6e'];
+    let html = '';
+    etageNames.forEach((name, i) => {
+        const val = coefs[i].toFixed(2);
+        const bgColor = i === 0 ? 'rgba(255,255,255,0.08)' : 'rgba(108,138,255,0.15)';
+        const borderColor = i === 0 ? 'rgba(255,255,255,0.15)' : 'rgba(108,138,255,0.4)';
+        const textColor = i === 0 ? 'rgba(255,255,255,0.5)' : '#6c8aff';
+        html += `<span style="display:inline-block; padding:3px 10px; border-radius:12px; font-size:11px; font-weight:600; background:${bgColor}; border:1px solid ${borderColor}; color:${textColor}">${name}: ${val}</span>`;
+    });
+    document.getElementById('coef-badges').innerHTML = html;
+}
+
+// Prises en charge : [{ payeur: lot_numero, beneficiaire: lot_numero, pct: 0-100 }]
+let prisesEnCharge = [];
+
+// Populate PEC selects
+function populatePecSelects() {
+    const opts = payeurs.map(l =>
+        `<option value="${l.lot_numero}">#${l.lot_numero} — ${(l.proprietaire || '?').split(',')[0]} (ét.${l.etage})</option>`
+    ).join('');
+    document.getElementById('pec-payeur').innerHTML = opts;
+    document.getElementById('pec-beneficiaire').innerHTML = opts;
+    // Default: payeur = lot 27, bénéficiaire = first lot
+    const selPayeur = document.getElementById('pec-payeur');
+    const opt27 = selPayeur.querySelector('option[value="27"]');
+    if (opt27) opt27.selected = true;
+}
+populatePecSelects();
+
+document.getElementById('pec-add').addEventListener('click', () => {
+    const payeur = +document.getElementById('pec-payeur').value;
+    const benef = +document.getElementById('pec-beneficiaire').value;
+    const pct = Math.min(100, Math.max(1, +document.getElementById('pec-pct').value || 50));
+    if (payeur === benef) return;
+    // Check total PEC on this beneficiary doesn't exceed 100%
+    const existPct = prisesEnCharge.filter(p => p.beneficiaire === benef).reduce((s, p) => s + p.pct, 0);
+    if (existPct + pct > 100) return;
+    prisesEnCharge.push({ payeur, beneficiaire: benef, pct });
+    renderSimulation(+document.getElementById('montant-slider').value, +document.getElementById('coef-slider').value);
+});
+
+function removePec(idx) {
+    prisesEnCharge.splice(idx, 1);
+    renderSimulation(+document.getElementById('montant-slider').value, +document.getElementById('coef-slider').value);
+}
+
+// Publie les résultats de simulation pour la page Votes (par numéro de lot)
+function setLastSimResult(res) {
+    lastSimResult = {};
+    baseLots.forEach((l, i) => {
+        lastSimResult[l.lot_numero] = { tg: l.tantiemes_generaux || 0, ta: res.weights[i], qp: res.qp[i] };
+    });
+}
+
+// Calcul synchrone (démarrage) : la page Votes a besoin des quote-parts d'emblée
+function computeQuoteParts(montant, coefStep) {
+    currentMontant = montant;
+    setLastSimResult(CALC.simulation({ montant, coefStep, pec: [] }));
+}
+
+// Le calcul part dans le worker ; paintSimulation est appelé à la frame suivante
+function renderSimulation(montant, coefStep) {
+    if (coefStep === undefined) coefStep = defaultCoefStep;
+    currentMontant = montant;
+    requestCalc('simulation', { montant, coefStep, pec: prisesEnCharge.slice() });
+}
+
+function paintSimulation({ montant, coefStep, pec }, res) {
+    setLastSimResult(res);
+    // Les colonnes quote-part de l'onglet Votes dépendent de la simulation
+    invalidateTabs('votes');
+    const qpAt = numero => res.qp[simLotIndex.get(numero)] || 0;
+
+    // Render PEC list
+    let pecHtml = '';
+    if (pec.length > 0) {
+        pecHtml = '<table style="font-size:13px; margin-bottom:8px"><tr><th>Payeur</th><th>Bénéficiaire</th><th>%</th><th>Montant transféré</th><th></th></tr>';
+        pec.forEach((p, i) => {
+            const mt = qpAt(p.beneficiaire) * p.pct / 100;
+            const payeurName = payeurs.find(l => l.lot_numero === p.payeur)?.proprietaire?.split(',')[0] || '?';
+            const benefName = payeurs.find(l => l.lot_numero === p.beneficiaire)?.proprietaire?.split(',')[0] || '?';
+            pecHtml += `<tr>
+                <td>#${p.payeur} ${payeurName}</td>
+                <td>#${p.beneficiaire} ${benefName}</td>
+                <td>${p.pct}%</td>
+                <td><strong>${fmtEur(mt)}</strong></td>
+                <td><span onclick="removePec(${i})" style="cursor:pointer; color:#ff6b6b; font-weight:bold" title="Supprimer">✕</span></td>
+            </tr>`;
+        });
+        pecHtml += '</table>';
+    }
+    document.getElementById('pec-list').innerHTML = pecHtml;
+
+    // Compute display coefficients
+    const displayCoefs = computeCoefs(coefStep);
+
+    // Render main table
+    const hasPec = pec.length > 0;
+    let html = '<tr><th>Lot</th><th>Étage</th><th>Localisation</th><th>Propriétaire</th><th>Tantièmes</th><th>Coef.</th><th>Tant. Asc.</th><th>Quote-part</th>';
+    if (hasPec) html += '<th>Coût ajusté</th>';
+    html += '</tr>';
+
+    let totalQP = 0;
+    let lot27QP = 0;
+    let lot27Adj = 0;
+    let currentEtage = null;
+
+    baseLots.forEach((l, i) => {
+        const ta = res.weights[i];
+        const isPayer = ta > 0;
+        const qp = res.qp[i];
+        const adj = isPayer ? qp + res.transferts[i] : 0;
+        totalQP += qp;
+        if (l.lot_numero === 27) { lot27QP = qp; lot27Adj = adj; }
+
+        if (l.etage !== currentEtage) {
+            if (currentEtage !== null) html += `<tr><td colspan="${hasPec ? 9 : 8}" style="height:4px; background:rgba(255,255,255,0.08)"></td></tr>`;
+            currentEtage = l.etage;
+        }
+
+        const estMark = l.estime ? ` <span title="Tantième estimé (${l.methode_estimation}, ± ${l.incertitude})">*</span>` : '';
+        const delta = isPayer ? res.transferts[i] : 0;
+        let adjCell = '';
+        if (hasPec) {
+            if (isPayer && Math.abs(delta) > 0.01) {
+                const color = delta > 0 ? '#ff6b6b' : '#4cd97b';
+                const sign = delta > 0 ? '+' : '';
+                adjCell = `<td style="color:${color}; font-weight:bold">${fmtEur(adj)} <span style="font-size:11px">(${sign}${delta.toFixed(0)})</span></td>`;
+            } else {
+                adjCell = isPayer ? `<td>${fmtEur(adj)}</td>` : '<td>-</td>';
+            }
+        }
+
+        const coefDisplay = displayCoefs[l.etage] !== undefined ? displayCoefs[l.etage].toFixed(2) : l.coef_ascenseur;
+        const taDisplay = ta.toFixed(1);
+        const tgDisplay = l.tantiemes_generaux ? l.tantiemes_generaux.toFixed(1) : '-';
+        const tgMark = '';
+        const rowStyle = !isPayer ? ' style="color:rgba(255,255,255,0.3)"' : '';
+        html += `<tr${rowStyle}>
+            <td>#${l.lot_numero}</td><td>${l.etage}</td><td>${l.localisation}</td>
+            <td>${fmtProp(l.proprietaire)}</td><td>${tgDisplay}${tgMark}</td><td>${coefDisplay}</td>
+            <td>${taDisplay}${estMark}</td>
+            <td>${isPayer ? '<strong>' + fmtEur(qp) + '</strong>' : '-'}</td>
+            ${adjCell}
+        </tr>`;
+    });
+
+    html += `<tr style="background:rgba(255,159,67,0.1); font-weight:bold"><td colspan="7" style="text-align:right">TOTAL</td><td>${fmtEur(totalQP)}</td>`;
+    if (hasPec) html += `<td>${fmtEur(totalQP)}</td>`;
+    html += '</tr>';
+
+    document.getElementById('sim-table').innerHTML = html;
+    document.getElementById('montant-label').textContent = montant.toLocaleString('fr-FR') + ' €';
+
+    let lot27Html = `<strong>Lot #27 (CLAVÉ) :</strong> ${fmtEur(lot27QP)}`;
+    if (hasPec && Math.abs(lot27Adj - lot27QP) > 0.01) {
+        lot27Html += ` → <strong style="color:${lot27Adj > lot27QP ? '#ff6b6b' : '#4cd97b'}">${fmtEur(lot27Adj)}</strong>`;
+    }
+    lot27Html += ` pour un montant de ${fmtEur(montant)}`;
+    document.getElementById('lot27-box').innerHTML = lot27Html;
+
+    // Update coef UI
+    document.getElementById('coef-label').textContent = coefStep.toFixed(2);
+    renderCoefBadges(coefStep);
+}
+
+document.getElementById('montant-slider').addEventListener('input', e => {
+    renderSimulation(+e.target.value, +document.getElementById('coef-slider').value);
+});
+document.getElementById('coef-slider').addEventListener('input', e => {
+    renderSimulation(+document.getElementById('montant-slider').value, +e.target.value);
+});
+document.getElementById('coef-reset').addEventListener('click', () => {
+    document.getElementById('coef-slider').value = defaultCoefStep;
+    renderSimulation(+document.getElementById('montant-slider').value, defaultCoefStep);
+});
+document.querySelectorAll('[data-montant]').forEach(btn => {
+    btn.addEventListener('click', () => {
+        const val = +btn.dataset.montant;
+        document.getElementById('montant-slider').value = val;
+        renderSimulation(val, +document.getElementById('coef-slider').value);
+        document.querySelectorAll('[data-montant]').forEach(b => b.classList.remove('active'));
+        btn.classList.add('active');
+    });
+});
+document.getElementById('montant-slider').value = currentMontant;
+
+// ═══════════════ SYNCHRONISATION HORS LIGNE ═══════════════
+// Les modifications (vote, contact) sont appliquées localement tout de suite,
+// mises en file dans IndexedDB puis envoyées par lots à /api/sync dès que le
+// réseau revient. Une entrée par lot et par type : seule la plus récente compte.
+// Le serveur tranche en last-writer-wins sur des horodatages en heure serveur.
+const SYNC_DB = 'ascenseur-sync';
+const SYNC_STORE = 'modifications';
+const SYNC_BATCH = 50;
+const SYNC_INTERVAL_MS = 30000;
+const SYNC_ENABLED = location.protocol === 'http:' || location.protocol === 'https:';
+let syncDbPromise = null;
+let syncMemory = new Map();   // repli si IndexedDB est indisponible
+let syncClockOffset = 0;      // heure serveur − heure locale (ms)
+let syncRunning = false;
+let syncAgain = false;
+
+function openSyncDb() {
+    if (!syncDbPromise) {
+        syncDbPromise = new Promise(resolve => {
+            if (!SYNC_ENABLED || !window.indexedDB) { resolve(null); return; }
+            const req = indexedDB.open(SYNC_DB, 1);
+            req.onupgradeneeded = () => req.result.createObjectStore(SYNC_STORE, { keyPath: 'cle' });
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => resolve(null);
+        });
+    }
+    return syncDbPromise;
+}
+
+function idbTransaction(db, mode, fn) {
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(SYNC_STORE, mode);
+        const req = fn(tx.objectStore(SYNC_STORE));
+        tx.oncomplete = () => resolve(req ? req.result : undefined);
+        tx.onerror = () => reject(tx.error);
+    });
+}
+
+async function queueAll() {
+    const db = await openSyncDb();
+    if (!db) return [...syncMemory.values()];
+    return idbTransaction(db, 'readonly', store => store.getAll());
+}
+
+async function queuePut(modif) {
+    const db = await openSyncDb();
+    if (!db) { syncMemory.set(modif.cle, modif); return; }
+    await idbTransaction(db, 'readwrite', store => { store.put(modif); });
+}
+
+// Retire les entrées envoyées, sauf celles re-modifiées pendant l'envoi
+async function queueDelete(sent) {
+    const db = await openSyncDb();
+    if (!db) {
+        sent.forEach(m => {
+            const cur = syncMemory.get(m.cle);
+            if (cur && cur.horodatage === m.horodatage) syncMemory.delete(m.cle);
+        });
+        return;
+    }
+    await idbTransaction(db, 'readwrite', store => {
+        sent.forEach(m => {
+            const req = store.get(m.cle);
+            req.onsuccess = () => {
+                if (req.result && req.result.horodatage === m.horodatage) store.delete(m.cle);
+            };
+        });
+    });
+}
+
+function serverNowIso() {
+    return new Date(Date.now() + syncClockOffset).toISOString();
+}
+
+function queueEdit(type, lotId, fields) {
+    const modif = Object.assign({ cle: `${type}:${lotId}`, type, lot_id: lotId, horodatage: serverNowIso() }, fields);
+    queuePut(modif)
+        .then(syncNow)
+        .catch(err => console.error('Erreur mise en file:', err));
+}
+
+// Applique localement l'état d'un lot (modification en file ou arbitrage serveur)
+function applyLocalEdit(lotId, fields) {
+    const idx = votesByLot.get(lotId);
+    if (idx !== undefined) {
+        if (fields.vote !== undefined) applyVoteChange(idx, 'vote', fields.vote);
+        if (fields.confiance != null) applyVoteChange(idx, 'confiance', fields.confiance);
+        if (fields.contact_fait !== undefined) votesState[idx].contact_fait = fields.contact_fait;
+    }
+    const c = DATA.canvassing.find(c => c.lot_id === lotId);
+    if (c) {
+        if (fields.vote !== undefined) c.vote = fields.vote;
+        if (fields.contact_fait !== undefined) c.contact_fait = fields.contact_fait;
+        invalidateTabs('demarchage');
+    }
+}
+
+async function updateSyncStatus() {
+    const el = document.getElementById('sync-status');
+    const n = (await queueAll()).length;
+    const online = navigator.onLine !== false;
+    el.className = 'sync-status' + (!online ? ' offline' : n ? ' pending' : '');
+    const attente = `${n} modification${n > 1 ? 's' : ''} en attente`;
+    el.textContent = !online ? `Hors ligne${n ? ' — ' + attente : ''}` : n ? attente : '';
+}
+
+async function syncNow() {
+    if (!SYNC_ENABLED || navigator.onLine === false) { updateSyncStatus(); return; }
+    if (syncRunning) { syncAgain = true; return; }
+    syncRunning = true;
+    try {
+        const pending = await queueAll();
+        for (let i = 0; i < pending.length; i += SYNC_BATCH) {
+            const batch = pending.slice(i, i + SYNC_BATCH);
+            const t0 = Date.now();
+            const resp = await fetch('/api/sync', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ modifications: batch })
+            });
+            // Une redirection signale une session expirée : on garde la file
+            if (!resp.ok || resp.redirected) throw new Error(`HTTP ${resp.status}`);
+            const data = await resp.json();
+            syncClockOffset = Date.parse(data.server_time) - (t0 + Date.now()) / 2;
+            data.resultats.forEach(r => {
+                if (r.statut === 'ignore' && r.etat) applyLocalEdit(r.lot_id, r.etat);
+            });
+            await queueDelete(batch);
+        }
+    } catch (err) {
+        console.warn('Synchronisation reportée:', err);
+    } finally {
+        syncRunning = false;
+        updateSyncStatus();
+    }
+    if (syncAgain) { syncAgain = false; syncNow(); }
+}
+
+// Au chargement (éventuellement depuis le cache), rejoue la file sur les données
+async function replayPendingEdits() {
+    const pending = await queueAll();
+    pending.sort((a, b) => a.horodatage.localeCompare(b.horodatage))
+        .forEach(m => applyLocalEdit(m.lot_id, m));
+}
+
+// ═══════════════ VOTES ═══════════════
+const VOTE_OPTIONS = ['pour', 'contre', 'abstention', 'absent', 'inconnu'];
+const CONFIANCE_OPTIONS = ['certain', 'probable', 'possible', 'inconnu'];
+let votesState = [];
+// Totaux de tantièmes par vote sur les lots éligibles, tenus à jour par delta
+let voteTallies = {};
+// Index des lots (positions dans votesState) par bâtiment, vote et confiance
+let votesIndex = { batiment: new Map(), vote: new Map(), confiance: new Map() };
+// Lignes actuellement affichées : idx → <tr>
+let votesRows = new Map();
+let votesShownTantiemes = 0;
+// lot_id → position dans votesState
+let votesByLot = new Map();
+
+function getScenarioParams() {
+    const total = C.tantiemes_bat_a;
+    return {
+        total,
+        majorite: Math.floor(total / 2) + 1,
+        passerelle: Math.ceil(total / 3),
+        filterBat: 'A',
+        label: 'Bât A',
+    };
+}
+
+function indexAdd(field, key, idx) {
+    const map = votesIndex[field];
+    if (!map.has(key)) map.set(key, new Set());
+    map.get(key).add(idx);
+}
+
+function indexMove(field, oldKey, newKey, idx) {
+    const old = votesIndex[field].get(oldKey);
+    if (old) old.delete(idx);
+    indexAdd(field, newKey, idx);
+}
+
+function isVoteEligible(v) {
+    const S = getScenarioParams();
+    return !S.filterBat || v.batiment === S.filterBat;
+}
+
+function tallyAdd(v, sign) {
+    if (!isVoteEligible(v)) return;
+    const key = VOTE_OPTIONS.includes(v.vote) ? v.vote : 'inconnu';
+    voteTallies[key] += sign * (v.tantiemes || 0);
+}
+
+function initVotesState(detail) {
+    votesState = JSON.parse(JSON.stringify(detail));
+    voteTallies = { pour: 0, contre: 0, abstention: 0, absent: 0, inconnu: 0 };
+    votesIndex = { batiment: new Map(), vote: new Map(), confiance: new Map() };
+    votesByLot = new Map();
+    votesState.forEach((v, i) => {
+        votesByLot.set(v.lot_id, i);
+        tallyAdd(v, 1);
+        indexAdd('batiment', v.batiment, i);
+        indexAdd('vote', v.vote, i);
+        indexAdd('confiance', v.confiance, i);
+    });
+}
+initVotesState(DATA.votes.detail);
+
+function recalcVotes() {
+    const S = getScenarioParams();
+    const tPour = voteTallies.pour, tContre = voteTallies.contre;
+    const tAbst = voteTallies.abstention, tAbsent = voteTallies.absent, tInconnu = voteTallies.inconnu;
+
+    const art25 = tPour >= S.majorite;
+    const passerelle = tPour >= S.passerelle && !art25;
+    const manquants = Math.max(0, S.majorite - tPour);
+
+    // Metrics
+    document.getElementById('vote-metrics').innerHTML = `
+        <div class="card metric"><div class="value" style="color:#4cd97b">${tPour}</div><div class="label">Tantièmes POUR</div></div>
+        <div class="card metric"><div class="value" style="color:#ff6b6b">${tContre}</div><div class="label">Tantièmes CONTRE</div></div>
+        <div class="card metric"><div class="value">${tInconnu}</div><div class="label">Tantièmes INCONNUS</div></div>
+        <div class="card metric"><div class="value" style="color:${art25 ? '#4cd97b' : passerelle ? '#ff9f43' : '#ff6b6b'}">${art25 ? 'ART.25 OK' : passerelle ? 'PASSERELLE' : 'INSUFFISANT'}</div><div class="label">${manquants > 0 ? 'Manque ' + manquants : 'Majorité atteinte'}</div></div>
+    `;
+
+    // Progress bar — 3 segments sur le total
+    const tOther = tAbst + tAbsent + tInconnu;
+    const tTotal = tPour + tContre + tOther;
+    const pctPour = tTotal > 0 ? (tPour / tTotal) * 100 : 0;
+    const pctContre = tTotal > 0 ? (tContre / tTotal) * 100 : 0;
+    const pctOther = tTotal > 0 ? (tOther / tTotal) * 100 : 0;
+    const bar = document.getElementById('art25-bar');
+    bar.querySelector('.progress-segment-pour').style.width = pctPour + '%';
+    bar.querySelector('.progress-segment-contre').style.width = pctContre + '%';
+    bar.querySelector('.progress-segment-other').style.width = pctOther + '%';
+    const pctMaj = Math.min(100, (tPour / S.majorite) * 100);
+    bar.querySelector('.progress-label').textContent = `${tPour} / ${S.majorite} (${pctMaj.toFixed(0)}%)`;
+    document.getElementById('art25-legend').innerHTML =
+        `<span class="leg-pour">Pour : ${tPour} (${pctPour.toFixed(0)}%)</span>` +
+        `<span class="leg-contre">Contre : ${tContre} (${pctContre.toFixed(0)}%)</span>` +
+        `<span class="leg-other">Abst/Absent/Inconnu : ${tOther} (${pctOther.toFixed(0)}%)</span>`;
+
+    // Dynamic thresholds display
+    document.getElementById('art25-seuils').innerHTML =
+        `<span>Seuil passerelle art.24 : <strong>${S.passerelle}</strong></span> | ` +
+        `<span>Majorité art.25 : <strong>${S.majorite}</strong></span> | ` +
+        `<span>Total ${S.filterBat ? 'Bât ' + S.filterBat : 'copro'} : <strong>${S.total}</strong></span>`;
+
+    return { tPour, tContre, tAbst, tAbsent, tInconnu };
+}
+
+function getVoteFilters() {
+    const S = getScenarioParams();
+    return {
+        scenarioBat: S.filterBat,
+        bat: document.getElementById('vote-filter-bat').value,
+        vote: document.getElementById('vote-filter-vote').value,
+        confiance: document.getElementById('vote-filter-confiance').value,
+        search: document.getElementById('vote-search').value.trim().toLowerCase(),
+    };
+}
+
+function matchesVoteFilters(v, f) {
+    if (f.scenarioBat && v.batiment !== f.scenarioBat) return false;
+    if (f.bat && v.batiment !== f.bat) return false;
+    if (f.vote && v.vote !== f.vote) return false;
+    if (f.confiance && v.confiance !== f.confiance) return false;
+    if (f.search && !(v.proprietaire || '').toLowerCase().includes(f.search)) return false;
+    return true;
+}
+
+// Candidats : plus petit ensemble d'index parmi les filtres actifs
+function filteredVoteIndices(f) {
+    const sets = [];
+    const empty = new Set();
+    if (f.scenarioBat) sets.push(votesIndex.batiment.get(f.scenarioBat) || empty);
+    if (f.bat) sets.push(votesIndex.batiment.get(f.bat) || empty);
+    if (f.vote) sets.push(votesIndex.vote.get(f.vote) || empty);
+    if (f.confiance) sets.push(votesIndex.confiance.get(f.confiance) || empty);
+    let candidates;
+    if (sets.length === 0) {
+        candidates = votesState.map((v, i) => i);
+    } else {
+        sets.sort((a, b) => a.size - b.size);
+        candidates = [...sets[0]].filter(i => sets.every(s => s.has(i)));
+    }
+    if (f.search) candidates = candidates.filter(i => (votesState[i].proprietaire || '').toLowerCase().includes(f.search));
+    return candidates;
+}
+
+const voteOrder = { pour: 0, contre: 1, abstention: 2, absent: 3, inconnu: 4 };
+function cmpFor(key) {
+    if (key === 'bat-asc') return (a, b) => (a.batiment || '').localeCompare(b.batiment || '');
+    if (key === 'bat-desc') return (a, b) => (b.batiment || '').localeCompare(a.batiment || '');
+    if (key === 'ta-desc') return (a, b) => (b.tantieme_ascenseur || 0) - (a.tantieme_ascenseur || 0);
+    if (key === 'ta-asc') return (a, b) => (a.tantieme_ascenseur || 0) - (b.tantieme_ascenseur || 0);
+    if (key === 'tant-desc') return (a, b) => (b.tantiemes || 0) - (a.tantiemes || 0);
+    if (key === 'tant-asc') return (a, b) => (a.tantiemes || 0) - (b.tantiemes || 0);
+    if (key === 'etage-desc') return (a, b) => (b.etage || 0) - (a.etage || 0);
+    if (key === 'etage-asc') return (a, b) => (a.etage || 0) - (b.etage || 0);
+    if (key === 'lot-asc') return (a, b) => (a.numero || 0) - (b.numero || 0);
+    if (key === 'vote') return (a, b) => (voteOrder[a.vote] ?? 9) - (voteOrder[b.vote] ?? 9);
+    return () => 0;
+}
+
+function voteRowHtml(v, i) {
+    const sim = lastSimResult[v.numero];
+    const ta = sim ? sim.ta : 0;
+    const qp = sim ? sim.qp : 0;
+    const tg = sim ? sim.tg : 0;
+    return `<tr data-idx="${i}">
+        <td>#${v.numero}</td><td>${v.batiment}</td><td>${v.etage}</td>
+        <td>${fmtProp(v.proprietaire)}</td><td>${tg || '-'}</td>
+        <td>${ta > 0 ? ta.toFixed(1) : '-'}</td>
+        <td>${ta > 0 ? fmtEur(qp) : '-'}</td>
+        <td><select class="vote-select" data-field="vote">
+            ${VOTE_OPTIONS.map(o =>
+                `<option value="${o}" ${v.vote===o?'selected':''}>${o}</option>`
+            ).join('')}
+        </select></td>
+        <td><select class="confiance-select" data-field="confiance" style="padding:2px 4px; border-radius:4px; font-size:12px; border:1px solid rgba(255,255,255,0.12); background:rgba(255,255,255,0.06); color:white">
+            ${CONFIANCE_OPTIONS.map(o =>
+                `<option value="${o}" ${v.confiance===o?'selected':''}>${o}</option>`
+            ).join('')}
+        </select></td>
+    </tr>`;
+}
+
+function updateVoteFilterCount() {
+    const S = getScenarioParams();
+    const totalEligible = S.filterBat
+        ? (votesIndex.batiment.get(S.filterBat) || new Set()).size
+        : votesState.length;
+    document.getElementById('vote-filter-count').textContent =
+        `${votesRows.size} lots affichés / ${totalEligible} — ${votesShownTantiemes} tantièmes`;
+}
+
+// Rendu complet : uniquement au changement de filtre/tri ou d'onglet
+function renderVotes() {
+    recalcVotes();
+    const f = getVoteFilters();
+    const sort1 = document.getElementById('vote-sort1').value;
+    const sort2 = document.getElementById('vote-sort2').value;
+
+    const indices = filteredVoteIndices(f);
+    const cmp1 = cmpFor(sort1);
+    const cmp2 = sort2 !== 'none' ? cmpFor(sort2) : () => 0;
+    indices.sort((a, b) => cmp1(votesState[a], votesState[b]) || cmp2(votesState[a], votesState[b]));
+
+    // Table — données directement depuis la dernière simulation
+    let html = '<tr><th>Lot</th><th>Bât</th><th>Étage</th><th>Propriétaire</th><th>Tant.</th><th>Tant. Asc.</th><th>Quote-part</th><th>Vote</th><th>Confiance</th></tr>';
+    votesShownTantiemes = 0;
+    indices.forEach(i => {
+        html += voteRowHtml(votesState[i], i);
+        votesShownTantiemes += votesState[i].tantiemes || 0;
+    });
+    const table = document.getElementById('votes-table');
+    table.innerHTML = html;
+    votesRows = new Map();
+    table.querySelectorAll('tr[data-idx]').forEach(tr => votesRows.set(+tr.dataset.idx, tr));
+    updateVoteFilterCount();
+}
+
+// /api/votes en MessagePack (vote et confiance codés par rang), JSON en repli.
+// Avec since : seules les lignes modifiées après cette version (voir applyVotesDelta).
+async function fetchVotes(since) {
+    const url = since === undefined ? '/api/votes' : `/api/votes?since=${since}`;
+    const resp = await fetch(url, { headers: { Accept: 'application/msgpack, application/json;q=0.5' } });
+    if (!resp.ok || resp.redirected) throw new Error(`HTTP ${resp.status}`);
+    if (!(resp.headers.get('Content-Type') || '').includes('msgpack')) return resp.json();
+    const p = decodeMsgpack(await resp.arrayBuffer());
+    const detail = fromColumns(p.detail).map(v => Object.assign(v, {
+        vote: p.votes[v.vote] ?? null,
+        confiance: p.confiances[v.confiance] ?? null,
+    }));
+    return Object.assign(p, { detail });
+}
+
+// Version de la dernière modification connue (high-water mark serveur)
+let votesVersion = DATA.votes.version || 0;
+let votesRefreshing = false;
+let votesRefreshAgain = false;
+
+// Applique un delta : tombstones puis lignes modifiées. Un lot supprimé ou
+// inconnu (réinitialisation) reconstruit l'état ; sinon patch ligne à ligne,
+// sans toucher aux lots qui ont une modification locale encore en file.
+async function applyVotesDelta(delta) {
+    if (delta.complet || delta.supprimes.length || delta.detail.some(v => !votesByLot.has(v.lot_id))) {
+        const parLot = delta.complet ? new Map() : new Map(votesState.map(v => [v.lot_id, v]));
+        delta.supprimes.forEach(id => parLot.delete(id));
+        delta.detail.forEach(v => parLot.set(v.lot_id, v));
+        DATA.votes.detail = [...parLot.values()];
+        initVotesState(DATA.votes.detail);
+        delta.detail.forEach(v => applyLocalEdit(v.lot_id, v));
+        invalidateTabs('votes');
+        await replayPendingEdits();
+    } else if (delta.detail.length) {
+        const pending = new Set((await queueAll()).map(m => m.lot_id));
+        delta.detail.forEach(v => {
+            if (!pending.has(v.lot_id)) applyLocalEdit(v.lot_id, v);
+        });
+    }
+    votesVersion = delta.version;
+}
+
+async function refreshVotes() {
+    if (votesRefreshing) { votesRefreshAgain = true; return; }
+    votesRefreshing = true;
+    try {
+        await applyVotesDelta(await fetchVotes(votesVersion));
+    } finally {
+        votesRefreshing = false;
+    }
+    if (votesRefreshAgain) { votesRefreshAgain = false; await refreshVotes(); }
+}
+
+function saveVote(lot) {
+    queueEdit('vote', lot.lot_id, { vote: lot.vote, confiance: lot.confiance });
+}
+
+// Patch d'une ligne après modification : totaux par delta, index, ligne seule
+function applyVoteChange(idx, field, value) {
+    const lot = votesState[idx];
+    if (lot[field] === value) return;
+    if (field === 'vote') tallyAdd(lot, -1);
+    indexMove(field, lot[field], value, idx);
+    lot[field] = value;
+    if (field === 'vote') tallyAdd(lot, 1);
+    recalcVotes();
+
+    const sort1 = document.getElementById('vote-sort1').value;
+    const sort2 = document.getElementById('vote-sort2').value;
+    if (field === 'vote' && (sort1 === 'vote' || sort2 === 'vote')) {
+        renderVotes();  // la position de la ligne dépend du vote
+        return;
+    }
+    const tr = votesRows.get(idx);
+    if (tr && !matchesVoteFilters(lot, getVoteFilters())) {
+        tr.remove();
+        votesRows.delete(idx);
+        votesShownTantiemes -= lot.tantiemes || 0;
+        updateVoteFilterCount();
+    }
+}
+
+// Délégation : un seul écouteur pour toutes les lignes du tableau
+document.getElementById('votes-table').addEventListener('change', e => {
+    const sel = e.target;
+    if (!sel.matches('.vote-select, .confiance-select')) return;
+    const idx = +sel.closest('tr').dataset.idx;
+    applyVoteChange(idx, sel.dataset.field, sel.value);
+    saveVote(votesState[idx]);
+});
+
+// Filter/sort event handlers
+['vote-filter-bat', 'vote-filter-vote', 'vote-filter-confiance', 'vote-sort1', 'vote-sort2'].forEach(id => {
+    document.getElementById(id).addEventListener('change', () => renderVotes());
+});
+document.getElementById('vote-search').addEventListener('input', () => renderVotes());
+// Reset button
+document.getElementById('vote-reset').addEventListener('click', async () => {
+    try {
+        await fetch('/api/votes/reset', { method: 'POST' });
+        await refreshVotes();
+    } catch(err) { console.error('Erreur reset:', err); }
+    document.getElementById('vote-search').value = '';
+    document.getElementById('vote-filter-bat').value = '';
+    document.getElementById('vote-filter-vote').value = '';
+    document.getElementById('vote-filter-confiance').value = '';
+    document.getElementById('vote-sort1').value = 'bat-asc';
+    document.getElementById('vote-sort2').value = 'ta-desc';
+    renderVotes();
+});
+
+// ═══════════════ DÉMARCHAGE ═══════════════
+function formatPhones(raw) {
+    if (!raw) return '-';
+    return raw.split(/[,\n]+/)
+        .map(s => s.replace(/[\u200e\u200f\u202a-\u202e]/g, '').trim())
+        .filter(s => s && s !== 'na')
+        .map(s => {
+            const digits = s.replace(/\D/g, '');
+            if (digits.length === 10) return digits.replace(/(\d{2})(?=\d)/g, '$1.').slice(0, 14);
+            if (digits.length === 11 && digits.startsWith('33')) return '0' + digits.slice(2).replace(/(\d{2})(?=\d)/g, '$1.').slice(0, 13);
+            if (digits.length === 12 && digits.startsWith('33')) return '0' + digits.slice(2).replace(/(\d{2})(?=\d)/g, '$1.').slice(0, 14);
+            return s;
+        })
+        .join('<br>');
+}
+
+function renderCanvassing() {
+    let html = '<tr><th>Priorité</th><th>Lot</th><th>Bât</th><th>Étage</th><th>Propriétaire</th><th>Téléphone</th><th>Tant.</th><th title="Indice de Shapley–Shubik du propriétaire">Pouvoir art.25 / passerelle</th><th>Vote actuel</th><th>Argument</th><th>Contacté</th></tr>';
+    DATA.canvassing.forEach((c, i) => {
+        html += `<tr>
+            <td>${c.priorite_demarchage}</td>
+            <td>#${c.numero}</td><td>${c.batiment}</td><td>${c.etage}</td>
+            <td>${fmtProp(c.proprietaire)}</td>
+            <td>${formatPhones(c.telephone)}</td>
+            <td>${c.tantiemes || 0}</td>
+            <td>${fmtPct(c.shapley_art25)} / ${fmtPct(c.shapley_passerelle)}</td>
+            <td><span class="tag tag-${c.vote}">${c.vote}</span></td>
+            <td style="max-width:250px; font-size:11px">${c.argument_demarchage}</td>
+            <td><input type="checkbox" class="checkbox-contact" ${c.contact_fait ? 'checked' : ''} data-idx="${i}"></td>
+        </tr>`;
+    });
+    document.getElementById('canvassing-table').innerHTML = html;
+    document.getElementById('canvassing-note').textContent =
+        DATA.canvassing.some(c => c.pouvoir_approche)
+            ? 'Indices de pouvoir approchés : trop de propriétaires indécis pour le calcul exact.'
+            : '';
+}
+document.getElementById('canvassing-table').addEventListener('change', e => {
+    if (!e.target.matches('.checkbox-contact')) return;
+    const idx = +e.target.dataset.idx;
+    const c = DATA.canvassing[idx];
+    c.contact_fait = e.target.checked ? 1 : 0;
+    queueEdit('contact', c.lot_id, { contact_fait: c.contact_fait });
+});
+
+// ═══════════════ ARGUMENTAIRE ═══════════════
+const ARG = DATA.argumentaire;
+
+
+// Filter chips
+const ARG_FILTERS = [
+    { key: 'habitant', label: 'Habitant', fn: l => l.occupancy === 'habitant' },
+    { key: 'bailleur', label: 'Bailleur', fn: l => l.occupancy === 'bailleur' },
+    { key: 'vacant', label: 'Vacant', fn: l => l.occupancy === 'vacant' },
+    { key: 'sci', label: 'SCI', fn: l => l.est_societe },
+    { key: 'cs', label: 'Membre CS', fn: l => l.est_membre_cs },
+    { key: 'etage4', label: 'Étage ≥ 4', fn: l => l.etage >= 4 },
+    { key: 'rdc', label: 'RDC', fn: l => l.etage === 0 },
+    { key: 'contre', label: 'Vote contre', fn: l => l.vote === 'contre' },
+    { key: 'vinconnu', label: 'Vote inconnu', fn: l => l.vote === 'inconnu' },
+    { key: 'absent', label: 'Absent', fn: l => l.vote === 'absent' },
+];
+let argActiveFilters = new Set();
+let argInitialized = false;
+
+// Liste déroulante et filtres : construits à la première ouverture de l'onglet
+function initArgumentaire() {
+    if (argInitialized) return;
+    argInitialized = true;
+    const sel = document.getElementById('arg-proprietaire');
+    ARG.lots.forEach(lot => {
+        const opt = document.createElement('option');
+        opt.value = lot.lot_id;
+        opt.textContent = `Lot #${lot.numero} — ${(lot.proprietaire || '?').split(',')[0]} (Ét.${lot.etage}, Bât ${lot.batiment})`;
+        sel.appendChild(opt);
+    });
+
+    const row = document.getElementById('arg-filters-row');
+    ARG_FILTERS.forEach(f => {
+        const chip = document.createElement('span');
+        chip.className = 'arg-filter-chip';
+        chip.dataset.key = f.key;
+        chip.textContent = f.label;
+        chip.addEventListener('click', () => {
+            chip.classList.toggle('active');
+            if (chip.classList.contains('active')) argActiveFilters.add(f.key);
+            else argActiveFilters.delete(f.key);
+            document.getElementById('arg-proprietaire').value = '';
+            renderArgumentaire();
+        });
+        row.appendChild(chip);
+    });
+}
+
+function getArgBaseArgument(lot) {
+    if (lot.batiment !== 'A') return ARG.bat_bc_argument;
+    return ARG.etage_arguments[lot.etage] || ARG.etage_arguments[0] || { titre: '', argument: '' };
+}
+
+// Clés d'ARGUMENTS_OVERLAY calculées en base (lot_occupation.profils)
+function getArgOverlayKeys(lot) {
+    return lot.profils ? lot.profils.split(',') : [];
+}
+
+function getVoteContext(lot) {
+    if (lot.vote === 'inconnu') return { cls: 'arg-tag-inconnu', text: 'Vote non connu — c\'est l\'occasion de présenter le projet et de recueillir son avis.' };
+    if (lot.vote === 'contre') return { cls: 'tag-contre', text: 'A exprimé des réserves — il est essentiel de comprendre ses objections et d\'y répondre point par point.' };
+    if (lot.vote === 'absent') return { cls: 'tag-absent', text: 'Non joignable jusqu\'ici — prévoir une visite en personne ou un courrier.' };
+    if (lot.vote === 'pour') return { cls: 'tag-pour', text: 'Déjà favorable — le remercier et l\'encourager à parler du projet autour de lui.' };
+    return null;
+}
+
+function renderArgCard(lot) {
+    const base = getArgBaseArgument(lot);
+    const overlayKeys = getArgOverlayKeys(lot);
+    const voteCtx = getVoteContext(lot);
+    const valo = lot.valo;
+
+    // Tags
+    let tagsHtml = '';
+    const occClass = `arg-tag-${lot.occupancy}`;
+    tagsHtml += `<span class="arg-tag ${occClass}">${lot.occupancy}</span>`;
+    if (lot.est_societe) tagsHtml += '<span class="arg-tag arg-tag-sci">SCI</span>';
+    if (lot.est_membre_cs) tagsHtml += '<span class="arg-tag arg-tag-cs">Membre CS</span>';
+    tagsHtml += `<span class="arg-tag tag-${lot.vote || 'inconnu'}">${lot.vote || 'inconnu'}</span>`;
+    if (lot.confiance) tagsHtml += `<span class="arg-tag tag-${lot.confiance}">${lot.confiance}</span>`;
+
+    // Financial box
+    let finHtml = '';
+    if (lot.quote_part_cepa > 0) {
+        finHtml += `<div class="arg-financial-item"><div class="val">${fmtEur(lot.quote_part_cepa)}</div><div class="lbl">Quote-part CEPA</div></div>`;
+        finHtml += `<div class="arg-financial-item"><div class="val">${fmtEur(lot.mensualite)}</div><div class="lbl">Mensualité ${ARG.financement.duree_ans} ans à ${fmtPct(ARG.financement.taux)}</div></div>`;
+    }
+    if (valo) {
+        finHtml += `<div class="arg-financial-item"><div class="val" style="color:#4cd97b">+${fmtEur(valo.plus_value)}</div><div class="lbl">Plus-value (${valo.prime_pct.toFixed(1)}%)</div></div>`;
+        const roi = lot.bilan && lot.bilan.roi != null ? lot.bilan.roi : 0;
+        finHtml += `<div class="arg-financial-item"><div class="val" style="color:${roi >= 1 ? '#4cd97b' : '#ff9f43'}">${roi.toFixed(1)}x</div><div class="lbl">ROI (PV / QP)</div></div>`;
+        if (lot.bilan && lot.bilan.retour_ans != null) {
+            finHtml += `<div class="arg-financial-item"><div class="val">${lot.bilan.retour_ans.toLocaleString('fr-FR')} ans</div><div class="lbl">Retour par les loyers</div></div>`;
+        }
+    }
+    if (lot.maintenance_annuelle > 0) {
+        finHtml += `<div class="arg-financial-item"><div class="val">${fmtEur(lot.maintenance_annuelle)}</div><div class="lbl">Maintenance/an</div></div>`;
+        finHtml += `<div class="arg-financial-item"><div class="val">${fmtEur(lot.maintenance_annuelle / 12)}</div><div class="lbl">Maintenance/mois</div></div>`;
+    }
+
+    // Overlays
+    let overlaysHtml = '';
+    overlayKeys.forEach(k => {
+        const ov = ARG.overlays[k];
+        if (!ov) return;
+        overlaysHtml += `<div class="arg-overlay-section"><h4>${ov.titre}</h4><ul class="arg-bullet-list">`;
+        ov.points.forEach(p => { overlaysHtml += `<li>${p}</li>`; });
+        overlaysHtml += '</ul></div>';
+    });
+
+    // Vote context
+    let voteHtml = '';
+    if (voteCtx) {
+        voteHtml = `<div class="arg-vote-context"><strong>Contexte vote :</strong> ${voteCtx.text}</div>`;
+    }
+
+    return `<div class="card">
+        <div class="arg-card-header">
+            <div>
+                <div class="lot-info">Lot #${lot.numero} — ${(lot.proprietaire || '?').split(',').join(', ')}</div>
+                <div class="lot-sub">Bât ${lot.batiment} · Étage ${lot.etage} · ${lot.localisation || ''} · ${lot.tantiemes || 0} tant. copro${lot.tantieme_ascenseur > 0 ? ' · ' + lot.tantieme_ascenseur.toFixed(1) + ' tant. asc.' : ''}${lot.surface > 0 ? ' · ' + (lot.surface_estimee ? '~' : '') + lot.surface + ' m²' : ''}</div>
+            </div>
+            <button class="btn" onclick="window.print()" style="padding:8px 16px">Imprimer</button>
+        </div>
+        <div class="arg-tags">${tagsHtml}</div>
+        ${finHtml ? '<div class="arg-financial-box">' + finHtml + '</div>' : ''}
+        <div class="arg-main-text"><div class="arg-title">${base.titre}</div>${base.argument}</div>
+        ${overlaysHtml}
+        ${voteHtml}
+    </div>`;
+}
+
+function renderArgListRow(lot) {
+    const occClass = `arg-tag-${lot.occupancy}`;
+    const qp = lot.quote_part_cepa > 0 ? fmtEur(lot.quote_part_cepa) : '-';
+    const tags = `<span class="arg-tag ${occClass}" style="font-size:10px">${lot.occupancy}</span>` +
+        (lot.est_societe ? ' <span class="arg-tag arg-tag-sci" style="font-size:10px">SCI</span>' : '') +
+        (lot.est_membre_cs ? ' <span class="arg-tag arg-tag-cs" style="font-size:10px">CS</span>' : '');
+    return `<tr data-lotid="${lot.lot_id}">
+        <td>#${lot.numero}</td><td>${lot.batiment}</td><td>${lot.etage}</td>
+        <td>${fmtProp(lot.proprietaire)}</td>
+        <td>${tags}</td>
+        <td><span class="tag tag-${lot.vote || 'inconnu'}">${lot.vote || 'inconnu'}</span></td>
+        <td>${qp}</td>
+    </tr>`;
+}
+
+function renderArgumentaire() {
+    const selVal = document.getElementById('arg-proprietaire').value;
+    const cardDiv = document.getElementById('arg-card');
+    const listDiv = document.getElementById('arg-list');
+
+    // Single lot view
+    if (selVal) {
+        const lot = ARG.lots.find(l => l.lot_id == selVal);
+        if (lot) {
+            cardDiv.innerHTML = renderArgCard(lot);
+            cardDiv.style.display = 'block';
+            listDiv.style.display = 'none';
+            document.getElementById('arg-counter').textContent = '';
+            return;
+        }
+    }
+
+    // List view with filters
+    cardDiv.style.display = 'none';
+    listDiv.style.display = 'block';
+
+    let filtered = ARG.lots;
+    if (argActiveFilters.size > 0) {
+        filtered = ARG.lots.filter(lot => {
+            for (const key of argActiveFilters) {
+                const f = ARG_FILTERS.find(f => f.key === key);
+                if (f && !f.fn(lot)) return false;
+            }
+            return true;
+        });
+    }
+
+    document.getElementById('arg-counter').textContent = `${filtered.length} lots correspondants / ${ARG.lots.length} total`;
+
+    argFiltered = filtered;
+    argWindow = null;
+    renderArgListWindow();
+}
+
+// Liste virtualisée : seules les lignes proches de la zone visible sont
+// présentes dans le DOM, encadrées de deux lignes d'espacement.
+const ARG_OVERSCAN = 10;
+let argFiltered = [];
+let argRowHeight = 37;
+let argWindow = null;
+let argScrollPending = false;
+
+function renderArgListWindow() {
+    const table = document.getElementById('arg-list-table');
+    const top = table.getBoundingClientRect().top;
+    const viewH = window.innerHeight || 800;
+    let first = Math.max(0, Math.floor(-top / argRowHeight) - ARG_OVERSCAN);
+    first -= first % 2;  // parité stable pour l'alternance des lignes
+    const last = Math.min(argFiltered.length, Math.ceil((viewH - top) / argRowHeight) + ARG_OVERSCAN);
+    if (argWindow && argWindow[0] === first && argWindow[1] === last) return;
+    argWindow = [first, last];
+
+    let html = '<tr><th>Lot</th><th>Bât</th><th>Étage</th><th>Propriétaire</th><th>Profil</th><th>Vote</th><th>Quote-part</th></tr>';
+    html += `<tr style="height:${first * argRowHeight}px"></tr>`;
+    for (let i = first; i < last; i++) html += renderArgListRow(argFiltered[i]);
+    html += `<tr style="height:${Math.max(0, argFiltered.length - last) * argRowHeight}px"></tr>`;
+    table.innerHTML = html;
+
+    const row = table.querySelector('tr[data-lotid]');
+    if (row && row.offsetHeight) argRowHeight = row.offsetHeight;
+}
+
+function onArgScroll() {
+    if (activeTab !== 'argumentaire' || argScrollPending) return;
+    argScrollPending = true;
+    requestAnimationFrame(() => {
+        argScrollPending = false;
+        if (document.getElementById('arg-list').style.display !== 'none') renderArgListWindow();
+    });
+}
+window.addEventListener('scroll', onArgScroll, { passive: true });
+window.addEventListener('resize', onArgScroll);
+
+// Click on row → open card
+document.getElementById('arg-list-table').addEventListener('click', e => {
+    const tr = e.target.closest('tr[data-lotid]');
+    if (!tr) return;
+    document.getElementById('arg-proprietaire').value = tr.dataset.lotid;
+    renderArgumentaire();
+});
+
+document.getElementById('arg-proprietaire').addEventListener('change', () => {
+    argActiveFilters.clear();
+    document.querySelectorAll('.arg-filter-chip').forEach(c => c.classList.remove('active'));
+    renderArgumentaire();
+});
+
+document.getElementById('arg-clear').addEventListener('click', () => {
+    document.getElementById('arg-proprietaire').value = '';
+    argActiveFilters.clear();
+    document.querySelectorAll('.arg-filter-chip').forEach(c => c.classList.remove('active'));
+    renderArgumentaire();
+});
+
+// ═══════════════ BUDGET & VALORISATION ═══════════════
+const BV = DATA.budget_valorisation;
+const BUDGET = BV.budget;
+const MAINT = BV.maintenance;
+const VALO = BV.valorisation;
+
+// Populate contrat selector
+(function() {
+    const sel = document.getElementById('budget-contrat');
+    Object.keys(MAINT).forEach((k, i) => {
+        const opt = document.createElement('option');
+        opt.value = k;
+        opt.textContent = k + ' — ' + MAINT[k].maintenance_ttc.toLocaleString('fr-FR') + ' € TTC/an';
+        if (i === 0) opt.selected = true;
+        sel.appendChild(opt);
+    });
+})();
+
+function renderBudget() {
+    const contrat = document.getElementById('budget-contrat').value;
+    const m = MAINT[contrat];
+    const maintTTC = m.maintenance_ttc;
+    const budget2025 = BUDGET.budget_2025;
+    const budgetAvec = budget2025 + maintTTC;
+    const pctBudget = (maintTTC / budgetAvec * 100);
+    const trimestreSans = budget2025 / 4;
+    const trimestreAvec = budgetAvec / 4;
+
+    // 4 metrics
+    document.getElementById('budget-metrics').innerHTML = `
+        <div class="card metric"><div class="value">${budget2025.toLocaleString('fr-FR')} €</div><div class="label">Budget SANS ascenseur</div></div>
+        <div class="card metric"><div class="value" style="color:#4cd97b">${budgetAvec.toLocaleString('fr-FR')} €</div><div class="label">Budget AVEC ascenseur</div></div>
+        <div class="card metric"><div class="value" style="color:#ff9f43">${maintTTC.toLocaleString('fr-FR')} €</div><div class="label">Maintenance annuelle (${contrat})</div></div>
+        <div class="card metric"><div class="value">${pctBudget.toFixed(1)}%</div><div class="label">Part dans le budget total</div></div>
+    `;
+
+    // Comparaison sans/avec
+    document.getElementById('budget-compare').innerHTML = `
+        <div class="compare-card sans">
+            <div style="font-weight:600; color:#ff6b6b; margin-bottom:8px">SANS ascenseur</div>
+            <div class="big-value">${fmtEur(budget2025)}</div>
+            <div class="sub">Charges annuelles</div>
+            <div style="margin-top:8px; font-size:16px; font-weight:600">${fmtEur(trimestreSans)}</div>
+            <div class="sub">par trimestre</div>
+        </div>
+        <div class="compare-card avec">
+            <div style="font-weight:600; color:#4cd97b; margin-bottom:8px">AVEC ascenseur (${contrat})</div>
+            <div class="big-value">${fmtEur(budgetAvec)}</div>
+            <div class="sub">Charges annuelles</div>
+            <div style="margin-top:8px; font-size:16px; font-weight:600">${fmtEur(trimestreAvec)}</div>
+            <div class="sub">par trimestre (+${fmtEur(maintTTC / 4)})</div>
+        </div>
+    `;
+
+    // Message clé
+    const lots = m.lots;
+    const minMaint = lots.length > 0 ? Math.min(...lots.map(l => l.maintenance_annuelle)) : 0;
+    const maxMaint = lots.length > 0 ? Math.max(...lots.map(l => l.maintenance_annuelle)) : 0;
+    document.getElementById('budget-message').innerHTML =
+        `<strong>Impact réel par copropriétaire :</strong> de <strong>${fmtEur(minMaint)}</strong> à <strong>${fmtEur(maxMaint)}</strong> par an selon l'étage — soit ${fmtEur(minMaint / 12)} à ${fmtEur(maxMaint / 12)} par mois. La maintenance ascenseur représente seulement <strong>${pctBudget.toFixed(1)}%</strong> du budget total.`;
+
+    // Tableau maintenance par lot
+    let thtml = '<tr><th>Étage</th><th>Lot</th><th>Propriétaire</th><th>Tant. asc.</th><th>Maintenance/an</th><th>Maintenance/mois</th></tr>';
+    lots.forEach(l => {
+        thtml += `<tr>
+            <td>${l.etage}</td><td>#${l.lot_numero}</td>
+            <td>${fmtProp(l.proprietaire)}</td>
+            <td>${l.tantieme_ascenseur.toFixed(1)}</td>
+            <td><strong>${fmtEur(l.maintenance_annuelle)}</strong></td>
+            <td>${fmtEur(l.maintenance_annuelle / 12)}</td>
+        </tr>`;
+    });
+    document.getElementById('budget-lots-table').innerHTML = thtml;
+
+    // Chart 1 : Évolution budgétaire 2022→2026
+    if (window._budgetEvolChart) window._budgetEvolChart.destroy();
+    const hist = BUDGET.historique;
+    const years = hist.map(h => h.annee).concat([2026]);
+    const budgets = hist.map(h => h.budget).concat([budget2025]);
+    const budgetsAsc = [null, null, null, null, maintTTC];
+    window._budgetEvolChart = new Chart(document.getElementById('budget-evol-chart'), {
+        type: 'bar',
+        data: {
+            labels: years,
+            datasets: [
+                { label: 'Budget courant', data: budgets, backgroundColor: '#6c8aff' },
+                { label: 'Maintenance ascenseur', data: budgetsAsc, backgroundColor: '#ff9f43' },
+            ]
+        },
+        options: {
+            responsive: true,
+            plugins: { legend: { position: 'bottom' } },
+            scales: {
+                x: { stacked: true },
+                y: { stacked: true, beginAtZero: true, ticks: { callback: v => (v/1000).toFixed(0) + 'k €' } }
+            }
+        }
+    });
+
+    // Chart 2 : Doughnut part ascenseur
+    if (window._budgetDoughnutChart) window._budgetDoughnutChart.destroy();
+    window._budgetDoughnutChart = new Chart(document.getElementById('budget-doughnut-chart'), {
+        type: 'doughnut',
+        data: {
+            labels: ['Charges courantes', 'Maintenance ascenseur'],
+            datasets: [{ data: [budget2025, maintTTC], backgroundColor: ['#6c8aff', '#ff9f43'] }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                legend: { position: 'bottom' },
+                tooltip: { callbacks: { label: ctx => ctx.label + ' : ' + fmtEur(ctx.raw) + ' (' + (ctx.raw / budgetAvec * 100).toFixed(1) + '%)' } }
+            }
+        }
+    });
+
+    // Chart 3 : Comparaison des contrats
+    if (window._budgetContratsChart) window._budgetContratsChart.destroy();
+    const contratNames = Object.keys(MAINT);
+    const contratCosts = contratNames.map(k => MAINT[k].maintenance_ttc);
+    const contratColors = contratNames.map(k => k === contrat ? '#6c8aff' : 'rgba(108,138,255,0.4)');
+    window._budgetContratsChart = new Chart(document.getElementById('budget-contrats-chart'), {
+        type: 'bar',
+        data: {
+            labels: contratNames,
+            datasets: [{ label: 'Maintenance TTC/an', data: contratCosts, backgroundColor: contratColors }]
+        },
+        options: {
+            indexAxis: 'y',
+            responsive: true,
+            plugins: { legend: { display: false } },
+            scales: { x: { beginAtZero: true, ticks: { callback: v => fmtEur(v) } } }
+        }
+    });
+}
+
+document.getElementById('budget-contrat').addEventListener('change', renderBudget);
+
+// ── Projection des charges ──
+// Charge d'un lot = parts du lot × séries de la copropriété (projection.py)
+const PROJ = BV.projection;
+const PROJ_LOTS = fromColumns(PROJ.lots);
+
+(function() {
+    const sel = document.getElementById('projection-lot');
+    PROJ_LOTS.filter(l => l.part_ascenseur > 0).forEach((l, i) => {
+        const opt = document.createElement('option');
+        opt.value = l.lot_id;
+        opt.textContent = 'Lot ' + l.numero;
+        if (i === 0) opt.selected = true;
+        sel.appendChild(opt);
+    });
+})();
+
+function chargesProjetees(lot, devis) {
+    return PROJ.trimestres.map((_, t) => {
+        let v = lot.part_courant * PROJ.series.courant[t] + lot.part_fonds_travaux * PROJ.series.fonds_travaux[t];
+        if (devis) v += lot.part_ascenseur * (devis.installation[t] + devis.maintenance[t]);
+        return round2(v);
+    });
+}
+
+function renderProjection() {
+    const lotId = +document.getElementById('projection-lot').value;
+    const lot = PROJ_LOTS.find(l => l.lot_id === lotId);
+    if (!lot) return;
+    const colors = ['#6c8aff', '#ff9f43', '#4cd97b', '#ff6b6b'];
+    const sans = chargesProjetees(lot, null);
+    const datasets = [{ label: 'Sans ascenseur', data: sans, borderColor: '#888', borderDash: [4, 4], pointRadius: 0 }]
+        .concat(PROJ.devis.map((d, i) => ({
+            label: d.fournisseur, data: chargesProjetees(lot, d),
+            borderColor: colors[i % colors.length], pointRadius: 0,
+        })));
+    if (window._projectionChart) window._projectionChart.destroy();
+    window._projectionChart = new Chart(document.getElementById('projection-chart'), {
+        type: 'line',
+        data: { labels: PROJ.trimestres, datasets },
+        options: {
+            responsive: true,
+            plugins: { legend: { position: 'bottom' }, tooltip: { callbacks: { label: ctx => ctx.dataset.label + ' : ' + fmtEur(ctx.raw) } } },
+            scales: { y: { beginAtZero: true, ticks: { callback: v => fmtEur(v) } } }
+        }
+    });
+    const tendance = PROJ.tendances.courant;
+    const dernier = PROJ.trimestres.length - 1;
+    const source = PROJ.source === 'exercices' ? 'des exercices saisis' : 'des budgets votés';
+    document.getElementById('projection-message').innerHTML =
+        `Charges courantes prolongées à <strong>${fmtPct(tendance.croissance)}</strong> par an (tendance ${source}). ` +
+        `Lot ${lot.numero} en ${PROJ.trimestres[dernier]} : <strong>${fmtEur(sans[dernier])}</strong> par trimestre sans ascenseur` +
+        PROJ.devis.map(d => `, ${fmtEur(chargesProjetees(lot, d)[dernier])} avec ${d.fournisseur}`).join('') + '.';
+}
+
+document.getElementById('projection-lot').addEventListener('change', renderProjection);
+
+// ── Valorisation ──
+function renderValorisation() {
+    requestCalc('valorisation', {
+        etage: +document.getElementById('valo-etage').value,
+        surface: +document.getElementById('valo-surface').value || 45,
+        prixM2: +document.getElementById('valo-prixm2').value || 9000,
+        contrat: document.getElementById('budget-contrat').value,
+    });
+}
+
+// Met à jour un graphique en place (pas de destroy/new à chaque frame de slider)
+function upsertChart(key, canvasId, config) {
+    const chart = window[key];
+    if (chart && chart.config.type === config.type && chart.data.datasets.length === config.data.datasets.length) {
+        chart.data.labels = config.data.labels;
+        config.data.datasets.forEach((ds, i) => Object.assign(chart.data.datasets[i], ds));
+        chart.update('none');
+        return chart;
+    }
+    if (chart) chart.destroy();
+    return (window[key] = new Chart(document.getElementById(canvasId), config));
+}
+
+function paintValorisation(p, r) {
+    const params = r.params;
+    const { valeurSans, valeurAvec, plusValue, avgQP, roiPct, roiX, primeTotal } = r;
+    const decoteMoy = (params.decote_min + params.decote_max) / 2;
+    const apprecMoy = (params.appreciation_min + params.appreciation_max) / 2;
+
+    // 4 metrics
+    document.getElementById('valo-metrics').innerHTML = `
+        <div class="card metric"><div class="value">${fmtEur(valeurSans)}</div><div class="label">Valeur sans ascenseur</div></div>
+        <div class="card metric"><div class="value" style="color:#4cd97b">${fmtEur(valeurAvec)}</div><div class="label">Valeur avec ascenseur</div></div>
+        <div class="card metric"><div class="value" style="color:#ff9f43">+${fmtEur(plusValue)}</div><div class="label">Plus-value estimée (prime ${primeTotal.toFixed(1)}%)</div></div>
+        <div class="card metric"><div class="value" style="color:${roiPct >= 0 ? '#4cd97b' : '#ff6b6b'}">${roiPct >= 0 ? '+' : ''}${roiPct.toFixed(0)}%</div><div class="label">Rendement net (PV − quote-part)</div></div>
+    `;
+
+    // Cartes avant/après
+    document.getElementById('valo-compare').innerHTML = `
+        <div class="compare-card sans">
+            <div style="font-weight:600; color:#ff6b6b; margin-bottom:8px">SANS ascenseur</div>
+            <div class="big-value">${fmtEur(valeurSans)}</div>
+            <div class="sub">Décote -${(decoteMoy * 100).toFixed(1)}% vs prix moyen du quartier</div>
+        </div>
+        <div class="compare-card avec">
+            <div style="font-weight:600; color:#4cd97b; margin-bottom:8px">AVEC ascenseur</div>
+            <div class="big-value">${fmtEur(valeurAvec)}</div>
+            <div class="sub">Prime ascenseur +${(apprecMoy * 100).toFixed(1)}% (source : MeilleursAgents)</div>
+        </div>
+    `;
+
+    // ROI box
+    const roiBg = roiPct >= 0 ? 'rgba(76,217,123,0.15)' : 'rgba(255,107,107,0.15)';
+    const roiBorder = roiPct >= 0 ? 'rgba(76,217,123,0.3)' : 'rgba(255,107,107,0.3)';
+    document.getElementById('valo-roi').innerHTML = `
+        <div class="roi-label">Quote-part investissement : ${fmtEur(avgQP)}</div>
+        <div class="roi-value">${roiPct >= 0 ? '+' : ''}${fmtEur(plusValue - avgQP)}</div>
+        <div class="roi-label">Plus-value nette après déduction de la quote-part</div>
+        <div style="margin-top:8px; font-size:13px; color:rgba(255,255,255,0.7)">
+            ${roiX >= 1 ? 'La plus-value couvre ' + roiX.toFixed(1) + 'x la quote-part' : 'La plus-value couvre ' + (roiX * 100).toFixed(0) + '% de la quote-part'}
+        </div>
+    `;
+    document.getElementById('valo-roi').style.background = roiBg;
+    document.getElementById('valo-roi').style.border = '1px solid ' + roiBorder;
+
+    // Impact locatif
+    document.getElementById('valo-loyer-info').innerHTML = `
+        <div class="compare-grid">
+            <div class="compare-card sans">
+                <div style="font-weight:600; color:#ff6b6b">Loyer SANS ascenseur</div>
+                <div class="big-value">${fmtEur(r.loyerAvant)}/mois</div>
+            </div>
+            <div class="compare-card avec">
+                <div style="font-weight:600; color:#4cd97b">Loyer AVEC ascenseur</div>
+                <div class="big-value">${fmtEur(r.loyerApres)}/mois</div>
+                <div class="sub">Gain annuel : +${fmtEur(r.gainAnnuel)}</div>
+            </div>
+        </div>
+    `;
+
+    // Chart : Investissement vs plus-value par étage
+    upsertChart('_valoInvestChart', 'valo-investissement-chart', {
+        type: 'bar',
+        data: {
+            labels: r.synthese.map(s => 'Étage ' + s.etage),
+            datasets: [
+                { label: 'Quote-part investissement', data: r.synthese.map(s => s.quotePart), backgroundColor: '#6c8aff' },
+                { label: 'Plus-value estimée', data: r.synthese.map(s => s.plusValue), backgroundColor: '#4cd97b' },
+            ]
+        },
+        options: {
+            responsive: true,
+            plugins: { legend: { position: 'bottom' } },
+            scales: { y: { beginAtZero: true, ticks: { callback: v => (v/1000).toFixed(0) + 'k €' } } }
+        }
+    });
+
+    // Chart : Loyer avant/après
+    upsertChart('_valoLoyerChart', 'valo-loyer-chart', {
+        type: 'bar',
+        data: {
+            labels: ['Sans ascenseur', 'Avec ascenseur'],
+            datasets: [{ label: 'Loyer mensuel (€)', data: [r.loyerAvant, r.loyerApres], backgroundColor: ['#ff6b6b', '#4cd97b'] }]
+        },
+        options: {
+            responsive: true,
+            plugins: { legend: { display: false } },
+            scales: { y: { beginAtZero: true, ticks: { callback: v => fmtEur(v) } } }
+        }
+    });
+
+    // Tableau synthèse par étage
+    let shtml = '<tr><th>Étage</th><th>Prime asc.</th><th>Quote-part moy.</th><th>Maintenance/an</th><th>Plus-value min</th><th>Plus-value max</th><th>Bilan net min</th><th>Bilan net max</th></tr>';
+    r.synthese.forEach(s => {
+        const netMinColor = s.netMin >= 0 ? '#4cd97b' : '#ff6b6b';
+        const netMaxColor = s.netMax >= 0 ? '#4cd97b' : '#ff6b6b';
+        shtml += `<tr>
+            <td><strong>Étage ${s.etage}</strong></td>
+            <td>${s.prime.toFixed(1)}%</td>
+            <td>${fmtEur(s.quotePart)}</td>
+            <td>${fmtEur(s.maintenance)}/an</td>
+            <td>+${fmtEur(s.pvMin)}</td>
+            <td>+${fmtEur(s.pvMax)}</td>
+            <td style="color:${netMinColor}; font-weight:bold">${s.netMin >= 0 ? '+' : ''}${fmtEur(s.netMin)}</td>
+            <td style="color:${netMaxColor}; font-weight:bold">${s.netMax >= 0 ? '+' : ''}${fmtEur(s.netMax)}</td>
+        </tr>`;
+    });
+    document.getElementById('valo-synthese-table').innerHTML = shtml;
+}
+
+['valo-etage', 'valo-surface', 'valo-prixm2'].forEach(id => {
+    document.getElementById(id).addEventListener('change', renderValorisation);
+    document.getElementById(id).addEventListener('input', renderValorisation);
+});
+
+// ═══════════════ PLAN D'ACTION ═══════════════
+function renderPlan() {
+    let html = '';
+    DATA.action_plan.forEach(a => {
+        html += `<div class="timeline-item">
+            <div class="timeline-dot ${a.statut}"></div>
+            <div style="margin-bottom:4px">
+                <strong>Étape ${a.etape}</strong> — ${a.titre}
+                <span class="tag tag-${a.statut === 'fait' ? 'pour' : a.statut === 'en_cours' ? 'abstention' : a.statut === 'bloque' ? 'contre' : 'inconnu'}">${a.statut.replace('_', ' ')}</span>
+            </div>
+            <div style="font-size:12px; color:rgba(255,255,255,0.5); margin-bottom:4px">${a.description || ''}</div>
+            <div style="font-size:11px; color:rgba(255,255,255,0.35)">Cible : ${a.date_cible || '?'} | Responsable : ${a.responsable || '?'}</div>
+        </div>`;
+    });
+    document.getElementById('timeline').innerHTML = html;
+}
+
+// ═══════════════ CALCULS EN ARRIÈRE-PLAN ═══════════════
+// Simulation et valorisation sont calculées dans un Web Worker (calc.js) sur
+// des colonnes typées. Une seule requête en vol par type : pendant un glisser
+// de slider, seules la requête en cours et la plus récente sont conservées, et
+// les résultats sont peints au plus une fois par frame.
+const CALC_PAINTERS = { simulation: paintSimulation, valorisation: paintValorisation };
+const calcPending = {};   // type → paramètres en attente d'envoi
+const calcInFlight = {};  // type → paramètres en cours de calcul
+const calcResults = {};   // type → { params, result } à peindre
+let calcFramePending = false;
+
+function calcInitData() {
+    const maintenance = {};
+    Object.keys(MAINT).forEach(k => {
+        maintenance[k] = {
+            etage: Int32Array.from(MAINT[k].lots, l => l.etage || 0),
+            montant: Float64Array.from(MAINT[k].lots, l => l.maintenance_annuelle || 0),
+        };
+    });
+    return {
+        simulation: {
+            numero: Int32Array.from(baseLots, l => l.lot_numero),
+            etage: Int32Array.from(baseLots, l => l.etage || 0),
+            tg: Float64Array.from(baseLots, l => l.tantiemes_generaux || 0),
+        },
+        valorisation: {
+            etage: Int32Array.from(BV.lots, l => l.etage || 0),
+            quotePart: Float64Array.from(BV.lots, l => l.quote_part || 0),
+            maintenance,
+            parEtage: VALO.par_etage,
+            loyerM2: VALO.loyer_m2_base,
+        },
+    };
+}
+
+function createCalcWorker(initData) {
+    if (typeof Worker === 'undefined') return null;
+    const el = document.getElementById('calc-script');
+    if (!el) return null;
+    try {
+        // Export HTML autonome : pas d'URL, le worker est créé depuis le source embarqué
+        const url = el.src || URL.createObjectURL(new Blob([el.textContent], { type: 'text/javascript' }));
+        const worker = new Worker(url);
+        worker.postMessage({ type: 'init', params: initData });
+        return worker;
+    } catch (err) {
+        console.warn('Calculs sur le thread principal :', err);
+        return null;
+    }
+}
+
+const calcInit = calcInitData();
+CALC.init(calcInit);
+computeQuoteParts(currentMontant, defaultCoefStep);
+let calcWorker = createCalcWorker(calcInit);
+if (calcWorker) {
+    calcWorker.onmessage = e => {
+        const { type, params, result } = e.data;
+        delete calcInFlight[type];
+        calcResults[type] = { params, result };
+        if (calcPending[type]) sendCalc(type);
+        scheduleCalcPaint();
+    };
+    calcWorker.onerror = err => {
+        console.warn('Worker de calcul indisponible, repli sur le thread principal :', err.message);
+        calcWorker = null;
+        Object.keys(calcInFlight).forEach(type => {
+            if (!calcPending[type]) calcPending[type] = calcInFlight[type];
+            delete calcInFlight[type];
+        });
+        Object.keys(calcPending).forEach(sendCalc);
+    };
+}
+
+function requestCalc(type, params) {
+    calcPending[type] = params;
+    if (!calcInFlight[type]) sendCalc(type);
+}
+
+function sendCalc(type) {
+    const params = calcPending[type];
+    delete calcPending[type];
+    if (!calcWorker) {
+        calcResults[type] = { params, result: CALC[type](params) };
+        scheduleCalcPaint();
+        return;
+    }
+    calcInFlight[type] = params;
+    calcWorker.postMessage({ type, params });
+}
+
+function scheduleCalcPaint() {
+    if (calcFramePending) return;
+    calcFramePending = true;
+    requestAnimationFrame(() => {
+        calcFramePending = false;
+        Object.keys(calcResults).forEach(type => {
+            const { params, result } = calcResults[type];
+            delete calcResults[type];
+            CALC_PAINTERS[type](params, result);
+        });
+    });
+}
+
+// ═══════════════ DÉMARRAGE ═══════════════
+const initialTab = document.querySelector('.tab.active');
+activateTab(initialTab ? initialTab.dataset.panel : 'devis');
+
+if (SYNC_ENABLED) {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch(err => console.warn('Service worker:', err));
+    }
+    // Envoie la file puis récupère les changements faits depuis d'autres postes
+    const syncAndRefresh = async () => {
+        await syncNow();
+        if (navigator.onLine === false) return;
+        refreshVotes().catch(err => console.warn('Rafraîchissement reporté:', err));
+    };
+    window.addEventListener('online', syncAndRefresh);
+    window.addEventListener('offline', updateSyncStatus);
+    setInterval(syncAndRefresh, SYNC_INTERVAL_MS);
+    replayPendingEdits().then(syncAndRefresh).catch(err => console.error('Erreur file hors ligne:', err));
+}
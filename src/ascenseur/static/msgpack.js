@@ -0,0 +1,78 @@
+// Décodeur MessagePack minimal (réponses binaires de l'API, voir src/messagepack.py).
+// Couvre nil, booléens, entiers, flottants, chaînes, binaires, tableaux et maps ;
+// les types ext ne sont pas utilisés par le serveur.
+const MSGPACK_UTF8 = new TextDecoder();
+
+function decodeMsgpack(buffer) {
+    const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const utf8 = MSGPACK_UTF8;
+    let pos = 0;
+
+    function str(n) {
+        const s = utf8.decode(bytes.subarray(pos, pos + n));
+        pos += n;
+        return s;
+    }
+    function bin(n) {
+        const b = bytes.slice(pos, pos + n);
+        pos += n;
+        return b;
+    }
+    function array(n) {
+        const a = new Array(n);
+        for (let i = 0; i < n; i++) a[i] = read();
+        return a;
+    }
+    function map(n) {
+        const o = {};
+        for (let i = 0; i < n; i++) {
+            const k = read();
+            o[k] = read();
+        }
+        return o;
+    }
+    function u8() { return view.getUint8(pos++); }
+    function u16() { const v = view.getUint16(pos); pos += 2; return v; }
+    function u32() { const v = view.getUint32(pos); pos += 4; return v; }
+
+    function read() {
+        const t = u8();
+        if (t < 0x80) return t;
+        if (t < 0x90) return map(t & 0x0f);
+        if (t < 0xa0) return array(t & 0x0f);
+        if (t < 0xc0) return str(t & 0x1f);
+        if (t >= 0xe0) return t - 0x100;
+        let v;
+        switch (t) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return bin(u8());
+            case 0xc5: return bin(u16());
+            case 0xc6: return bin(u32());
+            case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+            case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+            case 0xcc: return u8();
+            case 0xcd: return u16();
+            case 0xce: return u32();
+            case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v;
+            case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+            case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+            case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+            case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v;
+            case 0xd9: return str(u8());
+            case 0xda: return str(u16());
+            case 0xdb: return str(u32());
+            case 0xdc: return array(u16());
+            case 0xdd: return array(u32());
+            case 0xde: return map(u16());
+            case 0xdf: return map(u32());
+        }
+        throw new Error(`MessagePack : type 0x${t.toString(16)} non pris en charge`);
+    }
+
+    const value = read();
+    if (pos !== bytes.length) throw new Error('MessagePack : octets en trop');
+    return value;
+}
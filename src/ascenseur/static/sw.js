@@ -0,0 +1,56 @@
+// Service worker du dashboard : coquille et dernier instantané disponibles hors ligne.
+// Le nom du cache et la liste PRECACHE sont injectés au service (assets.service_worker).
+const CACHE = 'ascenseur-__VERSION__';
+const PRECACHE = __PRECACHE__;
+// Instantanés de données : réseau d'abord, cache en repli
+const SNAPSHOTS = ['/', '/api/votes'];
+
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(CACHE).then(cache => cache.addAll(PRECACHE)));
+    self.skipWaiting();
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys.filter(k => k.startsWith('ascenseur-') && k !== CACHE).map(k => caches.delete(k))))
+            .then(() => self.clients.claim())
+    );
+});
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok) (await caches.open(CACHE)).put(request, response.clone());
+    return response;
+}
+
+async function networkFirst(request, key) {
+    try {
+        const response = await fetch(request);
+        // Une redirection vers /login (session expirée) ne remplace pas l'instantané
+        if (response.ok && !response.redirected) {
+            (await caches.open(CACHE)).put(key, response.clone());
+        }
+        return response;
+    } catch (err) {
+        const cached = await caches.match(key);
+        if (cached) return cached;
+        throw err;
+    }
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (url.pathname.startsWith('/static/')) {
+        event.respondWith(cacheFirst(request));
+    } else if (SNAPSHOTS.includes(url.pathname) && !url.search) {
+        // Les deltas (/api/votes?since=) ne remplacent pas l'instantané complet
+        event.respondWith(networkFirst(request, url.pathname));
+    }
+});
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import sqlite3
 
+from .pouvoir import SEUILS_POUVOIR, calculer_pouvoir
+
 
 # Arguments par étage pour le bâtiment A
 ARGUMENTS_PAR_ETAGE = {
@@ -59,14 +61,23 @@ ARGUMENT_BAT_BC = {
 }
 
 
-def get_full_canvassing_list(conn: sqlite3.Connection) -> list[dict]:
+def get_full_canvassing_list(
+    conn: sqlite3.Connection, filtre: str = "", params: tuple = ()
+) -> list[dict]:
     """Liste priorisée de démarchage avec arguments adaptés.
 
-    Tri : priorité de démarchage (les plus importants à convaincre en premier).
-    Exclut les lots dont le vote est déjà 'pour/certain'.
+    ``filtre`` : conditions SQL supplémentaires sur les alias l, b et vs
+    (voir recherche.py), avec leurs ``params``.
+
+    Chaque lot porte les indices de pouvoir de son propriétaire (Banzhaf et
+    Shapley–Shubik, art.25 et passerelle) compte tenu des votes acquis, et
+    ``pouvoir_approche`` si ces indices sont approchés (jeu trop grand).
+
+    Tri : priorité de démarchage (les plus importants à convaincre en premier),
+    puis pouvoir de décision. Exclut les lots dont le vote est déjà 'pour/certain'.
     """
     rows = conn.execute(
-        """SELECT l.id AS lot_id, l.numero, b.code AS batiment, l.etage, l.localisation,
+        f"""SELECT l.id AS lot_id, l.numero, b.code AS batiment, l.etage, l.localisation,
                   l.tantiemes, l.coef_ascenseur,
                   vs.vote, vs.confiance, vs.contact_fait,
                   GROUP_CONCAT(DISTINCT p.nom_complet) AS proprietaire,
@@ -80,9 +91,13 @@ def get_full_canvassing_list(conn: sqlite3.Connection) -> list[dict]:
                 AND lp.role = 'proprietaire' AND lp.actif = 1
            LEFT JOIN personne p ON lp.personne_id = p.id
            LEFT JOIN vote_simulation vs ON vs.lot_id = l.id
+           WHERE {filtre or "1"}
            GROUP BY l.id
-           ORDER BY b.code, l.etage, l.localisation"""
+           ORDER BY b.code, l.etage, l.localisation""",
+        params,
     ).fetchall()
+    pouvoir = calculer_pouvoir(conn)
+    part_egale = 1 / pouvoir["nb_joueurs"] if pouvoir["nb_joueurs"] else 0
 
     result = []
     for r in rows:
@@ -102,14 +117,22 @@ def get_full_canvassing_list(conn: sqlite3.Connection) -> list[dict]:
         row["groupe"] = etage_info["titre"]
         row["priorite_demarchage"] = etage_info["priorite"]
 
-        # Augmenter la priorité si gros tantièmes
-        if (row["tantiemes"] or 0) >= 200:
+        # Indices du propriétaire (None : vote certain, hors jeu)
+        indices = pouvoir["lots"].get(row["lot_id"])
+        for seuil in SEUILS_POUVOIR:
+            for indice in ("banzhaf", "shapley"):
+                row[f"{indice}_{seuil}"] = indices[seuil][indice] if indices else None
+        row["pouvoir_approche"] = pouvoir["approche"]
+        row["pivot"] = max(row["shapley_art25"] or 0, row["shapley_passerelle"] or 0)
+
+        # Augmenter la priorité si le propriétaire est plus décisif que la moyenne
+        if part_egale and row["pivot"] > part_egale:
             row["priorite_demarchage"] += 1
 
         result.append(row)
 
-    # Tri : priorité décroissante, puis tantièmes décroissants
-    result.sort(key=lambda x: (-x["priorite_demarchage"], -(x["tantiemes"] or 0)))
+    # Tri : priorité décroissante, puis pouvoir et tantièmes décroissants
+    result.sort(key=lambda x: (-x["priorite_demarchage"], -x["pivot"], -(x["tantiemes"] or 0)))
     return result
 
 
@@ -0,0 +1,221 @@
+"""Tournée de porte-à-porte : quels lots visiter, dans quel ordre, en un temps donné.
+
+Chaque lot de la liste de démarchage rapporte une espérance de tantièmes
+gagnés : ses tantièmes × la probabilité de convertir son vote actuel
+(PROBABILITE_GAIN, divisée par deux si le propriétaire a déjà été contacté).
+Une visite coûte TOURNEE_MINUTES_VISITE ; entrer dans un bâtiment coûte
+TOURNEE_MINUTES_BATIMENT, et y monter jusqu'à l'étage h puis redescendre
+h × TOURNEE_MINUTES_ETAGE.
+
+Le graphe d'un bâtiment est une cage d'escalier : le meilleur parcours d'un
+ensemble de paliers monte d'une traite au plus haut et frappe aux portes en
+redescendant. Son coût ne dépend donc que de l'étage le plus haut visité, et
+le problème d'orienteering devient un sac à dos où chaque bâtiment ouvre un
+coût fixe selon son étage le plus haut. Il est résolu exactement par
+programmation dynamique sur le temps (pas de TOURNEE_PAS_MINUTES), en
+parcourant les étages de haut en bas : chaque lot n'est traité qu'une fois.
+"""
+from __future__ import annotations
+
+import math
+import sqlite3
+
+from ..config import (
+    TOURNEE_MINUTES_BATIMENT, TOURNEE_MINUTES_DEFAUT, TOURNEE_MINUTES_ETAGE, TOURNEE_MINUTES_MAX,
+    TOURNEE_MINUTES_VISITE, TOURNEE_PAS_MINUTES,
+)
+from .strategy import ARGUMENT_BAT_BC, ARGUMENTS_PAR_ETAGE
+
+# Probabilité qu'une visite fasse passer le lot à « pour » (ou le confirme)
+PROBABILITE_GAIN = {
+    "inconnu": 0.5,
+    "absent": 0.4,
+    "abstention": 0.3,
+    "contre": 0.15,
+    "pour": 0.1,       # pour non certain : la visite le consolide
+}
+FACTEUR_DEJA_CONTACTE = 0.5
+
+_AUCUN = float("-inf")
+
+
+def lire_minutes(valeur) -> float:
+    """Durée de tournée demandée, bornée à TOURNEE_MINUTES_MAX. Lève ValueError."""
+    if valeur in (None, ""):
+        return TOURNEE_MINUTES_DEFAUT
+    try:
+        minutes = float(valeur)
+    except (TypeError, ValueError):
+        raise ValueError("minutes invalide") from None
+    if not minutes > 0:
+        raise ValueError("minutes invalide")
+    return min(minutes, TOURNEE_MINUTES_MAX)
+
+
+def gain_espere(lot: dict) -> float:
+    """Espérance de tantièmes gagnés par une visite au lot."""
+    probabilite = PROBABILITE_GAIN.get(lot["vote"] or "inconnu", 0)
+    if lot["contact_fait"]:
+        probabilite *= FACTEUR_DEJA_CONTACTE
+    return (lot["tantiemes"] or 0) * probabilite
+
+
+def _pas(minutes: float) -> int:
+    """Durée en pas de calcul, arrondie au-dessus."""
+    return math.ceil(minutes / TOURNEE_PAS_MINUTES - 1e-9)
+
+
+def _ajouter(tableau: list[float], duree: int, gain: float) -> list[float]:
+    """Sac à dos 0/1 : ``tableau`` (meilleur gain par temps) avec un lot de plus."""
+    if duree > len(tableau) - 1:
+        return tableau
+    decale = tableau[:duree] + [v + gain for v in tableau[:len(tableau) - duree]]
+    return list(map(max, tableau, decale))
+
+
+def _ouvrir(tableau: list[float], acquis: list[float], cout: int) -> list[float]:
+    """Option « entrer et monter » : ``acquis`` décalé de ``cout``, si meilleur."""
+    if cout > len(tableau) - 1:
+        return tableau
+    decale = [_AUCUN] * cout + acquis[:len(acquis) - cout]
+    return list(map(max, tableau, decale))
+
+
+def planifier_tournee(lots: list[dict], minutes: float) -> dict:
+    """Lots à visiter en ``minutes`` maximisant l'espérance de tantièmes gagnés.
+
+    ``lots`` : lignes de lots_a_visiter. Retourne les étapes dans
+    l'ordre de passage (bâtiment, étage décroissant, palier, priorité) avec
+    l'heure d'arrivée en minutes, le gain espéré, la durée et les étages
+    gravis.
+    """
+    horizon = int(minutes / TOURNEE_PAS_MINUTES + 1e-9)
+    visite = _pas(TOURNEE_MINUTES_VISITE)
+
+    # Cibles par bâtiment puis par étage
+    batiments: dict[str, dict[int, list[dict]]] = {}
+    for lot in lots:
+        gain = gain_espere(lot)
+        if gain > 0:
+            etages = batiments.setdefault(lot["batiment"], {})
+            etages.setdefault(lot["etage"] or 0, []).append(dict(lot, gain_espere=gain))
+
+    # Programmation dynamique : ``acquis`` = meilleur gain des bâtiments déjà
+    # traités pour chaque temps (au plus). Dans un bâtiment, ``engage`` =
+    # meilleur gain une fois l'étage le plus haut choisi ; on descend les
+    # étages en y ajoutant leurs lots. Les tableaux sont gardés pour le retour.
+    acquis = [0.0] * (horizon + 1)
+    historique = []
+    for code in sorted(batiments):
+        etages = batiments[code]
+        engage = [_AUCUN] * (horizon + 1)
+        etapes = []
+        for etage in sorted(etages, reverse=True):
+            cout = _pas(TOURNEE_MINUTES_BATIMENT + etage * TOURNEE_MINUTES_ETAGE)
+            ouvert = _ouvrir(engage, acquis, cout)
+            etapes.append((None, cout, engage, ouvert))
+            engage = ouvert
+            for lot in etages[etage]:
+                avec = _ajouter(engage, visite, lot["gain_espere"])
+                etapes.append((lot, visite, engage, avec))
+                engage = avec
+        historique.append((acquis, engage, etapes))
+        acquis = list(map(max, acquis, engage))
+
+    # Temps le plus court atteignant le meilleur gain, puis retour en arrière
+    t = acquis.index(acquis[horizon])
+    visites = []
+    for avant, engage, etapes in reversed(historique):
+        if engage[t] <= avant[t]:
+            continue  # bâtiment non visité
+        for lot, duree, precedent, suivant in reversed(etapes):
+            if suivant[t] == precedent[t]:
+                continue
+            t -= duree
+            if lot is None:
+                break  # étage le plus haut du bâtiment : retour aux précédents
+            visites.append(lot)
+    nb_cibles = sum(len(l) for etages in batiments.values() for l in etages.values())
+    return _itineraire(visites, minutes, nb_cibles)
+
+
+def _itineraire(visites: list[dict], minutes: float, nb_cibles: int) -> dict:
+    """Ordre de passage et horaires (en durées réelles, non arrondies)."""
+    visites.sort(key=lambda l: (
+        l["batiment"], -(l["etage"] or 0), l["localisation"] or "", -l["priorite_demarchage"],
+        -l["gain_espere"],
+    ))
+    etapes, horloge, etages_gravis = [], 0.0, 0
+    for i, lot in enumerate(visites):
+        etage = lot["etage"] or 0
+        if i == 0 or lot["batiment"] != visites[i - 1]["batiment"]:
+            if i:  # descente du bâtiment précédent depuis son dernier palier
+                horloge += (visites[i - 1]["etage"] or 0) * TOURNEE_MINUTES_ETAGE / 2
+            # montée d'une traite jusqu'au palier le plus haut du bâtiment
+            horloge += TOURNEE_MINUTES_BATIMENT + etage * TOURNEE_MINUTES_ETAGE / 2
+            etages_gravis += etage
+        else:
+            horloge += ((visites[i - 1]["etage"] or 0) - etage) * TOURNEE_MINUTES_ETAGE / 2
+        etapes.append(dict(lot, ordre=i + 1, arrivee=round(horloge, 1)))
+        horloge += TOURNEE_MINUTES_VISITE
+    if visites:
+        horloge += (visites[-1]["etage"] or 0) * TOURNEE_MINUTES_ETAGE / 2
+    gain = sum(l["gain_espere"] for l in visites)
+    return {
+        "minutes": minutes,
+        "duree": round(horloge, 1),
+        "gain_espere": round(gain, 1),
+        "etages_gravis": etages_gravis,
+        "gain_par_etage": round(gain / etages_gravis, 1) if etages_gravis else None,
+        "nb_cibles": nb_cibles,
+        "etapes": etapes,
+    }
+
+
+def lots_a_visiter(
+    conn: sqlite3.Connection, batiments: list[str] | None = None
+) -> list[dict]:
+    """Lots à démarcher dans les ``batiments`` (codes ; tous si None).
+
+    Mêmes lots et même priorité d'argument que get_full_canvassing_list
+    (les « pour/certain » sont exclus), sans le calcul des indices de pouvoir
+    que la tournée n'utilise pas.
+    """
+    filtre, params = "", ()
+    if batiments:
+        filtre = f"AND b.code IN ({', '.join('?' * len(batiments))})"
+        params = tuple(batiments)
+    rows = conn.execute(
+        f"""SELECT l.id AS lot_id, l.numero, b.code AS batiment, l.etage, l.localisation,
+                  l.tantiemes, vs.vote, vs.confiance, vs.contact_fait,
+                  GROUP_CONCAT(DISTINCT p.nom_complet) AS proprietaire
+           FROM lot l
+           JOIN batiment b ON l.batiment_id = b.id
+           LEFT JOIN lot_personne lp ON lp.lot_id = l.id
+                AND lp.role = 'proprietaire' AND lp.actif = 1
+           LEFT JOIN personne p ON lp.personne_id = p.id
+           LEFT JOIN vote_simulation vs ON vs.lot_id = l.id
+           WHERE NOT (IFNULL(vs.vote, '') = 'pour' AND IFNULL(vs.confiance, '') = 'certain')
+                 {filtre}
+           GROUP BY l.id""",
+        params,
+    ).fetchall()
+
+    lots = []
+    for r in rows:
+        lot = dict(r)
+        if lot["batiment"] == "A":
+            etage_info = ARGUMENTS_PAR_ETAGE.get(lot["etage"], ARGUMENTS_PAR_ETAGE[0])
+        else:
+            etage_info = ARGUMENT_BAT_BC
+        lot["argument_demarchage"] = etage_info["argument"]
+        lot["priorite_demarchage"] = etage_info["priorite"]
+        lots.append(lot)
+    return lots
+
+
+def tournee(
+    conn: sqlite3.Connection, minutes: float, batiments: list[str] | None = None
+) -> dict:
+    """Tournée de ``minutes`` dans les ``batiments`` (codes ; tous si None)."""
+    return planifier_tournee(lots_a_visiter(conn, batiments), minutes)
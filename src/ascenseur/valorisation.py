@@ -0,0 +1,149 @@
+"""Valorisation des lots : plus-value, impact locatif et retour sur quote-part, par devis.
+
+Pour chaque lot des bâtiments à ascenseur, la valeur de base est surface ×
+prix au m². L'ascenseur supprime la décote d'un étage sans ascenseur et y
+ajoute une prime : plus-value = valeur × (décote + appréciation), dans la
+fourchette de l'étage. Le loyer suit l'impact locatif de l'étage.
+
+Par devis, le bilan net est la plus-value moins la quote-part, et le retour
+sur investissement d'un bailleur le nombre d'années de gain locatif (net de
+sa part de maintenance) pour couvrir la quote-part.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+from ..config import (
+    BATIMENTS_ASCENSEUR, SURFACE_M2_PAR_TANTIEME, VALORISATION_LOYER_M2, VALORISATION_PRIX_M2,
+)
+from .colonnes import en_colonnes
+from .financement import devis_comparables, parts_ascenseur
+
+# Source : étude MeilleursAgents sur 50 000 transactions à Paris
+VALORISATION_PAR_ETAGE = {
+    1: {"appreciation_min": 0.008, "appreciation_max": 0.015,
+        "decote_min": 0.008, "decote_max": 0.015,
+        "impact_loyer_min": 0.015, "impact_loyer_max": 0.025},
+    2: {"appreciation_min": 0.008, "appreciation_max": 0.015,
+        "decote_min": 0.008, "decote_max": 0.015,
+        "impact_loyer_min": 0.015, "impact_loyer_max": 0.025},
+    3: {"appreciation_min": 0.008, "appreciation_max": 0.015,
+        "decote_min": 0.008, "decote_max": 0.015,
+        "impact_loyer_min": 0.020, "impact_loyer_max": 0.035},
+    4: {"appreciation_min": 0.015, "appreciation_max": 0.025,
+        "decote_min": 0.015, "decote_max": 0.025,
+        "impact_loyer_min": 0.025, "impact_loyer_max": 0.040},
+    5: {"appreciation_min": 0.015, "appreciation_max": 0.025,
+        "decote_min": 0.015, "decote_max": 0.025,
+        "impact_loyer_min": 0.030, "impact_loyer_max": 0.045},
+    6: {"appreciation_min": 0.020, "appreciation_max": 0.035,
+        "decote_min": 0.020, "decote_max": 0.035,
+        "impact_loyer_min": 0.035, "impact_loyer_max": 0.050},
+}
+
+VALORISATION_DATA = {
+    "prix_m2_base": VALORISATION_PRIX_M2,
+    "loyer_m2_base": VALORISATION_LOYER_M2,
+    "par_etage": VALORISATION_PAR_ETAGE,
+}
+
+CHAMPS_VALORISATION_LOT = [
+    "lot_id", "surface", "surface_estimee", "valeur_base", "prime_pct",
+    "plus_value_min", "plus_value_max", "plus_value", "loyer",
+    "gain_loyer_min", "gain_loyer_max",
+]
+CHAMPS_VALORISATION_DEVIS = [
+    "lot_id", "devis_id", "quote_part", "maintenance_an",
+    "net_min", "net_max", "roi", "retour_ans",
+]
+
+
+def surface_lot(surface_m2: float | None, tantiemes: int | None) -> tuple[float, bool]:
+    """Surface relevée, à défaut estimée depuis les tantièmes : (m², estimée ?)."""
+    if surface_m2:
+        return surface_m2, False
+    return round((tantiemes or 0) * SURFACE_M2_PAR_TANTIEME, 1), True
+
+
+def lire_prix(valeur, defaut: float) -> float:
+    """Prix au m² passé en paramètre (défaut si absent). Lève ValueError."""
+    if valeur is None:
+        return defaut
+    try:
+        prix = float(valeur)
+    except (TypeError, ValueError):
+        raise ValueError(f"prix invalide : {valeur}") from None
+    if not prix > 0 or prix == float("inf"):
+        raise ValueError(f"prix invalide : {valeur}")
+    return prix
+
+
+def calculer_valorisation(
+    conn: sqlite3.Connection, prix_m2: float = VALORISATION_PRIX_M2,
+    loyer_m2: float = VALORISATION_LOYER_M2,
+) -> dict:
+    """Valorisation de tous les lots concernés, pour tous les devis comparables.
+
+    ``lots`` (colonnes CHAMPS_VALORISATION_LOT) : surface, valeur de base,
+    plus-value (fourchette et milieu), loyer mensuel et gain locatif mensuel.
+    ``par_devis`` (colonnes CHAMPS_VALORISATION_DEVIS) : quote-part, part de
+    maintenance annuelle, bilan net (plus-value − quote-part), multiple
+    plus-value / quote-part et années de gain locatif net pour la rembourser
+    (None si le gain ne couvre pas la maintenance).
+    """
+    rows = conn.execute(
+        f"""SELECT l.id, l.etage, l.tantiemes, l.surface_m2
+            FROM lot l JOIN batiment b ON l.batiment_id = b.id
+            WHERE b.code IN ({",".join("?" * len(BATIMENTS_ASCENSEUR))})
+            ORDER BY l.id""",
+        sorted(BATIMENTS_ASCENSEUR),
+    ).fetchall()
+    parts = {lot_id: part for lot_id, _, part in parts_ascenseur(conn)}
+    devis = devis_comparables(conn)
+
+    lots = []
+    par_devis = []
+    for r in rows:
+        params = VALORISATION_PAR_ETAGE.get(r["etage"])
+        if params is None:
+            continue  # RDC, caves : pas d'effet de l'ascenseur
+        surface, estimee = surface_lot(r["surface_m2"], r["tantiemes"])
+        valeur = surface * prix_m2
+        loyer = surface * loyer_m2
+        prime_min = params["appreciation_min"] + params["decote_min"]
+        prime_max = params["appreciation_max"] + params["decote_max"]
+        plus_value = valeur * (prime_min + prime_max) / 2
+        gain_loyer_min = loyer * params["impact_loyer_min"]
+        gain_loyer_max = loyer * params["impact_loyer_max"]
+        lots.append({
+            "lot_id": r["id"], "surface": surface, "surface_estimee": estimee,
+            "valeur_base": round(valeur, 2), "prime_pct": round((prime_min + prime_max) / 2 * 100, 2),
+            "plus_value_min": round(valeur * prime_min, 2),
+            "plus_value_max": round(valeur * prime_max, 2),
+            "plus_value": round(plus_value, 2),
+            "loyer": round(loyer, 2),
+            "gain_loyer_min": round(gain_loyer_min, 2),
+            "gain_loyer_max": round(gain_loyer_max, 2),
+        })
+
+        part = parts.get(r["id"], 0.0)
+        gain_annuel = 12 * (gain_loyer_min + gain_loyer_max) / 2
+        for d in devis:
+            qp = d["montant_ttc"] * part
+            maintenance = d["maintenance_ttc"] * part
+            net_annuel = gain_annuel - maintenance
+            par_devis.append({
+                "lot_id": r["id"], "devis_id": d["devis_id"],
+                "quote_part": round(qp, 2), "maintenance_an": round(maintenance, 2),
+                "net_min": round(valeur * prime_min - qp, 2),
+                "net_max": round(valeur * prime_max - qp, 2),
+                "roi": round(plus_value / qp, 3) if qp else None,
+                "retour_ans": round(qp / net_annuel, 1) if qp and net_annuel > 0 else None,
+            })
+
+    return {
+        "parametres": dict(VALORISATION_DATA, prix_m2_base=prix_m2, loyer_m2_base=loyer_m2),
+        "devis": [{"devis_id": d["devis_id"], "fournisseur": d["fournisseur"]} for d in devis],
+        "lots": en_colonnes(lots, CHAMPS_VALORISATION_LOT),
+        "par_devis": en_colonnes(par_devis, CHAMPS_VALORISATION_DEVIS),
+    }
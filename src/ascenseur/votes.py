@@ -2,8 +2,45 @@
 from __future__ import annotations
 
 import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
 
 from ..config import TANTIEMES_TOTAL_COPRO, MAJORITE_ART25, SEUIL_PASSERELLE, TANTIEMES_BAT_A
+from .colonnes import en_colonnes
+
+VOTES = ("pour", "contre", "abstention", "absent", "inconnu")
+CONFIANCES = ("certain", "probable", "possible", "inconnu")
+
+# Horodatage serveur UTC à la milliseconde, même format que Date.toISOString()
+# côté navigateur : les comparaisons last-writer-wins se font sur la chaîne.
+_HORODATAGE_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+# Type de modification → colonne de sa dernière écriture (last-writer-wins
+# par groupe de champs) ; modifie_le reste l'heure de la dernière écriture.
+HORODATAGE_PAR_TYPE = {"vote": "vote_modifie_le", "contact": "contact_modifie_le"}
+
+
+def horodatage_serveur(conn: sqlite3.Connection) -> str:
+    """Heure courante du serveur au format de la colonne modifie_le."""
+    return conn.execute(f"SELECT {_HORODATAGE_SQL}").fetchone()[0]
+
+
+def _normaliser_horodatage(valeur, maintenant: str) -> str:
+    """Ramène un horodatage client au format modifie_le, borné à l'heure serveur.
+
+    Un horodatage absent ou illisible vaut « maintenant » ; un horodatage dans
+    le futur (horloge mal recalée) est ramené à maintenant pour ne pas verrouiller
+    la ligne contre les écritures suivantes.
+    """
+    try:
+        dt = datetime.fromisoformat(str(valeur).replace("Z", "+00:00"))
+    except ValueError:
+        return maintenant
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    texte = dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    return min(texte, maintenant)
 
 
 def initialiser_votes(conn: sqlite3.Connection) -> int:
@@ -16,6 +53,13 @@ def initialiser_votes(conn: sqlite3.Connection) -> int:
         return count
 
     # Si pas encore initialisé, exécuter l'INSERT de la migration
+    _inserer_votes_initiaux(conn)
+    conn.commit()
+    return conn.execute("SELECT COUNT(*) FROM vote_simulation").fetchone()[0]
+
+
+def _inserer_votes_initiaux(conn: sqlite3.Connection) -> None:
+    """INSERT des votes initiaux (même règles que la migration 003), sans commit."""
     conn.execute(
         """INSERT OR IGNORE INTO vote_simulation (lot_id, vote, confiance, argument_cle)
            SELECT
@@ -53,34 +97,52 @@ def initialiser_votes(conn: sqlite3.Connection) -> int:
                GROUP BY lp.lot_id
            ) p_cs ON p_cs.lot_id = l.id"""
     )
-    conn.commit()
-    return conn.execute("SELECT COUNT(*) FROM vote_simulation").fetchone()[0]
 
 
-def calculer_resultats(conn: sqlite3.Connection) -> dict:
-    """Calcule les résultats de la simulation de vote.
+def agreger_votes(conn: sqlite3.Connection) -> dict:
+    """Agrégats additifs de la simulation : (bâtiment, vote, confiance) → nb, tantièmes.
 
-    Retourne un dict avec :
-    - totaux par vote (pour/contre/abstention/absent/inconnu)
-    - tantièmes par vote
-    - art25_atteint, passerelle_possible
-    - tantièmes_manquants
-    - par_batiment : détail par bât
-    - scenarios : optimiste / pessimiste / realiste
+    Base des résultats (calculer_resultats) et des scénarios, qui n'y ajoutent
+    que le delta des lots modifiés (ajouter_lot_agregats).
     """
-    # Totaux globaux
     rows = conn.execute(
-        """SELECT vs.vote,
-                  COUNT(*) AS nb,
-                  SUM(l.tantiemes) AS tantiemes
+        """SELECT b.code AS batiment, vs.vote, vs.confiance,
+                  COUNT(*) AS nb, COALESCE(SUM(l.tantiemes), 0) AS tantiemes
            FROM vote_simulation vs
            JOIN lot l ON vs.lot_id = l.id
-           GROUP BY vs.vote"""
+           JOIN batiment b ON l.batiment_id = b.id
+           GROUP BY b.code, vs.vote, vs.confiance"""
     ).fetchall()
+    return {
+        (r["batiment"], r["vote"], r["confiance"]): [r["nb"], r["tantiemes"]] for r in rows
+    }
+
+
+def ajouter_lot_agregats(agregats: dict, lot: dict, signe: int) -> None:
+    """Ajoute (signe=1) ou retire (signe=-1) un lot {batiment, vote, confiance, tantiemes}."""
+    cle = (lot["batiment"], lot["vote"], lot["confiance"])
+    cellule = agregats.setdefault(cle, [0, 0])
+    cellule[0] += signe
+    cellule[1] += signe * (lot["tantiemes"] or 0)
+    if cellule[0] == 0:
+        del agregats[cle]
+
 
-    totaux = {}
-    for r in rows:
-        totaux[r["vote"]] = {"nb": r["nb"], "tantiemes": r["tantiemes"] or 0}
+def resultats_depuis_agregats(agregats: dict) -> dict:
+    """Résultats de vote (forme de calculer_resultats) à partir des agrégats."""
+    totaux: dict = {}
+    par_batiment: dict = {}
+    pour_par_confiance: dict = {}
+    for (bat, vote, confiance), (nb, tantiemes) in sorted(agregats.items()):
+        t = totaux.setdefault(vote, {"nb": 0, "tantiemes": 0})
+        t["nb"] += nb
+        t["tantiemes"] += tantiemes
+        b = par_batiment.setdefault(bat, {}).setdefault(vote, {"nb": 0, "tantiemes": 0})
+        b["nb"] += nb
+        b["tantiemes"] += tantiemes
+        if vote == "pour":
+            pour_par_confiance[confiance] = pour_par_confiance.get(confiance, 0) + tantiemes
+    totaux = dict(sorted(totaux.items()))
 
     tantiemes_pour = totaux.get("pour", {}).get("tantiemes", 0)
     tantiemes_contre = totaux.get("contre", {}).get("tantiemes", 0)
@@ -89,38 +151,10 @@ def calculer_resultats(conn: sqlite3.Connection) -> dict:
     passerelle_possible = tantiemes_pour >= SEUIL_PASSERELLE and not art25_atteint
     tantiemes_manquants_art25 = max(0, MAJORITE_ART25 - tantiemes_pour)
 
-    # Par bâtiment
-    bat_rows = conn.execute(
-        """SELECT b.code AS batiment, vs.vote,
-                  COUNT(*) AS nb, SUM(l.tantiemes) AS tantiemes
-           FROM vote_simulation vs
-           JOIN lot l ON vs.lot_id = l.id
-           JOIN batiment b ON l.batiment_id = b.id
-           GROUP BY b.code, vs.vote
-           ORDER BY b.code"""
-    ).fetchall()
-
-    par_batiment = {}
-    for r in bat_rows:
-        bat = r["batiment"]
-        if bat not in par_batiment:
-            par_batiment[bat] = {}
-        par_batiment[bat][r["vote"]] = {"nb": r["nb"], "tantiemes": r["tantiemes"] or 0}
-
     # Scénarios
     inconnu_tantiemes = totaux.get("inconnu", {}).get("tantiemes", 0)
     absent_tantiemes = totaux.get("absent", {}).get("tantiemes", 0)
 
-    # Par confiance
-    confiance_rows = conn.execute(
-        """SELECT vs.confiance, SUM(l.tantiemes) AS tantiemes
-           FROM vote_simulation vs
-           JOIN lot l ON vs.lot_id = l.id
-           WHERE vs.vote = 'pour'
-           GROUP BY vs.confiance"""
-    ).fetchall()
-    pour_par_confiance = {r["confiance"]: r["tantiemes"] or 0 for r in confiance_rows}
-
     # Optimiste : tous les pour + inconnus + absents votent pour
     optimiste = tantiemes_pour + inconnu_tantiemes + absent_tantiemes
     # Pessimiste : seuls les pour/certain
@@ -152,36 +186,191 @@ def calculer_resultats(conn: sqlite3.Connection) -> dict:
     }
 
 
+def calculer_resultats(conn: sqlite3.Connection) -> dict:
+    """Calcule les résultats de la simulation de vote.
+
+    Retourne un dict avec :
+    - totaux par vote (pour/contre/abstention/absent/inconnu)
+    - tantièmes par vote
+    - art25_atteint, passerelle_possible
+    - tantièmes_manquants
+    - par_batiment : détail par bât
+    - scenarios : optimiste / pessimiste / realiste
+    """
+    return resultats_depuis_agregats(agreger_votes(conn))
+
+
+# Les mutations ci-dessous ne valident pas elles-mêmes : elles sont exécutées
+# par la file d'écriture (src/ecriture.py), qui les regroupe dans une seule
+# transaction. Hors de l'application, faire suivre d'un conn.commit().
+# ``auteur`` est noté dans le journal des changements (vote_journal, 007).
+
+@contextmanager
+def journal_auteur(conn: sqlite3.Connection, auteur: str | None) -> Iterator[None]:
+    """Attribue à ``auteur`` les changements du bloc, puis efface l'auteur.
+
+    journal_contexte est une ligne persistante : sans cet effacement, une
+    écriture ultérieure qui ne renseigne pas d'auteur (initialiser_votes,
+    scripts) serait journalisée au nom de la requête précédente.
+    """
+    conn.execute("UPDATE journal_contexte SET auteur = ? WHERE id = 1", (auteur,))
+    try:
+        yield
+    finally:
+        conn.execute("UPDATE journal_contexte SET auteur = NULL WHERE id = 1")
+
+
 def mettre_a_jour_vote(
-    conn: sqlite3.Connection, lot_id: int, vote: str, confiance: str | None = None
+    conn: sqlite3.Connection, lot_id: int, vote: str, confiance: str | None = None,
+    auteur: str | None = None,
 ) -> bool:
     """Met à jour le vote d'un lot."""
-    existing = conn.execute(
-        "SELECT id FROM vote_simulation WHERE lot_id = ?", (lot_id,)
-    ).fetchone()
-    if not existing:
-        return False
+    with journal_auteur(conn, auteur):
+        existing = conn.execute(
+            "SELECT id FROM vote_simulation WHERE lot_id = ?", (lot_id,)
+        ).fetchone()
+        if not existing:
+            return False
 
-    if confiance:
-        conn.execute(
-            "UPDATE vote_simulation SET vote = ?, confiance = ? WHERE lot_id = ?",
-            (vote, confiance, lot_id),
+        if confiance:
+            conn.execute(
+                f"""UPDATE vote_simulation SET vote = ?, confiance = ?,
+                           modifie_le = {_HORODATAGE_SQL}, vote_modifie_le = {_HORODATAGE_SQL}
+                    WHERE lot_id = ?""",
+                (vote, confiance, lot_id),
+            )
+        else:
+            conn.execute(
+                f"""UPDATE vote_simulation SET vote = ?,
+                           modifie_le = {_HORODATAGE_SQL}, vote_modifie_le = {_HORODATAGE_SQL}
+                    WHERE lot_id = ?""",
+                (vote, lot_id),
+            )
+        return True
+
+
+def mettre_a_jour_contact(
+    conn: sqlite3.Connection, lot_id: int, contact_fait: bool, auteur: str | None = None
+) -> bool:
+    """Marque un lot comme contacté (ou non)."""
+    with journal_auteur(conn, auteur):
+        result = conn.execute(
+            f"""UPDATE vote_simulation SET contact_fait = ?,
+                       modifie_le = {_HORODATAGE_SQL}, contact_modifie_le = {_HORODATAGE_SQL}
+                WHERE lot_id = ?""",
+            (1 if contact_fait else 0, lot_id),
         )
-    else:
+        return result.rowcount > 0
+
+
+def reinitialiser_votes(conn: sqlite3.Connection, auteur: str | None = None) -> int:
+    """Remet la simulation à son état initial.
+
+    Les lignes recréées sont horodatées : une modification hors ligne saisie
+    avant la réinitialisation ne l'écrase pas lors de la synchronisation.
+    Suppression et recréation font partie de la même transaction.
+    """
+    with journal_auteur(conn, auteur):
+        conn.execute("DELETE FROM vote_simulation")
+        _inserer_votes_initiaux(conn)
         conn.execute(
-            "UPDATE vote_simulation SET vote = ? WHERE lot_id = ?",
-            (vote, lot_id),
+            f"""UPDATE vote_simulation SET modifie_le = {_HORODATAGE_SQL},
+                       vote_modifie_le = {_HORODATAGE_SQL},
+                       contact_modifie_le = {_HORODATAGE_SQL}"""
         )
-    conn.commit()
-    return True
+        return conn.execute("SELECT COUNT(*) FROM vote_simulation").fetchone()[0]
+
+
+def _etat_vote(conn: sqlite3.Connection, lot_id: int) -> dict | None:
+    row = conn.execute(
+        """SELECT lot_id, vote, confiance, contact_fait, modifie_le,
+                  vote_modifie_le, contact_modifie_le
+           FROM vote_simulation WHERE lot_id = ?""",
+        (lot_id,),
+    ).fetchone()
+    return dict(row) if row else None
+
 
+def appliquer_modifications(
+    conn: sqlite3.Connection, modifications: list[dict], auteur: str | None = None
+) -> list[dict]:
+    """Applique un lot de modifications saisies hors ligne (last-writer-wins).
 
-def get_votes_detail(conn: sqlite3.Connection) -> list[dict]:
-    """Retourne le détail des votes par lot avec infos propriétaire."""
+    Chaque modification est un dict ``{"type": "vote"|"contact", "lot_id",
+    "horodatage", ...}`` où l'horodatage est exprimé en heure serveur (le client
+    recale son horloge sur ``server_time``). Elle n'est appliquée que si elle
+    est au moins aussi récente que la dernière écriture de son type sur le lot
+    (vote_modifie_le ou contact_modifie_le) ; sinon elle est ignorée et l'état
+    serveur est renvoyé pour que le client s'y aligne.
+
+    Retourne un résultat par modification : ``statut`` parmi applique / ignore /
+    invalide / introuvable, et ``etat`` (ligne vote_simulation courante).
+    """
+    with journal_auteur(conn, auteur):
+        maintenant = horodatage_serveur(conn)
+        resultats = []
+        for m in modifications:
+            type_modif = m.get("type")
+            try:
+                lot_id = int(m.get("lot_id"))
+            except (TypeError, ValueError):
+                resultats.append(
+                    {"lot_id": m.get("lot_id"), "type": type_modif, "statut": "invalide"}
+                )
+                continue
+            resultat = {"lot_id": lot_id, "type": type_modif}
+            resultats.append(resultat)
+
+            etat = _etat_vote(conn, lot_id)
+            if etat is None:
+                resultat["statut"] = "introuvable"
+                continue
+
+            vote, confiance = m.get("vote"), m.get("confiance")
+            if type_modif == "vote":
+                valide = vote in VOTES and (confiance is None or confiance in CONFIANCES)
+            else:
+                valide = type_modif == "contact"
+            horodatage = _normaliser_horodatage(m.get("horodatage"), maintenant)
+
+            if not valide:
+                resultat["statut"] = "invalide"
+            elif (etat[HORODATAGE_PAR_TYPE[type_modif]] or "") > horodatage:
+                resultat["statut"] = "ignore"
+            else:
+                # modifie_le : dernière écriture, toutes modifications confondues
+                if type_modif == "vote":
+                    conn.execute(
+                        """UPDATE vote_simulation
+                           SET vote = ?, confiance = COALESCE(?, confiance), vote_modifie_le = ?,
+                               modifie_le = MAX(COALESCE(modifie_le, ''), ?)
+                           WHERE lot_id = ?""",
+                        (vote, confiance, horodatage, horodatage, lot_id),
+                    )
+                else:
+                    conn.execute(
+                        """UPDATE vote_simulation
+                           SET contact_fait = ?, contact_modifie_le = ?,
+                               modifie_le = MAX(COALESCE(modifie_le, ''), ?)
+                           WHERE lot_id = ?""",
+                        (1 if m.get("contact_fait") else 0, horodatage, horodatage, lot_id),
+                    )
+                resultat["statut"] = "applique"
+                etat = _etat_vote(conn, lot_id)
+            resultat["etat"] = etat
+        return resultats
+
+
+def get_votes_detail(conn: sqlite3.Connection, depuis: int | None = None) -> list[dict]:
+    """Retourne le détail des votes par lot avec infos propriétaire.
+
+    Avec ``depuis``, seules les lignes modifiées après cette version.
+    """
+    filtre, params = ("WHERE vs.version > ?", (depuis,)) if depuis is not None else ("", ())
     rows = conn.execute(
-        """SELECT vs.lot_id, l.numero, b.code AS batiment, l.etage, l.localisation,
+        f"""SELECT vs.lot_id, l.numero, b.code AS batiment, l.etage, l.localisation,
                   l.tantiemes, l.coef_ascenseur, l.tantieme_ascenseur,
-                  vs.vote, vs.confiance, vs.argument_cle, vs.contact_fait,
+                  vs.vote, vs.confiance, vs.argument_cle, vs.contact_fait, vs.modifie_le,
                   GROUP_CONCAT(DISTINCT p.nom_complet) AS proprietaire
            FROM vote_simulation vs
            JOIN lot l ON vs.lot_id = l.id
@@ -189,7 +378,72 @@ def get_votes_detail(conn: sqlite3.Connection) -> list[dict]:
            LEFT JOIN lot_personne lp ON lp.lot_id = l.id
                 AND lp.role = 'proprietaire' AND lp.actif = 1
            LEFT JOIN personne p ON lp.personne_id = p.id
+           {filtre}
            GROUP BY vs.lot_id
-           ORDER BY b.code, l.etage, l.localisation"""
+           ORDER BY b.code, l.etage, l.localisation""",
+        params,
     ).fetchall()
     return [dict(r) for r in rows]
+
+
+def version_votes(conn: sqlite3.Connection) -> int:
+    """Dernière version de ligne attribuée dans vote_simulation (high-water mark)."""
+    return conn.execute("SELECT version FROM vote_sequence WHERE id = 1").fetchone()[0]
+
+
+def votes_depuis(conn: sqlite3.Connection, depuis: int) -> dict:
+    """Modifications de la simulation postérieures à la version ``depuis``.
+
+    Retourne les lignes modifiées (même forme que get_votes_detail), les lots
+    supprimés depuis (tombstones d'une réinitialisation, à retirer avant
+    d'appliquer les lignes), les résultats courants et la nouvelle version.
+    Lu dans une seule transaction pour que la version corresponde aux lignes.
+
+    ``complet`` vaut True quand ``depuis`` ne désigne pas une version connue
+    (0, ou postérieure à la version courante après restauration de la base) :
+    ``detail`` contient alors toutes les lignes et remplace l'état du client.
+    """
+    conn.execute("BEGIN")
+    try:
+        version = version_votes(conn)
+        complet = depuis <= 0 or depuis > version
+        detail = get_votes_detail(conn, None if complet else depuis)
+        supprimes = [] if complet else [
+            r[0] for r in conn.execute(
+                "SELECT lot_id FROM vote_suppression WHERE version > ? ORDER BY lot_id", (depuis,)
+            )
+        ]
+        resultats = calculer_resultats(conn)
+    finally:
+        conn.commit()
+    return {
+        "depuis": depuis,
+        "version": version,
+        "complet": complet,
+        "supprimes": supprimes,
+        "detail": detail,
+        "resultats": resultats,
+    }
+
+
+def votes_compacts(payload: dict) -> dict:
+    """Variante compacte d'une réponse /api/votes pour les encodages binaires.
+
+    Le détail est mis en colonnes (chaînes répétitives codées par dictionnaire),
+    vote et confiance étant codés par leur rang dans les tables ``votes`` et
+    ``confiances`` envoyées avec la réponse (-1 pour une valeur absente). Les
+    autres clés (résultats, versions, supprimés) sont reprises telles quelles.
+    """
+    detail = payload["detail"]
+    rang_vote = {v: i for i, v in enumerate(VOTES)}
+    rang_confiance = {c: i for i, c in enumerate(CONFIANCES)}
+    lignes = [
+        dict(r, vote=rang_vote.get(r["vote"], -1), confiance=rang_confiance.get(r["confiance"], -1))
+        for r in detail
+    ]
+    return dict(
+        payload,
+        votes=list(VOTES),
+        confiances=list(CONFIANCES),
+        detail=en_colonnes(lignes, list(detail[0]) if detail else []),
+    )
@@ -0,0 +1,121 @@
+"""Compression gzip/brotli et cache des réponses précompressées."""
+from __future__ import annotations
+
+import gzip
+import threading
+import zlib
+from typing import Iterable, Iterator
+
+try:
+    import brotli
+except ImportError:  # brotli optionnel : repli sur gzip seul
+    brotli = None
+
+from .config import COMPRESSION_BLOC
+
+# Ordre de préférence du serveur à q égal
+ENCODAGES = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compresser(data: bytes, encodage: str) -> bytes:
+    """Compresse un corps complet (niveau maximal : fait une fois par version)."""
+    if encodage == "br":
+        return brotli.compress(data, quality=11)
+    if encodage == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return data
+
+
+def compresser_flux(chunks: Iterable[bytes], encodage: str) -> Iterator[bytes]:
+    """Compresse un flux de blocs au fil de l'eau, sans tout garder en mémoire."""
+    if encodage == "br":
+        comp = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            out = comp.process(chunk)
+            if out:
+                yield out
+        yield comp.finish()
+        return
+    if encodage == "gzip":
+        comp = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = en-tête gzip
+        for chunk in chunks:
+            out = comp.compress(chunk)
+            if out:
+                yield out
+        yield comp.flush()
+        return
+    yield from chunks
+
+
+def decouper(data: bytes, taille: int = COMPRESSION_BLOC) -> Iterator[bytes]:
+    """Découpe un corps en blocs pour compresser_flux."""
+    for i in range(0, len(data), taille):
+        yield data[i:i + taille]
+
+
+class CacheSnapshots:
+    """Artefacts (HTML, JSON) mémorisés par nom et version de données.
+
+    Seule la dernière version de chaque artefact est conservée. Les variantes
+    compressées (niveau maximal) sont calculées à la première demande de
+    chaque encodage, puis servies directement depuis la mémoire.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entrees: dict[str, tuple[int, dict[str, bytes]]] = {}
+        self._en_cours: set[tuple[int, str]] = set()  # (id(variantes), encodage)
+
+    def get(self, nom: str, version: int) -> dict[str, bytes] | None:
+        with self._lock:
+            entree = self._entrees.get(nom)
+        if entree is None or entree[0] != version:
+            return None
+        return entree[1]
+
+    def put(self, nom: str, version: int, data: bytes) -> dict[str, bytes]:
+        variantes = {"identity": data}
+        with self._lock:
+            entree = self._entrees.get(nom)
+            # Ne jamais écraser une version plus récente calculée en parallèle
+            if entree is not None and entree[0] > version:
+                return variantes
+            self._entrees[nom] = (version, variantes)
+        return variantes
+
+    def variante(self, variantes: dict[str, bytes], encodage: str) -> bytes:
+        """Retourne (et mémorise) la variante compressée demandée."""
+        data = variantes.get(encodage)
+        if data is None:
+            data = compresser(variantes["identity"], encodage)
+            with self._lock:
+                variantes[encodage] = data
+        return data
+
+    def flux(self, variantes: dict[str, bytes], encodage: str) -> Iterator[bytes]:
+        """Compresse en flux (niveau rapide) pour cette seule réponse.
+
+        La variante mémorisée est calculée au niveau maximal une fois le flux
+        terminé, dans un thread : les requêtes suivantes la servent directement.
+        """
+        yield from compresser_flux(decouper(variantes["identity"]), encodage)
+        cle = (id(variantes), encodage)
+        with self._lock:
+            if encodage in variantes or cle in self._en_cours:
+                return
+            self._en_cours.add(cle)
+        threading.Thread(
+            target=self._compresser_apres, args=(variantes, encodage, cle),
+            name="compression", daemon=True,
+        ).start()
+
+    def _compresser_apres(self, variantes: dict[str, bytes], encodage: str, cle) -> None:
+        try:
+            self.variante(variantes, encodage)
+        finally:
+            with self._lock:
+                self._en_cours.discard(cle)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entrees.clear()
@@ -99,3 +99,78 @@ COEF_ASCENSEUR_PAR_ETAGE = {
     5: 3.0,
     6: 3.5,
 }
+
+# ── Critères de choix des devis (TOPSIS) ─────────────────────
+# Poids par défaut, normalisés à 1 au calcul
+POIDS_CRITERES_DEVIS = {
+    "prix":          0.25,   # montant TTC — moins = mieux
+    "maintenance":   0.15,   # maintenance HT/an — moins = mieux
+    "capacite":      0.10,   # charge utile (kg)
+    "accessibilite": 0.25,   # conformité PMR EN 81-70
+    "rapidite":      0.10,   # durée des travaux (mois) — moins = mieux
+    "niveaux":       0.15,   # niveaux desservis
+}
+SENSIBILITE_TIRAGES = 5000                 # vecteurs de poids tirés par analyse
+SENSIBILITE_CONCENTRATION = 20             # Dirichlet autour des poids retenus
+
+# ── Financement des travaux ──────────────────────────────────
+FINANCEMENT_TAUX = (0.0, 0.02, 0.035, 0.05)   # taux nominaux annuels simulés
+FINANCEMENT_DUREES_ANS = (5, 10, 15, 20)
+# Prêt collectif du syndicat (loi 1965, art. 26-4) ou prêt individuel de
+# chaque copropriétaire : assurance annuelle sur le capital emprunté, frais
+# de dossier (proportionnels et fixes) payés à la signature
+FINANCEMENT_PRETS = {
+    "collectif":  {"assurance": 0.0030, "frais_pct": 0.010, "frais_fixes": 0},
+    "individuel": {"assurance": 0.0036, "frais_pct": 0.0,   "frais_fixes": 300},
+}
+FINANCEMENT_DEFAUT = {"pret": "collectif", "taux": 0.035, "duree_ans": 10}
+MAINTENANCE_TVA = 0.20                     # TVA du contrat de maintenance
+MAINTENANCE_INDEXATION = 0.025             # révision annuelle du contrat
+TAUX_ACTUALISATION = 0.03                  # VAN des décaissements des propriétaires
+HORIZON_FINANCEMENT_ANS = 20               # horizon de la VAN (maintenance comprise)
+
+# ── Projection des charges ───────────────────────────────────
+PROJECTION_ANS = 15                        # horizon, par trimestres
+PROJECTION_APPELS_TRAVAUX = (0.30, 0.40, 0.30)  # part du devis appelée par trimestre
+PROJECTION_DECALAGE_TRAVAUX = 2            # trimestres avant le 1er appel travaux (AG, commande)
+
+# ── Valorisation immobilière ─────────────────────────────────
+VALORISATION_PRIX_M2 = 9000                # €/m², prix moyen du quartier
+VALORISATION_LOYER_M2 = 25                 # €/m²/mois, loyer moyen du quartier
+# Surface estimée quand la surface relevée manque : 192.5 tant. ≈ 65 m²
+# (lot 28, référence), minorée de 15 %
+SURFACE_M2_PAR_TANTIEME = 65.0 / 192.5 * 0.85
+
+# ── Compression HTTP ─────────────────────────────────────────
+COMPRESSION_TAILLE_MIN = 1024              # octets — en dessous, envoi brut
+COMPRESSION_TAILLE_FLUX = 256 * 1024       # octets — au-delà, compression en flux
+COMPRESSION_BLOC = 64 * 1024               # taille des blocs compressés en flux
+ASSETS_MAX_AGE = 365 * 24 * 3600           # secondes — ressources à nom haché
+
+# ── Écritures SQLite ─────────────────────────────────────────
+ECRITURE_DELAI_MS = 2                      # attente max. après la 1re mutation d'un lot
+ECRITURE_TAILLE_LOT = 64                   # mutations max. par transaction
+
+# ── Dashboard ────────────────────────────────────────────────
+DASHBOARD_THREADS = 4                      # sections du dashboard calculées en parallèle
+
+# ── Indices de pouvoir ───────────────────────────────────────
+# Volume de calcul exact (bits de tranches traités) au-delà duquel Banzhaf est
+# compté en virgule fixe et Shapley–Shubik approché : ≈ 300 joueurs, quelques
+# secondes à ce plafond (résultat mis en cache tant que les joueurs ne changent pas)
+POUVOIR_BITS_EXACT_MAX = 100_000_000_000
+POUVOIR_NOEUDS_SHAPLEY = 32                # points de Gauss–Legendre de l'approximation
+
+# ── Exports tableur ──────────────────────────────────────────
+EXPORT_LIGNES_PAR_BLOC = 1000              # lignes lues et envoyées par morceau
+
+# ── Courriers aux copropriétaires ────────────────────────────
+COURRIERS_PROCESSUS = 4                    # processus de rendu (1 : rendu dans le serveur)
+
+# ── Tournées de démarchage ───────────────────────────────────
+TOURNEE_MINUTES_DEFAUT = 60                # durée d'une tournée
+TOURNEE_MINUTES_MAX = 480
+TOURNEE_MINUTES_VISITE = 5.0               # par porte (présentation, échange)
+TOURNEE_MINUTES_ETAGE = 1.0                # un étage monté puis redescendu
+TOURNEE_MINUTES_BATIMENT = 3.0             # entrée dans un bâtiment (hall, digicode, trajet)
+TOURNEE_PAS_MINUTES = 0.5                  # résolution du calcul (durées arrondies au-dessus)
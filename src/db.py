@@ -5,6 +5,23 @@ import sqlite3
 from pathlib import Path
 from .config import DB_PATH, SQL_DIR, DATA_DIR
 
+# Les fichiers 001-003 contiennent des INSERT de données initiales non
+# rejouables ; à partir de 004 les migrations sont idempotentes et peuvent
+# être ré-exécutées à chaque démarrage sur une base existante.
+PREMIERE_MIGRATION_IDEMPOTENTE = "004"
+
+# Colonnes ajoutées aux tables des migrations 001-003 (SQLite n'a pas de
+# ALTER TABLE ... ADD COLUMN IF NOT EXISTS) : (table, colonne, déclaration)
+COLONNES_AJOUTEES = [
+    ("vote_simulation", "modifie_le", "TEXT"),   # horodatage serveur ISO 8601 (UTC, ms)
+    ("vote_simulation", "version", "INTEGER NOT NULL DEFAULT 0"),  # séquence de 005
+    ("lot", "surface_m2", "REAL"),               # surface relevée ; NULL : estimée (valorisation)
+    # last-writer-wins par groupe de champs : un changement de contact ne
+    # rend pas obsolète une modification de vote antérieure (et inversement)
+    ("vote_simulation", "vote_modifie_le", "TEXT"),
+    ("vote_simulation", "contact_modifie_le", "TEXT"),
+]
+
 
 def get_connection(db_path: Path | None = None) -> sqlite3.Connection:
     """Ouvre une connexion SQLite avec les pragmas adaptés."""
@@ -17,15 +34,59 @@ def get_connection(db_path: Path | None = None) -> sqlite3.Connection:
     return conn
 
 
+def get_connection_lecture(db_path: Path | None = None) -> sqlite3.Connection:
+    """Connexion en lecture seule (query_only) : toute écriture lève une erreur."""
+    conn = get_connection(db_path)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
 def run_migrations(conn: sqlite3.Connection) -> None:
     """Exécute tous les fichiers SQL dans sql/ par ordre alphabétique."""
-    sql_files = sorted(SQL_DIR.glob("*.sql"))
+    sql_files = sorted(
+        f for f in SQL_DIR.glob("*.sql") if f.name < PREMIERE_MIGRATION_IDEMPOTENTE
+    )
+    for sql_file in sql_files:
+        script = sql_file.read_text(encoding="utf-8")
+        conn.executescript(script)
+    conn.commit()
+    upgrade_schema(conn)
+
+
+def _ajouter_colonnes(conn: sqlite3.Connection) -> None:
+    """Ajoute les colonnes de COLONNES_AJOUTEES absentes de la base."""
+    for table, colonne, declaration in COLONNES_AJOUTEES:
+        existantes = {r[1] for r in conn.execute(f"PRAGMA table_info([{table}])")}
+        if colonne not in existantes:
+            conn.execute(f"ALTER TABLE [{table}] ADD COLUMN {colonne} {declaration}")
+
+
+def upgrade_schema(conn: sqlite3.Connection) -> None:
+    """Applique les migrations idempotentes (004 et suivantes) sur une base existante."""
+    _ajouter_colonnes(conn)
+    sql_files = sorted(
+        f for f in SQL_DIR.glob("*.sql") if f.name >= PREMIERE_MIGRATION_IDEMPOTENTE
+    )
     for sql_file in sql_files:
         script = sql_file.read_text(encoding="utf-8")
         conn.executescript(script)
     conn.commit()
 
 
+def data_version(conn: sqlite3.Connection) -> int:
+    """Version globale des données : somme des compteurs de table_version.
+
+    Strictement croissante à chaque écriture sur une table suivie.
+    """
+    row = conn.execute("SELECT COALESCE(SUM(version), 0) FROM table_version").fetchone()
+    return row[0]
+
+
+def versions_tables(conn: sqlite3.Connection) -> dict[str, int]:
+    """Compteur de modifications de chaque table suivie (table_version)."""
+    return {r[0]: r[1] for r in conn.execute("SELECT nom_table, version FROM table_version")}
+
+
 def init_db(db_path: Path | None = None) -> sqlite3.Connection:
     """Initialise la base : crée le fichier, exécute les migrations."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,123 @@
+"""File d'écriture SQLite : un seul thread écrivain, commits groupés."""
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable
+
+from .config import ECRITURE_DELAI_MS, ECRITURE_TAILLE_LOT
+from .db import get_connection
+
+
+class FileEcriture:
+    """Sérialise les écritures de l'application sur une connexion unique.
+
+    Les requêtes soumettent des mutations ``fn(conn, *args)`` (qui ne valident
+    pas elles-mêmes). Le thread écrivain les regroupe — jusqu'à ``taille_lot``
+    mutations, ou ``delai_ms`` après la première — et les exécute dans une seule
+    transaction ``BEGIN IMMEDIATE`` : un commit, donc une synchronisation du WAL,
+    par lot, et plus de conflit de verrou entre requêtes concurrentes.
+
+    Chaque mutation tourne dans un SAVEPOINT : une exception n'annule que la
+    sienne et est transmise à l'appelant par son Future. Les Futures ne sont
+    résolus qu'après le COMMIT ; si celui-ci échoue, tout le lot échoue.
+    """
+
+    def __init__(self, db_path: Path | None = None, delai_ms: float = ECRITURE_DELAI_MS,
+                 taille_lot: int = ECRITURE_TAILLE_LOT):
+        self.db_path = db_path
+        self.delai = delai_ms / 1000
+        self.taille_lot = taille_lot
+        self._file: queue.SimpleQueue = queue.SimpleQueue()
+        self._conn: sqlite3.Connection | None = None
+        self._thread: threading.Thread | None = None
+        self._verrou = threading.Lock()
+
+    def soumettre(self, fn: Callable[..., Any], *args) -> Future:
+        """Met une mutation en file ; le Future porte sa valeur de retour ou son exception."""
+        futur: Future = Future()
+        self._demarrer()
+        self._file.put((fn, args, futur))
+        return futur
+
+    def executer(self, fn: Callable[..., Any], *args) -> Any:
+        """Soumet une mutation et attend son commit."""
+        return self.soumettre(fn, *args).result()
+
+    def _demarrer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._verrou:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._boucle, name="sqlite-ecrivain", daemon=True
+                )
+                self._thread.start()
+
+    def _boucle(self) -> None:
+        while True:
+            self._executer_lot(self._prochain_lot())
+
+    def _prochain_lot(self) -> list[tuple]:
+        """Attend une mutation, puis complète le lot pendant au plus ``delai``."""
+        lot = [self._file.get()]
+        echeance = time.monotonic() + self.delai
+        while len(lot) < self.taille_lot:
+            try:
+                lot.append(self._file.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            reste = echeance - time.monotonic()
+            if reste <= 0:
+                break
+            try:
+                lot.append(self._file.get(timeout=reste))
+            except queue.Empty:
+                break
+        return lot
+
+    def _connexion(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = get_connection(self.db_path)
+            conn.isolation_level = None  # transactions pilotées explicitement
+            self._conn = conn
+        return self._conn
+
+    def _executer_lot(self, lot: list[tuple]) -> None:
+        lot = [m for m in lot if m[2].set_running_or_notify_cancel()]
+        if not lot:
+            return
+        issues = []
+        conn = None
+        try:
+            conn = self._connexion()
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, futur in lot:
+                conn.execute("SAVEPOINT mutation")
+                try:
+                    issues.append((futur, fn(conn, *args), None))
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO mutation")
+                    issues.append((futur, None, exc))
+                conn.execute("RELEASE mutation")
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn is not None and conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:  # connexion inutilisable : rouverte au lot suivant
+                    conn.close()
+                    self._conn = None
+            for _, _, futur in lot:
+                futur.set_exception(exc)
+            return
+        for futur, valeur, exc in issues:
+            if exc is None:
+                futur.set_result(valeur)
+            else:
+                futur.set_exception(exc)
@@ -0,0 +1,108 @@
+"""Encodage MessagePack des réponses API (format binaire compact)."""
+from __future__ import annotations
+
+import struct
+
+try:
+    import msgpack
+except ImportError:  # msgpack optionnel : repli sur l'encodeur pur Python
+    msgpack = None
+
+MIMETYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+MIMETYPE = MIMETYPES[0]
+
+
+def _cle(k) -> str:
+    """Clé de map en chaîne, comme json.dumps (None → "null", True → "true")."""
+    if isinstance(k, str):
+        return k
+    if k is None:
+        return "null"
+    if isinstance(k, bool):
+        return "true" if k else "false"
+    return str(k)
+
+
+def _entete(out: bytearray, n: int, fix: int, fix_max: int, c16: int, c32: int) -> None:
+    if n <= fix_max:
+        out.append(fix | n)
+    elif n < 0x10000:
+        out.append(c16)
+        out += struct.pack(">H", n)
+    else:
+        out.append(c32)
+        out += struct.pack(">I", n)
+
+
+def _packer(obj, out: bytearray) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif obj >= 0:
+            for code, fmt, borne in ((0xCC, ">B", 0xFF), (0xCD, ">H", 0xFFFF),
+                                     (0xCE, ">I", 0xFFFFFFFF), (0xCF, ">Q", 0xFFFFFFFFFFFFFFFF)):
+                if obj <= borne:
+                    out.append(code)
+                    out += struct.pack(fmt, obj)
+                    return
+            raise OverflowError("entier trop grand pour MessagePack")
+        else:
+            for code, fmt, borne in ((0xD0, ">b", 0x80), (0xD1, ">h", 0x8000),
+                                     (0xD2, ">i", 0x80000000), (0xD3, ">q", 0x8000000000000000)):
+                if obj >= -borne:
+                    out.append(code)
+                    out += struct.pack(fmt, obj)
+                    return
+            raise OverflowError("entier trop petit pour MessagePack")
+    elif isinstance(obj, float):
+        out.append(0xCB)
+        out += struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += bytes((0xD9, n))
+        else:
+            _entete(out, n, 0, -1, 0xDA, 0xDB)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n < 0x100:
+            out += bytes((0xC4, n))
+        elif n < 0x10000:
+            out.append(0xC5)
+            out += struct.pack(">H", n)
+        else:
+            out.append(0xC6)
+            out += struct.pack(">I", n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        _entete(out, len(obj), 0x90, 15, 0xDC, 0xDD)
+        for item in obj:
+            _packer(item, out)
+    elif isinstance(obj, dict):
+        _entete(out, len(obj), 0x80, 15, 0xDE, 0xDF)
+        for k, v in obj.items():
+            _packer(_cle(k), out)
+            _packer(v, out)
+    else:
+        _packer(str(obj), out)  # comme default=str pour le JSON
+
+
+def packb(obj) -> bytes:
+    """Sérialise obj en MessagePack (types JSON + bytes ; le reste via str)."""
+    if msgpack is not None:
+        return msgpack.packb(obj, default=str, use_bin_type=True)
+    out = bytearray()
+    _packer(obj, out)
+    return bytes(out)